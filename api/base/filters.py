@@ -10,6 +10,8 @@ from modularodm.query import queryset as modularodm_queryset
 from rest_framework.filters import OrderingFilter
 from rest_framework import serializers as ser
 
+from website.files.utils import GenWrapper
+
 from api.base.exceptions import (
     InvalidFilterError,
     InvalidFilterOperator,
@@ -28,14 +30,25 @@ class ODMOrderingFilter(OrderingFilter):
     def filter_queryset(self, request, queryset, view):
         ordering = self.get_ordering(request, queryset, view)
         if ordering:
-            if not isinstance(queryset, modularodm_queryset.BaseQuerySet) and isinstance(ordering, (list, tuple)):
-                # for lists call sorted, list.sort doesn't take a key
-                order_key = ordering[0]
-                sorted_list = sorted(queryset, key=operator.attrgetter(order_key))
-                return sorted_list
-            return queryset.sort(*ordering)
+            if isinstance(queryset, (modularodm_queryset.BaseQuerySet, GenWrapper)) and self.can_sort_in_query(ordering, view):
+                return queryset.sort(*ordering)
+            # Lists are sorted in Python, by the last key first so that earlier keys take precedence
+            sorted_list = list(queryset)
+            for order_key in reversed(ordering):
+                sorted_list.sort(
+                    key=operator.attrgetter(order_key.lstrip('-')),
+                    reverse=order_key.startswith('-'),
+                )
+            return sorted_list
         return queryset
 
+    def can_sort_in_query(self, ordering, view):
+        """Views may list the fields that are stored on every object they return
+        in `odm_ordering_fields`; ordering by any other field is done in Python.
+        """
+        fields = getattr(view, 'odm_ordering_fields', None)
+        return fields is None or all(key.lstrip('-') in fields for key in ordering)
+
 
 class FilterMixin(object):
     """ View mixin with helper functions for filtering. """
@@ -272,12 +285,28 @@ class ODMFilterMixin(FilterMixin):
         return query
 
 
+class ODMVisibilityFilterMixin(ODMFilterMixin):
+    """ODMFilterMixin for lists of nodes that only includes the nodes the request's user can
+    read. `get_default_odm_query()` should not check visibility itself.
+    """
+
+    # overrides ODMFilterMixin
+    def get_query_from_request(self):
+        query = super(ODMVisibilityFilterMixin, self).get_query_from_request()
+        return utils.get_visibility_query(self.request.user, query)
+
+
 class ListFilterMixin(FilterMixin):
     """View mixin that adds a get_queryset_from_request method which uses query params
     of the form `filter[field_name]=value` to filter a list of objects.
 
     Subclasses must define `get_default_queryset()`.
 
+    Views whose default queryset comes from the database can list the sources of stored
+    fields in `odm_filter_fields`; filters on those fields are then compiled into an ODM
+    query that is passed to `get_default_queryset(query=query)`. Remaining filters are
+    evaluated in Python, in a single pass over the queryset.
+
     Serializers that want to restrict which fields are used for filtering need to have a variable called
     filterable_fields which is a frozenset of strings representing the field names as they appear in the serialization.
     """
@@ -289,6 +318,9 @@ class ListFilterMixin(FilterMixin):
         'gte': operator.ge
     }
 
+    # Field sources that may be filtered in the default queryset's ODM query
+    odm_filter_fields = frozenset()
+
     def __init__(self, *args, **kwargs):
         super(FilterMixin, self).__init__(*args, **kwargs)
         if not self.serializer_class:
@@ -298,45 +330,104 @@ class ListFilterMixin(FilterMixin):
         raise NotImplementedError('Must define get_default_queryset')
 
     def get_queryset_from_request(self):
-        default_queryset = self.get_default_queryset()
         if self.request.QUERY_PARAMS:
-            param_queryset = self.param_queryset(self.request.QUERY_PARAMS, default_queryset)
-            return param_queryset
+            filters = self.parse_query_params(self.request.QUERY_PARAMS)
         else:
-            return default_queryset
+            filters = {}
+        query, predicates = self.compile_filters(filters)
+        if query is not None:
+            default_queryset = self.get_default_queryset(query=query)
+        else:
+            default_queryset = self.get_default_queryset()
+        return self.apply_predicates(default_queryset, predicates)
 
     def param_queryset(self, query_params, default_queryset):
         """filters default queryset based on query parameters"""
         filters = self.parse_query_params(query_params)
-        queryset = set(default_queryset)
-        if filters:
-            for field_name, params in filters.iteritems():
-                for group in params:
-                    queryset = queryset.intersection(set(self.get_filtered_queryset(field_name, group, default_queryset)))
-        return list(queryset)
+        predicates = [
+            self.get_filter_predicate(field_name, group)
+            for field_name, params in filters.iteritems()
+            for group in params
+        ]
+        return self.apply_predicates(default_queryset, predicates)
+
+    def compile_filters(self, filters):
+        """Split parsed filters into an ODM query, for filters that `to_odm_query` can
+        express, and a list of predicates to evaluate in Python for the rest.
+
+        :return tuple: The query, or None, and the list of predicates
+        """
+        query_parts = []
+        predicates = []
+        for field_name, params in filters.iteritems():
+            for group in params:
+                query = self.to_odm_query(field_name, group)
+                if query is not None:
+                    query_parts.append(query)
+                else:
+                    predicates.append(self.get_filter_predicate(field_name, group))
+        query = functools.reduce(operator.and_, query_parts) if query_parts else None
+        return query, predicates
 
-    def get_filtered_queryset(self, field_name, params, default_queryset):
-        """filters default queryset based on the serializer field type"""
-        field = self.serializer_class._declared_fields[field_name]
-        field_name = self.convert_key(field_name, field)
+    def to_odm_query(self, field_name, params):
+        """Return an ODM query equivalent to filtering on ``field_name``, or None if it
+        must be filtered in Python.
+        """
+        if field_name in self.odm_filter_fields:
+            return Q(field_name, params['op'], params['value'])
+        return None
+
+    def apply_predicates(self, queryset, predicates):
+        """Filter ``queryset`` by all of ``predicates`` in one pass. Querysets are returned
+        as-is, so that they are paginated in the database, when there is nothing left to
+        filter.
+        """
+        if not predicates:
+            return queryset
+        return [
+            item for item in queryset
+            if all(predicate(item) for predicate in predicates)
+        ]
 
+    def convert_key(self, field_name, field):
+        # Method fields are looked up by name, as their source is the whole object
         if isinstance(field, ser.SerializerMethodField):
-            return_val = [
-                item for item in default_queryset
-                if self.FILTERS[params['op']](self.get_serializer_method(field_name)(item), params['value'])
-            ]
-        elif isinstance(field, ser.CharField):
-            return_val = [
-                item for item in default_queryset
-                if params['value'] in getattr(item, field_name, {}).lower()
-            ]
-        else:
-            return_val = [
-                item for item in default_queryset
-                if self.FILTERS[params['op']](getattr(item, field_name, None), params['value'])
-            ]
+            return field_name
+        return super(ListFilterMixin, self).convert_key(field_name, field)
+
+    def get_field_by_source(self, field_name):
+        for name, field in self.serializer_class._declared_fields.iteritems():
+            if self.convert_key(name, field) == field_name:
+                return field
+        raise InvalidFilterError(detail="'{0}' is not a valid field for this endpoint.".format(field_name))
 
-        return return_val
+    def get_filter_predicate(self, field_name, params):
+        """Return a function that checks whether an item matches a filter, based on the
+        serializer field type.
+
+        :param str field_name: Source of the field, as returned by `parse_query_params`
+        :param dict params: Operator and value of the filter
+        """
+        field = self.get_field_by_source(field_name)
+        op, value = params['op'], params['value']
+
+        if isinstance(field, ser.SerializerMethodField):
+            # Resolve the method once rather than building a serializer for every item
+            method = self.get_serializer_method(field_name)
+            compare = self.FILTERS[op]
+            return lambda item: compare(method(item), value)
+        if op in self.MATCH_OPERATORS:
+            return self.get_match_predicate(field, field_name, op, value)
+        compare = self.FILTERS[op]
+        return lambda item: compare(getattr(item, field_name, None), value)
+
+    def get_match_predicate(self, field, field_name, op, value):
+        if isinstance(field, ser.ListField):
+            return lambda item: value in (getattr(item, field_name, None) or [])
+        if op == 'icontains':
+            value = value.lower()
+            return lambda item: value in (getattr(item, field_name, None) or '').lower()
+        return lambda item: value in (getattr(item, field_name, None) or '')
 
     def get_serializer_method(self, field_name):
         """
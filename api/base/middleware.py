@@ -1,6 +1,7 @@
 from pymongo.errors import OperationFailure
 from raven.contrib.django.raven_compat.models import sentry_exception_handler
 
+from framework.mongo import client_manager
 from framework.transactions import commands, messages, utils
 
 from .api_globals import api_globals
@@ -15,6 +16,8 @@ class TokuTransactionsMiddleware(object):
 
     def process_request(self, request):
         """Begin a transaction if one doesn't already exist."""
+        client_manager.start_request()
+        request._mongo_request_started = True
         try:
             commands.begin()
         except OperationFailure as err:
@@ -33,7 +36,7 @@ class TokuTransactionsMiddleware(object):
             message = utils.get_error_message(err)
             if messages.NO_TRANSACTION_ERROR not in message:
                 raise
-        commands.disconnect()
+        self._end_request(request)
         return None
 
     def process_response(self, request, response):
@@ -60,9 +63,15 @@ class TokuTransactionsMiddleware(object):
                 pass
             else:
                 raise err
-        commands.disconnect()
+        self._end_request(request)
         return response
 
+    def _end_request(self, request):
+        """Return the socket pinned in `process_request` to the pool."""
+        if getattr(request, '_mongo_request_started', False):
+            client_manager.end_request()
+            request._mongo_request_started = False
+
 
 class DjangoGlobalMiddleware(object):
     """
@@ -1,29 +1,175 @@
+import json
+import base64
+import datetime
 from collections import OrderedDict
 
+from dateutil import parser as date_parser
+from modularodm import Q
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.utils.urls import (
     replace_query_param, remove_query_param
 )
 
+from api.base.filters import ODMOrderingFilter
+from api.base.utils import is_truthy
+
+
+def encode_cursor(value, pk, reverse=False):
+    """Return an opaque cursor pointing after the item with sort key ``value`` and
+    primary key ``pk``. Reverse cursors point before it.
+    """
+    if isinstance(value, datetime.datetime):
+        value = {'datetime': value.isoformat()}
+    data = json.dumps({'v': value, 'pk': pk, 'r': reverse}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data)
+
+
+def decode_cursor(cursor):
+    """Inverse of `encode_cursor`.
+
+    :return tuple: The sort key value, primary key and whether the cursor is reversed
+    :raises: NotFound if the cursor is not valid
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(str(cursor)))
+        value = data['v']
+        if isinstance(value, dict):
+            value = date_parser.parse(value['datetime'])
+        return value, data['pk'], bool(data['r'])
+    except (TypeError, ValueError, KeyError):
+        raise NotFound('Invalid cursor.')
+
+
+def get_keyset_query(field, value, pk, descending):
+    """Query for the items after (``value``, ``pk``) in (``field``, _id) order."""
+    operator = 'lt' if descending else 'gt'
+    if field == '_id':
+        return Q('_id', operator, pk)
+    return Q(field, operator, value) | (Q(field, 'eq', value) & Q('_id', operator, pk))
+
+
 class JSONAPIPagination(pagination.PageNumberPagination):
-    """Custom paginator that formats responses in a JSON-API compatible format."""
+    """Custom paginator that formats responses in a JSON-API compatible format.
+
+    Views that set `model_class` and get their queryset from `get_query_from_request`
+    also support keyset pagination, requested with `page[cursor]` (empty for the first
+    page). Pages are then fetched by seeking from the last item of the previous page on
+    (sort key, _id), so deep pages cost as much as the first. The sort key is the first
+    ordering field if it is stored on the model, otherwise `_id`. The total is only
+    counted when `page[total]` is true.
+    """
 
     page_size_query_param = 'page[size]'
+    cursor_query_param = 'page[cursor]'
+    total_query_param = 'page[total]'
+
+    cursor_mode = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = (
+            self.cursor_query_param in request.query_params and
+            getattr(view, 'model_class', None) is not None and
+            hasattr(view, 'get_query_from_request')
+        )
+        if self.cursor_mode:
+            return self.paginate_by_cursor(queryset, request, view)
+        return super(JSONAPIPagination, self).paginate_queryset(queryset, request, view=view)
+
+    def get_cursor_ordering(self, request, queryset, view):
+        """Return the sort key field and whether it is descending."""
+        ordering = ODMOrderingFilter().get_ordering(request, queryset, view) or ()
+        if ordering:
+            field = ordering[0].lstrip('-')
+            if field in view.model_class._fields:
+                return field, ordering[0].startswith('-')
+        return '_id', False
+
+    def paginate_by_cursor(self, queryset, request, view):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.field, descending = self.get_cursor_ordering(request, queryset, view)
+        cursor = request.query_params[self.cursor_query_param]
+
+        query = view.get_query_from_request()
+        reverse = False
+        if cursor:
+            value, pk, reverse = decode_cursor(cursor)
+            keyset_query = get_keyset_query(self.field, value, pk, descending != reverse)
+            query = query & keyset_query if query is not None else keyset_query
+        direction = '-' if descending != reverse else ''
+        results = view.model_class.find(query).sort(
+            direction + self.field,
+            direction + '_id',
+        ).limit(self.page_size + 1)
+        results = list(results)
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        # Going forward there is a previous page unless this is the first one; going back
+        # there is always a next page, the one the cursor came from
+        self.has_previous = has_more if reverse else bool(cursor)
+        self.has_next = True if reverse else has_more
+        self.results = results
+        if self.get_total(request):
+            self.total = queryset.count()
+        return results
+
+    def get_total(self, request):
+        return is_truthy(request.query_params.get(self.total_query_param))
+
+    def get_cursor_link(self, item, reverse):
+        url = self.request.build_absolute_uri()
+        cursor = encode_cursor(getattr(item, self.field), item._id, reverse=reverse)
+        return replace_query_param(url, self.cursor_query_param, cursor)
 
     def get_first_link(self):
+        if self.cursor_mode:
+            url = self.request.build_absolute_uri()
+            return replace_query_param(url, self.cursor_query_param, '')
         if not self.page.has_previous():
             return None
         url = self.request.build_absolute_uri()
         return remove_query_param(url, self.page_query_param)
 
     def get_last_link(self):
+        if self.cursor_mode:
+            # Finding the last page would need a count or a reversed scan
+            return None
         if not self.page.has_next():
             return None
         url = self.request.build_absolute_uri()
         page_number = self.page.paginator.num_pages
         return replace_query_param(url, self.page_query_param, page_number)
 
+    def get_next_link(self):
+        if self.cursor_mode:
+            if not self.has_next or not self.results:
+                return None
+            return self.get_cursor_link(self.results[-1], reverse=False)
+        return super(JSONAPIPagination, self).get_next_link()
+
+    def get_previous_link(self):
+        if self.cursor_mode:
+            if not self.has_previous or not self.results:
+                return None
+            return self.get_cursor_link(self.results[0], reverse=True)
+        return super(JSONAPIPagination, self).get_previous_link()
+
+    def get_meta(self):
+        if self.cursor_mode:
+            meta = OrderedDict([('per_page', self.page_size)])
+            if self.get_total(self.request):
+                meta['total'] = self.total
+            return meta
+        return OrderedDict([
+            ('total', self.page.paginator.count),
+            ('per_page', self.page.paginator.per_page),
+        ])
+
     def get_paginated_response(self, data):
         response_dict = OrderedDict([
             ('data', data),
@@ -32,10 +178,7 @@ class JSONAPIPagination(pagination.PageNumberPagination):
                 ('last', self.get_last_link()),
                 ('prev', self.get_previous_link()),
                 ('next', self.get_next_link()),
-                ('meta', OrderedDict([
-                    ('total', self.page.paginator.count),
-                    ('per_page', self.page.paginator.per_page),
-                ]))
+                ('meta', self.get_meta()),
             ])),
         ])
         return Response(response_dict)
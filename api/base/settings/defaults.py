@@ -56,6 +56,15 @@ BULK_SETTINGS = {
     'DEFAULT_BULK_LIMIT': 10
 }
 
+# WaterButler folder listings for NodeFilesList are reused for
+# WATERBUTLER_METADATA_CACHE_TTL seconds. Older listings are revalidated with
+# their ETag, and dropped after WATERBUTLER_METADATA_CACHE_MAX_AGE seconds.
+WATERBUTLER_METADATA_CACHE_TTL = 30
+WATERBUTLER_METADATA_CACHE_MAX_AGE = 60 * 60
+WATERBUTLER_METADATA_CACHE_SIZE = 1000
+# Keep-alive connections held open to WaterButler per process
+WATERBUTLER_POOL_SIZE = 10
+
 REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
     # Order is important here because of a bug in rest_framework_swagger. For now,
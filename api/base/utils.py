@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import functools
+import operator
 
 from modularodm import Q
 from modularodm.exceptions import NoResultsFound
@@ -32,6 +34,25 @@ def is_truthy(value):
 def is_falsy(value):
     return value in FALSY
 
+def get_visibility_query(user, query=None):
+    """Return a query for the nodes that ``user``, who may be anonymous, can read,
+    restricted to those matching ``query``.
+
+    A node is readable if it is public, if the user contributes to it, or if the user
+    is an admin on one of its ancestors. Each of these is its own branch of a top-level
+    `$or` with ``query`` repeated inside it, so that every branch is an exact match
+    served by one of the indices on `Node`.
+    """
+    branches = [Q('is_public', 'eq', True)]
+    if user is not None and not user.is_anonymous():
+        branches.extend([
+            Q('contributors', 'eq', user._id),
+            Q('inherited_admin_ids', 'eq', user._id),
+        ])
+    if query is not None:
+        branches = [branch & query for branch in branches]
+    return functools.reduce(operator.or_, branches)
+
 def get_user_auth(request):
     """Given a Django request object, return an ``Auth`` object with the
     authenticated user attached to it.
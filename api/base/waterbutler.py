@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Fetching file metadata from WaterButler for API views.
+
+Requests go through one keep-alive session per process. Responses are cached
+per (node, provider, path): a cached listing is served as-is for
+`WATERBUTLER_METADATA_CACHE_TTL` seconds, then revalidated with its ETag, so
+an unchanged folder costs a `304 Not Modified` rather than a full listing.
+"""
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from rest_framework.exceptions import PermissionDenied, NotFound
+from rest_framework.status import is_server_error
+
+from framework.utils import TTLCache
+from website.util import waterbutler_api_url_for
+
+from api.base import settings
+from api.base.exceptions import ServiceUnavailableError
+
+
+def make_session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+session = make_session(settings.WATERBUTLER_POOL_SIZE)
+
+metadata_cache = TTLCache(settings.WATERBUTLER_METADATA_CACHE_MAX_AGE, settings.WATERBUTLER_METADATA_CACHE_SIZE)
+
+
+class CachedMetadata(object):
+
+    def __init__(self, data, etag, fetched_at):
+        self.data = data
+        self.etag = etag
+        self.fetched_at = fetched_at
+
+
+def get_metadata(node_id, provider, path, cookies=None, authorization=None):
+    """Return WaterButler's metadata for ``path``, a list of children for folders.
+
+    :return tuple: The metadata, and the metadata previously cached for the same
+        path or None. Both are the same object when nothing changed.
+    :raises: PermissionDenied, NotFound or ServiceUnavailableError
+    """
+    key = (node_id, provider, path)
+    cached = metadata_cache.get(key)
+    now = time.time()
+    if cached is not None and now - cached.fetched_at < settings.WATERBUTLER_METADATA_CACHE_TTL:
+        return cached.data, cached.data
+
+    headers = {'Authorization': authorization}
+    if cached is not None and cached.etag:
+        headers['If-None-Match'] = cached.etag
+    response = session.get(
+        waterbutler_api_url_for(node_id, provider, path, meta=True),
+        cookies=cookies,
+        headers=headers,
+    )
+
+    if response.status_code == 304 and cached is not None:
+        metadata_cache.set(key, CachedMetadata(cached.data, cached.etag, now))
+        return cached.data, cached.data
+
+    if response.status_code == 401:
+        raise PermissionDenied
+
+    if response.status_code == 404:
+        metadata_cache.delete(key)
+        raise NotFound
+
+    if is_server_error(response.status_code):
+        raise ServiceUnavailableError(detail='Could not retrieve files information at this time.')
+
+    try:
+        data = response.json()['data']
+    except KeyError:
+        raise ServiceUnavailableError(detail='Could not retrieve files information at this time.')
+
+    previous = cached.data if cached is not None else None
+    if data == previous:
+        data = previous
+    metadata_cache.set(key, CachedMetadata(data, response.headers.get('ETag'), now))
+    return data, previous
@@ -6,7 +6,7 @@ from framework.auth.core import Auth
 from framework.auth.oauth_scopes import CoreScopes
 
 from api.base import permissions as base_permissions
-from api.base.filters import ODMFilterMixin
+from api.base.filters import ODMVisibilityFilterMixin
 from api.base.utils import get_object_or_error
 from api.collections.serializers import (
     CollectionSerializer,
@@ -49,7 +49,7 @@ class CollectionMixin(object):
         return node
 
 
-class CollectionList(generics.ListCreateAPIView, ODMFilterMixin):
+class CollectionList(generics.ListCreateAPIView, ODMVisibilityFilterMixin):
     """Organizer Collections organize projects and components. *Writeable*.
 
     Paginated list of Project Organizer Collections ordered by their `date_modified`.
@@ -119,22 +119,16 @@ class CollectionList(generics.ListCreateAPIView, ODMFilterMixin):
     required_write_scopes = [CoreScopes.ORGANIZER_COLLECTIONS_BASE_WRITE]
 
     serializer_class = CollectionSerializer
+    model_class = Node  # enables page[cursor] pagination
 
     ordering = ('-date_modified', )  # default ordering
 
-    # overrides ODMFilterMixin
+    # overrides ODMFilterMixin; visibility is added by ODMVisibilityFilterMixin
     def get_default_odm_query(self):
-        base_query = (
+        return (
             Q('is_deleted', 'ne', True) &
             Q('is_folder', 'eq', True)
         )
-        user = self.request.user
-        permission_query = Q('is_public', 'eq', True)
-        if not user.is_anonymous():
-            permission_query = (Q('is_public', 'eq', True) | Q('contributors', 'icontains', user._id))
-
-        query = base_query & permission_query
-        return query
 
     # overrides ListCreateAPIView
     def get_queryset(self):
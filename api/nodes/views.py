@@ -1,17 +1,15 @@
-import requests
-
 from modularodm import Q
 from rest_framework import generics, permissions as drf_permissions
 from rest_framework.exceptions import PermissionDenied, ValidationError, NotFound
-from rest_framework.status import is_server_error
 
 from framework.auth.core import Auth
 from framework.auth.oauth_scopes import CoreScopes
 
 from api.base import generic_bulk_views as bulk_views
 from api.base import permissions as base_permissions
-from api.base.filters import ODMFilterMixin, ListFilterMixin
-from api.base.utils import get_object_or_error, is_bulk_request
+from api.base.filters import ODMFilterMixin, ODMVisibilityFilterMixin, ListFilterMixin
+from api.base import waterbutler
+from api.base.utils import get_object_or_error, get_user_auth, is_bulk_request
 from api.files.serializers import FileSerializer
 from api.comments.serializers import CommentSerializer
 from api.comments.permissions import CanCommentOrPublic
@@ -34,15 +32,13 @@ from api.nodes.permissions import (
     ContributorDetailPermissions,
     ReadOnlyIfRegistration,
 )
-from api.base.exceptions import ServiceUnavailableError
 
 from website.exceptions import NodeStateError
 from website.util.permissions import ADMIN
-from website.files.models import FileNode
+from website.files.models import FileNode, StoredFileNode
 from website.files.models import OsfStorageFileNode
 from website.models import Node, Pointer, Comment
 from framework.auth.core import User
-from website.util import waterbutler_api_url_for
 
 
 class NodeMixin(object):
@@ -88,7 +84,37 @@ class WaterButlerMixin(object):
 
         return file_node
 
-    def fetch_from_waterbutler(self):
+    def get_file_items(self, items, previous=None):
+        """Like `get_file_item` for every child of a folder, but loading the existing
+        file nodes in one query. Only items whose metadata differs from ``previous``,
+        the listing they were last updated from, are updated and saved.
+        """
+        node = self.get_node(check_object_permissions=False)
+        previous_attrs = dict(
+            (each['attributes']['path'], each['attributes'])
+            for each in previous or []
+        )
+        paths = ['/' + item['attributes']['path'].lstrip('/') for item in items]
+        existing = dict(
+            ((each.path, each.is_file, each.provider), each.wrapped())
+            for each in StoredFileNode.find(
+                Q('node', 'eq', node._id) &
+                Q('path', 'in', paths)
+            )
+        ) if paths else {}
+
+        file_nodes = []
+        for item, path in zip(items, paths):
+            attrs = item['attributes']
+            file_node = existing.get((path, attrs['kind'] != 'folder', attrs['provider']))
+            if file_node is None or attrs != previous_attrs.get(attrs['path']):
+                file_node = self.get_file_item(item)
+            else:
+                self.check_object_permissions(self.request, file_node)
+            file_nodes.append(file_node)
+        return file_nodes
+
+    def fetch_from_waterbutler(self, with_previous=False):
         node = self.get_node(check_object_permissions=False)
         path = self.kwargs[self.path_lookup_url_kwarg]
         provider = self.kwargs[self.provider_lookup_url_kwarg]
@@ -108,31 +134,23 @@ class WaterButlerMixin(object):
 
             self.check_object_permissions(self.request, obj)
 
-            return obj
+            return (obj, None) if with_previous else obj
 
-        url = waterbutler_api_url_for(node._id, provider, path, meta=True)
-        waterbutler_request = requests.get(
-            url,
-            cookies=self.request.COOKIES,
-            headers={'Authorization': self.request.META.get('HTTP_AUTHORIZATION')},
-        )
-
-        if waterbutler_request.status_code == 401:
+        # Cached metadata is not checked by WaterButler, so check read access here
+        if not node.can_view(get_user_auth(self.request)):
             raise PermissionDenied
 
-        if waterbutler_request.status_code == 404:
-            raise NotFound
-
-        if is_server_error(waterbutler_request.status_code):
-            raise ServiceUnavailableError(detail='Could not retrieve files information at this time.')
-
-        try:
-            return waterbutler_request.json()['data']
-        except KeyError:
-            raise ServiceUnavailableError(detail='Could not retrieve files information at this time.')
+        data, previous = waterbutler.get_metadata(
+            node._id,
+            provider,
+            path,
+            cookies=self.request.COOKIES,
+            authorization=self.request.META.get('HTTP_AUTHORIZATION'),
+        )
+        return (data, previous) if with_previous else data
 
 
-class NodeList(bulk_views.BulkUpdateJSONAPIView, bulk_views.BulkDestroyJSONAPIView, bulk_views.ListBulkCreateJSONAPIView, ODMFilterMixin):
+class NodeList(bulk_views.BulkUpdateJSONAPIView, bulk_views.BulkDestroyJSONAPIView, bulk_views.ListBulkCreateJSONAPIView, ODMVisibilityFilterMixin):
     """Nodes that represent projects and components. *Writeable*.
 
     Paginated list of nodes ordered by their `date_modified`.  Each resource contains the full representation of the
@@ -224,20 +242,13 @@ class NodeList(bulk_views.BulkUpdateJSONAPIView, bulk_views.BulkDestroyJSONAPIVi
 
     ordering = ('-date_modified', )  # default ordering
 
-    # overrides ODMFilterMixin
+    # overrides ODMFilterMixin; visibility is added by ODMVisibilityFilterMixin
     def get_default_odm_query(self):
-        base_query = (
+        return (
             Q('is_deleted', 'ne', True) &
             Q('is_folder', 'ne', True) &
             Q('is_registration', 'eq', False)
         )
-        user = self.request.user
-        permission_query = Q('is_public', 'eq', True)
-        if not user.is_anonymous():
-            permission_query = (permission_query | Q('contributors', 'icontains', user._id))
-
-        query = base_query & permission_query
-        return query
 
     # overrides ListBulkCreateJSONAPIView, BulkUpdateJSONAPIView
     def get_queryset(self):
@@ -1305,18 +1316,40 @@ class NodeFilesList(generics.ListAPIView, WaterButlerMixin, ListFilterMixin, Nod
     required_read_scopes = [CoreScopes.NODE_FILE_READ]
     required_write_scopes = [CoreScopes.NODE_FILE_WRITE]
 
-    def get_default_queryset(self):
+    # Stored on osfstorage file nodes; other providers' files are listed by WaterButler
+    OSFSTORAGE_FILTER_FIELDS = frozenset(['_id', 'name', 'provider', 'last_touched'])
+
+    # overrides ODMOrderingFilter; materialized_path is not stored on osfstorage
+    # files saved before it was, so the default ordering is applied in Python
+    odm_ordering_fields = OSFSTORAGE_FILTER_FIELDS
+
+    # overrides ListFilterMixin
+    @property
+    def odm_filter_fields(self):
+        if self.kwargs[self.provider_lookup_url_kwarg] == 'osfstorage':
+            return self.OSFSTORAGE_FILTER_FIELDS
+        return frozenset()
+
+    # overrides ListFilterMixin
+    def to_odm_query(self, field_name, params):
+        if field_name == 'kind' and params['op'] == 'eq' and self.odm_filter_fields:
+            return Q('is_file', 'eq', params['value'] == 'file')
+        return super(NodeFilesList, self).to_odm_query(field_name, params)
+
+    def get_default_queryset(self, query=None):
         # Don't bother going to waterbutler for osfstorage
-        files_list = self.fetch_from_waterbutler()
+        files_list, previous = self.fetch_from_waterbutler(with_previous=True)
 
         if isinstance(files_list, list):
-            return [self.get_file_item(file) for file in files_list]
+            return self.get_file_items(files_list, previous=previous)
 
         if isinstance(files_list, dict) or getattr(files_list, 'is_file', False):
             # We should not have gotten a file here
             raise NotFound
 
-        return list(files_list.children)
+        # Left as a queryset so that filters, ordering and pagination run in the database
+        children = Q('parent', 'eq', files_list._id)
+        return FileNode.find(children & query if query is not None else children)
 
     # overrides ListAPIView
     def get_queryset(self):
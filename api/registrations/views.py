@@ -11,7 +11,7 @@ from api.registrations.serializers import (
     RegistrationDetailSerializer
 )
 
-from api.nodes.views import NodeMixin, ODMFilterMixin
+from api.nodes.views import NodeMixin, ODMVisibilityFilterMixin
 from api.nodes.permissions import (
     ContributorOrPublic,
     ReadOnlyIfRegistration)
@@ -26,7 +26,7 @@ class RegistrationMixin(NodeMixin):
     node_lookup_url_kwarg = 'registration_id'
 
 
-class RegistrationList(generics.ListAPIView, ODMFilterMixin):
+class RegistrationList(generics.ListAPIView, ODMVisibilityFilterMixin):
     """Node Registrations.
 
     Registrations are read-only snapshots of a project. This view is a list of all current registrations for which a user
@@ -81,20 +81,14 @@ class RegistrationList(generics.ListAPIView, ODMFilterMixin):
     required_write_scopes = [CoreScopes.NODE_REGISTRATIONS_WRITE]
 
     serializer_class = RegistrationSerializer
+    model_class = Node  # enables page[cursor] pagination
 
-    # overrides ODMFilterMixin
+    # overrides ODMFilterMixin; visibility is added by ODMVisibilityFilterMixin
     def get_default_odm_query(self):
-        base_query = (
+        return (
             Q('is_deleted', 'ne', True) &
             Q('is_registration', 'eq', True)
         )
-        user = self.request.user
-        permission_query = Q('is_public', 'eq', True)
-        if not user.is_anonymous():
-            permission_query = (permission_query | Q('contributors', 'icontains', user._id))
-
-        query = base_query & permission_query
-        return query
 
     # overrides ListAPIView
     def get_queryset(self):
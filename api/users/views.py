@@ -5,14 +5,13 @@ from django.contrib.auth.models import AnonymousUser
 
 from modularodm import Q
 
-from framework.auth.core import Auth
 from framework.auth.oauth_scopes import CoreScopes
 
 from website.models import User, Node
 
 from api.base import permissions as base_permissions
 from api.base.utils import get_object_or_error
-from api.base.filters import ODMFilterMixin
+from api.base.filters import ODMFilterMixin, ODMVisibilityFilterMixin
 from api.nodes.serializers import NodeSerializer
 
 from .serializers import UserSerializer, UserDetailSerializer
@@ -98,6 +97,7 @@ class UserList(generics.ListAPIView, ODMFilterMixin):
     required_write_scopes = [CoreScopes.USERS_WRITE]
 
     serializer_class = UserSerializer
+    model_class = User  # enables page[cursor] pagination
 
     ordering = ('-date_registered')
 
@@ -211,7 +211,7 @@ class UserDetail(generics.RetrieveUpdateAPIView, UserMixin):
         return {'request': self.request}
 
 
-class UserNodes(generics.ListAPIView, UserMixin, ODMFilterMixin):
+class UserNodes(generics.ListAPIView, UserMixin, ODMVisibilityFilterMixin):
     """List of nodes that the user contributes to. *Read-only*.
 
     Paginated list of nodes that the user contributes to.  Each resource contains the full representation of the node,
@@ -271,24 +271,17 @@ class UserNodes(generics.ListAPIView, UserMixin, ODMFilterMixin):
     required_write_scopes = [CoreScopes.USERS_WRITE, CoreScopes.NODE_BASE_WRITE]
 
     serializer_class = NodeSerializer
+    model_class = Node  # enables page[cursor] pagination
 
     # overrides ODMFilterMixin
     def get_default_odm_query(self):
         user = self.get_user()
         return (
-            Q('contributors', 'eq', user) &
+            Q('contributors', 'eq', user._id) &
             Q('is_folder', 'ne', True) &
             Q('is_deleted', 'ne', True)
         )
 
     # overrides ListAPIView
     def get_queryset(self):
-        current_user = self.request.user
-        if current_user.is_anonymous():
-            auth = Auth(None)
-        else:
-            auth = Auth(current_user)
-        query = self.get_query_from_request()
-        raw_nodes = Node.find(self.get_default_odm_query() & query)
-        nodes = [each for each in raw_nodes if each.is_public or each.can_view(auth)]
-        return nodes
+        return Node.find(self.get_query_from_request())
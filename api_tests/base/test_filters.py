@@ -12,7 +12,7 @@ from tests.base import ApiTestCase
 from tests import factories
 
 from api.base.settings.defaults import API_BASE
-from api.base.filters import FilterMixin
+from api.base.filters import FilterMixin, ListFilterMixin, ODMOrderingFilter
 
 from api.base.exceptions import (
     InvalidFilterError,
@@ -227,3 +227,77 @@ class TestFilterMixin(ApiTestCase):
         field = FakeSerializer._declared_fields['float_field']
         value = self.view.convert_value(value, field)
         assert_equal(value, 42.0)
+
+
+class FakeListView(ListFilterMixin):
+
+    serializer_class = FakeSerializer
+    odm_filter_fields = frozenset(['int_field'])
+
+
+class FakeItem(object):
+
+    def __init__(self, string_field='', int_field=0, list_field=None, foobar=False):
+        self.string_field = string_field
+        self.int_field = int_field
+        self.list_field = list_field or []
+        self.foobar = foobar
+
+
+class TestListFilterMixin(ApiTestCase):
+
+    def setUp(self):
+        super(TestListFilterMixin, self).setUp()
+        self.view = FakeListView()
+        self.items = [
+            FakeItem(string_field='Foo', int_field=1, list_field=['a'], foobar=True),
+            FakeItem(string_field='bar', int_field=2, list_field=['b'], foobar=False),
+            FakeItem(string_field='foobar', int_field=3, list_field=['a', 'b'], foobar=True),
+        ]
+
+    def test_compile_filters_pushes_down_odm_fields(self):
+        filters = self.view.parse_query_params({
+            'filter[int_field]': '2',
+            'filter[string_field]': 'foo',
+        })
+        query, predicates = self.view.compile_filters(filters)
+        assert_equal(query.attribute, 'int_field')
+        assert_equal(query.argument, 2)
+        assert_equal(len(predicates), 1)
+
+    def test_compile_filters_without_odm_fields(self):
+        filters = self.view.parse_query_params({'filter[string_field]': 'foo'})
+        query, predicates = self.view.compile_filters(filters)
+        assert_is_none(query)
+        assert_equal(len(predicates), 1)
+
+    def test_param_queryset_combines_filters(self):
+        queryset = self.view.param_queryset({
+            'filter[string_field]': 'FOO',
+            'filter[bool_field]': 'true',
+            'filter[list_field]': 'b',
+        }, self.items)
+        assert_equal(queryset, [self.items[2]])
+
+    def test_param_queryset_comparison(self):
+        queryset = self.view.param_queryset({'filter[int_field][gte]': '2'}, self.items)
+        assert_equal(queryset, self.items[1:])
+
+    def test_apply_predicates_returns_queryset_without_predicates(self):
+        queryset = object()
+        assert_is(self.view.apply_predicates(queryset, []), queryset)
+
+
+class TestODMOrderingFilter(ApiTestCase):
+
+    def test_sorts_lists_by_several_keys(self):
+        items = [
+            FakeItem(string_field='a', int_field=1),
+            FakeItem(string_field='b', int_field=1),
+            FakeItem(string_field='c', int_field=2),
+        ]
+        view = mock.Mock(ordering=('-int_field', 'string_field'))
+        request = mock.Mock(QUERY_PARAMS={})
+        with mock.patch.object(ODMOrderingFilter, 'get_ordering', return_value=view.ordering):
+            result = ODMOrderingFilter().filter_queryset(request, items, view)
+        assert_equal([item.string_field for item in result], ['c', 'a', 'b'])
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+from nose.tools import *  # flake8: noqa
+from rest_framework.exceptions import NotFound
+
+from framework.mongo import database
+
+from api.base.pagination import encode_cursor, decode_cursor
+from api.base.settings.defaults import API_BASE
+
+from tests.base import ApiTestCase
+from tests.factories import AuthUserFactory, ProjectFactory, UserFactory
+
+
+class TestCursorEncoding(ApiTestCase):
+
+    def test_round_trip(self):
+        cursor = encode_cursor('abc', 'xyz12')
+        assert_equal(decode_cursor(cursor), ('abc', 'xyz12', False))
+
+    def test_round_trip_datetime(self):
+        now = datetime.datetime(2015, 10, 1, 12, 30, 15, 123000)
+        cursor = encode_cursor(now, 'xyz12', reverse=True)
+        assert_equal(decode_cursor(cursor), (now, 'xyz12', True))
+
+    def test_invalid_cursor(self):
+        with assert_raises(NotFound):
+            decode_cursor('not a cursor')
+
+
+class TestCursorPagination(ApiTestCase):
+
+    def setUp(self):
+        super(TestCursorPagination, self).setUp()
+        self.users = [UserFactory() for _ in range(5)]
+        self.url = '/{}users/?page[size]=2&page[cursor]='.format(API_BASE)
+
+    def walk(self, url, link='next'):
+        ids = []
+        while url:
+            res = self.app.get(url)
+            ids.extend(each['id'] for each in res.json['data'])
+            url = res.json['links'][link]
+        return ids
+
+    def test_walks_every_user_once_in_order(self):
+        ids = self.walk(self.url)
+        # UserList is ordered newest first, with ties broken by _id. Read the
+        # stored dates, which Mongo truncates to milliseconds
+        users = database['user'].find({'_id': {'$in': [user._id for user in self.users]}})
+        users = users.sort([('date_registered', -1), ('_id', -1)])
+        expected = [user['_id'] for user in users]
+        assert_equal([each for each in ids if each in expected], expected)
+        assert_equal(len(ids), len(set(ids)))
+
+    def test_first_page_links(self):
+        res = self.app.get(self.url)
+        links = res.json['links']
+        assert_is_none(links['prev'])
+        assert_is_none(links['last'])
+        assert_in('page%5Bcursor%5D=', links['first'])
+        assert_equal(links['meta']['per_page'], 2)
+        assert_not_in('total', links['meta'])
+
+    def test_prev_link_returns_previous_page(self):
+        first = self.app.get(self.url)
+        second = self.app.get(first.json['links']['next'])
+        back = self.app.get(second.json['links']['prev'])
+        assert_equal(
+            [each['id'] for each in back.json['data']],
+            [each['id'] for each in first.json['data']],
+        )
+        assert_is_none(back.json['links']['prev'])
+
+    def test_total_is_optional(self):
+        res = self.app.get(self.url + '&page[total]=true')
+        paged = self.app.get('/{}users/'.format(API_BASE))
+        assert_equal(res.json['links']['meta']['total'], paged.json['links']['meta']['total'])
+
+    def test_invalid_cursor_is_not_found(self):
+        res = self.app.get('/{}users/?page[cursor]=garbage'.format(API_BASE), expect_errors=True)
+        assert_equal(res.status_code, 404)
+
+    def test_walks_nodes_by_stored_ordering(self):
+        user = AuthUserFactory()
+        projects = [ProjectFactory(creator=user) for _ in range(3)]
+        url = '/{}nodes/?ordering=-date_created&page[size]=1&page[cursor]='.format(API_BASE)
+        res_ids = []
+        while url:
+            res = self.app.get(url, auth=user.auth)
+            res_ids.extend(each['id'] for each in res.json['data'])
+            url = res.json['links']['next']
+        assert_equal(sorted(res_ids), sorted(project._id for project in projects))
+
+    def test_page_number_pagination_is_unchanged(self):
+        res = self.app.get('/{}users/?page[size]=2'.format(API_BASE))
+        assert_in('total', res.json['links']['meta'])
+        assert_is_not_none(res.json['links']['last'])
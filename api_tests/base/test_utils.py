@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
 from nose.tools import *  # flake8: noqa
 
+from django.contrib.auth.models import AnonymousUser
+from modularodm import Q
 from rest_framework import fields
 
+from framework.mongo import database
+from website.models import Node
 from api.base import utils
 
 from tests.base import ApiTestCase
+from tests.factories import AuthUserFactory, NodeFactory, ProjectFactory, UserFactory
 
 
 class TruthyFalsyTestCase(ApiTestCase):
@@ -18,3 +23,46 @@ class TruthyFalsyTestCase(ApiTestCase):
 
     def test_falsy(self):
         assert_equal(utils.FALSY, fields.BooleanField.FALSE_VALUES)
+
+
+class TestGetVisibilityQuery(ApiTestCase):
+
+    def setUp(self):
+        super(TestGetVisibilityQuery, self).setUp()
+        self.user = AuthUserFactory()
+        self.public = ProjectFactory(is_public=True)
+        self.private = ProjectFactory()
+        self.contributed = ProjectFactory(creator=self.user)
+        self.child = NodeFactory(parent=ProjectFactory(creator=self.user), creator=UserFactory())
+        self.base_query = Q('is_deleted', 'ne', True) & Q('is_registration', 'eq', False)
+
+    def find_ids(self, user, query=None):
+        return set(node._id for node in Node.find(utils.get_visibility_query(user, query)))
+
+    def explain(self, query):
+        raw_query = Node._storage[0]._translate_query(query)
+        return repr(database['node'].find(raw_query).explain())
+
+    def test_anonymous_user_sees_public_nodes(self):
+        ids = self.find_ids(AnonymousUser())
+        assert_in(self.public._id, ids)
+        assert_not_in(self.private._id, ids)
+        assert_not_in(self.contributed._id, ids)
+
+    def test_user_sees_public_contributed_and_inherited_nodes(self):
+        ids = self.find_ids(self.user)
+        assert_in(self.public._id, ids)
+        assert_in(self.contributed._id, ids)
+        assert_in(self.child._id, ids)
+        assert_not_in(self.private._id, ids)
+
+    def test_query_restricts_every_branch(self):
+        ids = self.find_ids(self.user, Q('_id', 'eq', self.contributed._id))
+        assert_equal(ids, {self.contributed._id})
+
+    def test_no_collection_scan(self):
+        for user in (AnonymousUser(), self.user):
+            plan = self.explain(utils.get_visibility_query(user, self.base_query))
+            # TokuMX and MongoDB < 3.0 report BasicCursor, later versions COLLSCAN
+            assert_not_in('BasicCursor', plan)
+            assert_not_in('COLLSCAN', plan)
@@ -2,13 +2,18 @@ import json
 
 from nose.tools import *  # flake8: noqa
 import httpretty
+import mock
 
 from framework.auth.core import Auth
+from framework.mongo import database
 
 from website.addons.github import model
+from website.files.models import StoredFileNode
 from website.models import Node
 from website.util import waterbutler_api_url_for
+from api.base import waterbutler
 from api.base.settings.defaults import API_BASE
+from api.nodes.views import WaterButlerMixin
 from tests.base import ApiTestCase
 from tests.factories import (
     ProjectFactory,
@@ -296,6 +301,109 @@ class TestNodeFilesListFiltering(ApiTestCase):
         assert_equal(res.json['data'][0]['attributes']['name'], 'abc')
 
 
+class TestNodeFilesListOsfStorageFiltering(ApiTestCase):
+
+    def setUp(self):
+        super(TestNodeFilesListOsfStorageFiltering, self).setUp()
+        self.user = AuthUserFactory()
+        self.project = ProjectFactory(creator=self.user)
+        root = self.project.get_addon('osfstorage').get_root()
+        root.append_file('abc.txt')
+        root.append_file('xyz.txt')
+        root.append_folder('abc')
+        self.url = '/{}nodes/{}/files/osfstorage/'.format(API_BASE, self.project._id)
+
+    def test_filter_by_name_is_case_insensitive(self):
+        res = self.app.get(self.url + '?filter[name]=ABC', auth=self.user.auth)
+        names = [each['attributes']['name'] for each in res.json['data']]
+        assert_equal(sorted(names), ['abc', 'abc.txt'])
+        assert_equal(res.json['links']['meta']['total'], 2)
+
+    def test_filter_by_kind(self):
+        res = self.app.get(self.url + '?filter[kind]=file', auth=self.user.auth)
+        names = [each['attributes']['name'] for each in res.json['data']]
+        assert_equal(sorted(names), ['abc.txt', 'xyz.txt'])
+
+    def test_filter_by_stored_and_computed_fields(self):
+        # path is computed for osfstorage files, so it is filtered in Python
+        res = self.app.get(self.url + '?filter[name]=abc&filter[path]=missing', auth=self.user.auth)
+        assert_equal(res.json['data'], [])
+
+    def test_ordering_is_applied_in_the_query(self):
+        res = self.app.get(self.url + '?ordering=-name', auth=self.user.auth)
+        names = [each['attributes']['name'] for each in res.json['data']]
+        assert_equal(names, ['xyz.txt', 'abc.txt', 'abc'])
+
+    def test_default_ordering_is_by_materialized_path(self):
+        # Saved before materialized paths were stored
+        database['storedfilenode'].update(
+            {'node': self.project._id, 'name': 'xyz.txt'},
+            {'$set': {'materialized_path': ''}},
+        )
+        StoredFileNode._clear_caches()
+        res = self.app.get(self.url, auth=self.user.auth)
+        names = [each['attributes']['name'] for each in res.json['data']]
+        assert_equal(names, ['abc.txt', 'abc', 'xyz.txt'])
+
+
+class TestNodeFilesListCache(ApiTestCase):
+
+    def setUp(self):
+        super(TestNodeFilesListCache, self).setUp()
+        waterbutler.metadata_cache.clear()
+        self.user = AuthUserFactory()
+        self.project = ProjectFactory(creator=self.user)
+        self.url = '/{}nodes/{}/files/github/'.format(API_BASE, self.project._id)
+        self.requests = []
+        self.body = json.dumps({'data': [
+            {'attributes': {
+                'name': 'abc', 'path': '/abc/', 'materialized': '/abc/', 'kind': 'folder', 'provider': 'github',
+            }},
+        ]})
+        httpretty.enable()
+        httpretty.register_uri(
+            httpretty.GET,
+            waterbutler_api_url_for(self.project._id, provider='github', path='/', meta=True),
+            body=self.respond,
+        )
+
+    def tearDown(self):
+        super(TestNodeFilesListCache, self).tearDown()
+        httpretty.disable()
+        httpretty.reset()
+        waterbutler.metadata_cache.clear()
+
+    def respond(self, request, uri, headers):
+        self.requests.append(request)
+        if request.headers.get('If-None-Match') == '"v1"':
+            return 304, headers, ''
+        headers.update({'ETag': '"v1"', 'Content-Type': 'application/json'})
+        return 200, headers, self.body
+
+    def test_repeat_listing_is_served_from_cache(self):
+        first = self.app.get(self.url, auth=self.user.auth)
+        second = self.app.get(self.url, auth=self.user.auth)
+        assert_equal(len(self.requests), 1)
+        assert_equal(first.json['data'], second.json['data'])
+
+    @mock.patch.object(waterbutler.settings, 'WATERBUTLER_METADATA_CACHE_TTL', 0)
+    def test_stale_listing_is_revalidated(self):
+        with mock.patch.object(WaterButlerMixin, 'get_file_item', autospec=True, side_effect=WaterButlerMixin.get_file_item) as mock_get:
+            self.app.get(self.url, auth=self.user.auth)
+            assert_equal(mock_get.call_count, 1)
+            res = self.app.get(self.url, auth=self.user.auth)
+            # Unchanged items are loaded in bulk rather than updated one by one
+            assert_equal(mock_get.call_count, 1)
+        assert_equal(len(self.requests), 2)
+        assert_equal(self.requests[1].headers.get('If-None-Match'), '"v1"')
+        assert_equal(res.json['data'][0]['attributes']['name'], 'abc')
+
+    def test_cached_listing_checks_permissions(self):
+        self.app.get(self.url, auth=self.user.auth)
+        res = self.app.get(self.url, auth=AuthUserFactory().auth, expect_errors=True)
+        assert_equal(res.status_code, 403)
+
+
 class TestNodeFilesListPagination(ApiTestCase):
     def setUp(self):
         super(TestNodeFilesListPagination, self).setUp()
@@ -312,7 +420,7 @@ class TestNodeFilesListPagination(ApiTestCase):
         previous_file_name = 0
         for file in resp.json['data']:
             int_file_name = int(file['attributes']['name'])
-            assert(int_file_name > previous_file_name, 'Files were not in order')
+            assert_greater(int_file_name, previous_file_name, 'Files were not in order')
             previous_file_name = int_file_name
 
     def test_node_files_are_sorted_correctly(self):
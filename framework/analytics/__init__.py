@@ -2,13 +2,17 @@
 # encoding: utf-8
 
 import functools
+import collections
 from datetime import datetime
 
 from framework.mongo import database
 from framework.sessions import session
+from framework.analytics.buffer import counter_buffer
 
 from flask import request
 
+from website import settings
+
 
 collection = database['pagecounters']
 
@@ -25,6 +29,9 @@ def increment_user_activity_counters(user_id, action, date, db=None):
             'action.{0}.date.{1}'.format(action, date): 1,
         }
     }
+    if settings.ANALYTICS_BUFFER_ENABLED:
+        counter_buffer.add('useractivitycounters', user_id, query['$inc'])
+        return True
     collection.update(
         {'_id': user_id},
         query,
@@ -72,6 +79,15 @@ def build_page(rex, kwargs):
         return None
 
 
+def remember_page(pages, page):
+    """Append ``page`` to a session's list of visited pages, dropping the
+    oldest entries beyond ``SESSION_MAX_VISITED_PAGES``.
+    """
+    pages.append(page)
+    del pages[:-settings.SESSION_MAX_VISITED_PAGES]
+    return pages
+
+
 def update_counter(page, db=None):
     """Update counters for page.
 
@@ -95,13 +111,13 @@ def update_counter(page, db=None):
     if date == visited_by_date['date']:
         if page not in visited_by_date['pages']:
             d['$inc']['date.%s.unique' % date] = 1
-            visited_by_date['pages'].append(page)
+            remember_page(visited_by_date['pages'], page)
             session.data['visited_by_date'] = visited_by_date
     else:
         visited_by_date['date'] = date
         visited_by_date['pages'] = []
         d['$inc']['date.%s.unique' % date] = 1
-        visited_by_date['pages'].append(page)
+        remember_page(visited_by_date['pages'], page)
         session.data['visited_by_date'] = visited_by_date
 
     d['$inc']['date.%s.total' % date] = 1
@@ -111,10 +127,14 @@ def update_counter(page, db=None):
         visited = []
     if page not in visited:
         d['$inc']['unique'] = 1
-        visited.append(page)
+        remember_page(visited, page)
         session.data['visited'] = visited
     d['$inc']['total'] = 1
-    collection.update({'_id': page}, d, True, False)
+    # Uniqueness is decided above from the session, so only the write is deferred
+    if settings.ANALYTICS_BUFFER_ENABLED:
+        counter_buffer.add('pagecounters', page, d['$inc'])
+    else:
+        collection.update({'_id': page}, d, True, False)
 
 
 def update_counters(rex, db=None):
@@ -154,3 +174,28 @@ def get_basic_counters(page, db=None):
         return unique, total
     else:
         return None, None
+
+
+def get_basic_counters_many(pages, db=None):
+    """Look up the counters of several pages with a single query.
+
+    :param pages: Page keys, as passed to `get_basic_counters`
+    :return dict: Mapping from each page to its ``(unique, total)`` counts,
+        or ``(None, None)`` if the page has no counters
+    """
+    db = db or database
+    pages = list(pages)
+    keys = collections.defaultdict(list)
+    for page in pages:
+        keys[clean_page(page)].append(page)
+    ret = dict((page, (None, None)) for page in pages)
+    if not keys:
+        return ret
+    results = db['pagecounters'].find(
+        {'_id': {'$in': list(keys)}},
+        {'total': 1, 'unique': 1}
+    )
+    for result in results:
+        for page in keys[result['_id']]:
+            ret[page] = (result.get('unique', 0), result.get('total', 0))
+    return ret
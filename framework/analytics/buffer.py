@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""In-process aggregation of analytics counter increments.
+
+Page views and user activity increment the same few documents many times a
+minute. With ``ANALYTICS_BUFFER_ENABLED``, increments are summed per
+document in memory and written by a background thread every
+``ANALYTICS_FLUSH_INTERVAL`` seconds, one `$inc` upsert per document, so a
+popular page costs one write per interval rather than one per view.
+Increments still pending when the process exits are flushed at exit.
+"""
+import os
+import atexit
+import logging
+import threading
+import collections
+
+from framework.mongo import database
+
+from website import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer(object):
+    """Accumulate `$inc` updates per document and write them in batches.
+
+    :param float interval: Seconds between background flushes
+    :param int max_keys: Flush immediately once this many documents are pending
+    """
+    def __init__(self, interval=None, max_keys=None, db=None):
+        self.interval = interval or settings.ANALYTICS_FLUSH_INTERVAL
+        self.max_keys = max_keys or settings.ANALYTICS_BUFFER_MAX_KEYS
+        self.db = db
+        self.stats = collections.Counter()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def add(self, collection, doc_id, increments):
+        """Queue ``increments``, a mapping from field path to amount, for the
+        document ``doc_id`` in ``collection``.
+        """
+        if self._stopped.is_set():
+            # Arrived after shutdown; write directly and report
+            self.stats['late'] += sum(increments.values())
+            self._write(collection, doc_id, increments)
+            return
+        self._ensure_started()
+        with self._lock:
+            counter = self._pending.setdefault((collection, doc_id), collections.Counter())
+            counter.update(increments)
+            full = len(self._pending) >= self.max_keys
+        if full:
+            self.flush()
+
+    def _write(self, collection, doc_id, increments):
+        db = self.db or database
+        db[collection].update(
+            {'_id': doc_id},
+            {'$inc': dict(increments)},
+            upsert=True,
+            manipulate=False,
+        )
+
+    def flush(self):
+        """Write all pending increments.
+
+        :return int: Number of documents updated
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        written = 0
+        for (collection, doc_id), increments in pending.iteritems():
+            try:
+                self._write(collection, doc_id, increments)
+            except Exception:
+                self.stats['dropped'] += sum(increments.values())
+                logger.exception('Failed to write analytics counters for {0}'.format(doc_id))
+            else:
+                self.stats['flushed'] += sum(increments.values())
+                written += 1
+        return written
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.flush()
+
+    def _ensure_started(self):
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid:
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == pid:
+                return
+            if self._pid is not None:
+                # Forked: increments buffered before the fork belong to the parent
+                self._pending = {}
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name='analytics-counter-buffer')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and flush what remains, logging how
+        many increments were written late or lost.
+        """
+        self._stopped.set()
+        remaining = self.flush()
+        if remaining:
+            logger.info('Flushed analytics counters for {0} documents at shutdown'.format(remaining))
+        if self.stats['dropped'] or self.stats['late']:
+            logger.warning(
+                'Analytics counters: {dropped} increments dropped, {late} written after shutdown'.format(
+                    dropped=self.stats['dropped'],
+                    late=self.stats['late'],
+                )
+            )
+
+
+counter_buffer = CounterBuffer()
+atexit.register(counter_buffer.stop)
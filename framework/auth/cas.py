@@ -11,6 +11,7 @@ from framework.auth import User
 from framework.auth import authenticate
 from framework.flask import redirect
 from framework.exceptions import HTTPError
+from framework.utils import TTLCache
 
 
 class CasError(HTTPError):
@@ -48,11 +49,26 @@ class CasResponse(object):
         self.attributes = attributes or {}
 
 
+# Profiles of recently seen bearer tokens, keyed by access token
+profile_cache = TTLCache(settings.CAS_PROFILE_CACHE_TTL, settings.CAS_PROFILE_CACHE_SIZE)
+
+_session = None
+
+
+def get_session():
+    """Return the keep-alive session shared by CAS clients."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+
 class CasClient(object):
     """HTTP client for the CAS server."""
 
-    def __init__(self, base_url):
+    def __init__(self, base_url, session=None):
         self.BASE_URL = base_url
+        self.session = session or get_session()
 
     def get_login_url(self, service_url, auto=False, username=None, password=None, verification_key=None, otp=None):
         url = furl.furl(self.BASE_URL)
@@ -100,26 +116,35 @@ class CasClient(object):
         url.args['ticket'] = ticket
         url.args['service'] = service_url
 
-        resp = requests.get(url.url)
+        resp = self.session.get(url.url)
         if resp.status_code == 200:
             return self._parse_service_validation(resp.content)
         else:
             self._handle_error(resp)
 
-    def profile(self, access_token):
+    def profile(self, access_token, use_cache=True):
         """Send request to get profile information, given an access token.
+        Successful responses are cached for ``CAS_PROFILE_CACHE_TTL`` seconds,
+        or until the token is revoked through `revoke_tokens`.
 
         :param str access_token: CAS access_token.
+        :param bool use_cache: Whether to reuse a cached response
         :rtype: CasResponse
         :raises: CasError if an unexpected response is returned.
         """
+        if use_cache:
+            cached = profile_cache.get(access_token)
+            if cached is not None:
+                return cached
         url = self.get_profile_url()
         headers = {
             'Authorization': 'Bearer {}'.format(access_token),
         }
-        resp = requests.get(url, headers=headers)
+        resp = self.session.get(url, headers=headers)
         if resp.status_code == 200:
-            return self._parse_profile(resp.content, access_token)
+            cas_resp = self._parse_profile(resp.content, access_token)
+            profile_cache.set(access_token, cas_resp)
+            return cas_resp
         else:
             self._handle_error(resp)
 
@@ -164,9 +189,14 @@ class CasClient(object):
 
     def revoke_tokens(self, payload):
         """Revoke a tokens based on payload"""
+        # Forget cached profiles first, even if CAS rejects the request
+        if 'token' in payload:
+            profile_cache.delete(payload['token'])
+        else:
+            profile_cache.clear()
         url = self.get_auth_token_revocation_url()
 
-        resp = requests.post(url, data=payload)
+        resp = self.session.post(url, data=payload)
         if resp.status_code == 204:
             return True
         else:
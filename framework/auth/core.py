@@ -1,12 +1,13 @@
 # -*- coding: utf-8 -*-
 import datetime as dt
-import itertools
+import hashlib
+import hmac
 import logging
 import re
 import urlparse
 
-import bson
 import pytz
+import pymongo
 import itsdangerous
 
 from modularodm import fields, Q
@@ -23,11 +24,13 @@ from framework.auth.exceptions import (ChangePasswordError, ExpiredTokenError, I
 from framework.bcrypt import generate_password_hash, check_password_hash
 from framework.exceptions import PermissionsError
 from framework.guid.model import GuidStoredObject
+from framework.mongo import database
 from framework.mongo.validators import string_required
 from framework.sentry import log_exception
 from framework.sessions import session
 from framework.sessions.model import Session
 from framework.sessions.utils import remove_sessions_for_user
+from framework.utils import TTLCache
 
 from website import mails, settings, filters, security
 
@@ -102,6 +105,34 @@ def _get_current_user():
     return User.load(uid)
 
 
+# Users whose email and password were recently verified, keyed by an HMAC of
+# the credentials; see `get_user`
+credential_cache = TTLCache(settings.CREDENTIAL_CACHE_TTL, settings.CREDENTIAL_CACHE_SIZE)
+
+
+def _credential_key(email, password):
+    # Basic auth credentials arrive as byte strings, which may not be ASCII
+    message = b'\0'.join(
+        value.encode('utf-8') if isinstance(value, unicode) else value
+        for value in (email, password)
+    )
+    return hmac.new(settings.SECRET_KEY, message, hashlib.sha256).hexdigest()
+
+
+def _get_verified_user(email, password):
+    """Return the user whose credentials were recently verified, unless the
+    password or email has since changed.
+    """
+    cached = credential_cache.get(_credential_key(email, password))
+    if cached is None:
+        return None
+    user_id, password_hash = cached
+    user = User.load(user_id)
+    if user and user.password == password_hash and (email == user.username or email in user.emails):
+        return user
+    return None
+
+
 # TODO: This should be a class method of User?
 def get_user(email=None, password=None, verification_key=None):
     """Get an instance of User matching the provided params.
@@ -120,6 +151,11 @@ def get_user(email=None, password=None, verification_key=None):
         query_list.append(Q('emails', 'eq', email) | Q('username', 'eq', email))
     if password:
         password = password.strip()
+        if email:
+            # Skip the bcrypt check for credentials verified moments ago
+            user = _get_verified_user(email, password)
+            if user:
+                return user
         try:
             query = query_list[0]
             for query_part in query_list[1:]:
@@ -130,6 +166,8 @@ def get_user(email=None, password=None, verification_key=None):
             user = None
         if user and not user.check_password(password):
             return False
+        if user and email:
+            credential_cache.set(_credential_key(email, password), (user._id, user.password))
         return user
     if verification_key:
         query_list.append(Q('verification_key', 'eq', verification_key))
@@ -202,6 +240,15 @@ class User(GuidStoredObject, AddonModelMixin):
         'researcherId': u'http://researcherid.com/rid/{}',
     }
 
+    __indices__ = [{
+        # Keyset pagination on date_registered; see `api.base.pagination`
+        'unique': False,
+        'key_or_list': [
+            ('date_registered', pymongo.ASCENDING),
+            ('_id', pymongo.ASCENDING),
+        ]
+    }]
+
     # This is a GuidStoredObject, so this will be a GUID.
     _id = fields.StringField(primary=True)
 
@@ -624,6 +671,19 @@ class User(GuidStoredObject, AddonModelMixin):
         """Set the password for this user to the hash of ``raw_password``."""
         self.password = generate_password_hash(raw_password)
 
+    def update_date_last_login(self, now=None):
+        """Record a login, writing only `date_last_login` and at most once per
+        ``DATE_LAST_LOGIN_THROTTLE``.
+
+        :return bool: Whether the date was written
+        """
+        now = now or dt.datetime.utcnow()
+        if self.date_last_login and now - self.date_last_login < settings.DATE_LAST_LOGIN_THROTTLE:
+            return False
+        self.date_last_login = now
+        database['user'].update({'_id': self._id}, {'$set': {'date_last_login': now}})
+        return True
+
     def check_password(self, raw_password):
         """Return a boolean of whether ``raw_password`` was correct."""
         if not self.password or not raw_password:
@@ -1110,22 +1170,29 @@ class User(GuidStoredObject, AddonModelMixin):
 
         :rtype: generator of log ids (strings)
         '''
-        log_ids = []
-        # Default since to 60 days before today if since is None
+        from website.project import feeds
+        return (
+            log._id for log in
+            feeds.iter_logs(self.get_watched_node_ids(), since=self.get_feed_since(since))
+        )
+
+    def get_watched_node_ids(self):
+        '''Return the primary keys of the nodes this user watches.'''
+        from website.project.model import WatchConfig
+        configs = WatchConfig.load_many(self.watched._to_primary_keys())
+        return [config.to_storage()['node'] for config in configs]
+
+    @staticmethod
+    def get_feed_since(since=None):
+        '''Return ``since`` as a naive UTC datetime, as log dates are stored,
+        defaulting to 60 days before today.
+
+        :param since: A tz-aware datetime or ``None``
+        '''
         # timezone aware utcnow
         utcnow = dt.datetime.utcnow().replace(tzinfo=pytz.utc)
         since_date = since or (utcnow - dt.timedelta(days=60))
-        for config in self.watched:
-            # Extract the timestamps for each log from the log_id (fast!)
-            # The first 4 bytes of Mongo's ObjectId encodes time
-            # This prevents having to load each Log Object and access their
-            # date fields
-            node_log_ids = [log_id for log_id in config.node.logs._to_primary_keys()
-                                   if bson.ObjectId(log_id).generation_time > since_date and
-                                   log_id not in log_ids]
-            # Log ids in reverse chronological order
-            log_ids = _merge_into_reversed(log_ids, node_log_ids)
-        return (l_id for l_id in log_ids)
+        return since_date.astimezone(pytz.utc).replace(tzinfo=None)
 
     def get_daily_digest_log_ids(self):
         '''Return a generator of log ids generated in the past day
@@ -1312,9 +1379,3 @@ class User(GuidStoredObject, AddonModelMixin):
     def n_projects_in_common(self, other_user):
         """Returns number of "shared projects" (projects that both users are contributors for)"""
         return len(self.get_projects_in_common(other_user, primary_keys=True))
-
-
-def _merge_into_reversed(*iterables):
-    '''Merge multiple sorted inputs into a single output in reverse order.
-    '''
-    return sorted(itertools.chain(*iterables), reverse=True)
@@ -1,5 +1,6 @@
 import smtplib
 import logging
+import threading
 from email.mime.text import MIMEText
 
 from framework.tasks import app
@@ -8,6 +9,25 @@ from website import settings
 logger = logging.getLogger(__name__)
 
 
+def _make_message(from_addr, to_addr, subject, message, mimetype):
+    msg = MIMEText(message, mimetype, _charset='utf-8')
+    msg['Subject'] = subject
+    msg['From'] = from_addr
+    msg['To'] = to_addr
+    return msg
+
+
+def _connect(mail_server, ttls, login, username, password):
+    s = smtplib.SMTP(mail_server)
+    s.ehlo()
+    if ttls:
+        s.starttls()
+        s.ehlo()
+    if login:
+        s.login(username, password)
+    return s
+
+
 @app.task
 def send_email(from_addr, to_addr, subject, message, mimetype='html', ttls=True, login=True,
                 username=None, password=None, mail_server=None):
@@ -32,18 +52,9 @@ def send_email(from_addr, to_addr, subject, message, mimetype='html', ttls=True,
         logger.error('Mail username and password not set; skipping send.')
         return
 
-    msg = MIMEText(message, mimetype, _charset='utf-8')
-    msg['Subject'] = subject
-    msg['From'] = from_addr
-    msg['To'] = to_addr
+    msg = _make_message(from_addr, to_addr, subject, message, mimetype)
 
-    s = smtplib.SMTP(mail_server)
-    s.ehlo()
-    if ttls:
-        s.starttls()
-        s.ehlo()
-    if login:
-        s.login(username, password)
+    s = _connect(mail_server, ttls, login, username, password)
     s.sendmail(
         from_addr=from_addr,
         to_addrs=[to_addr],
@@ -51,3 +62,73 @@ def send_email(from_addr, to_addr, subject, message, mimetype='html', ttls=True,
     )
     s.quit()
     return True
+
+
+class SMTPSender(object):
+    """Send many emails synchronously, reusing one SMTP connection per
+    thread instead of connecting for every message. Safe to share between
+    the threads of a pool.
+
+    Example: ::
+
+        sender = SMTPSender()
+        try:
+            for to_addr, subject, message in messages:
+                sender.send(settings.FROM_EMAIL, to_addr, subject, message)
+        finally:
+            sender.close()
+    """
+    def __init__(self, mail_server=None, username=None, password=None, ttls=None, login=None):
+        self.mail_server = mail_server or settings.MAIL_SERVER
+        self.username = username or settings.MAIL_USERNAME
+        self.password = password or settings.MAIL_PASSWORD
+        # Don't use ttls and login in DEBUG_MODE, as in `website.mails.send_mail`
+        self.ttls = ttls if ttls is not None else not settings.DEBUG_MODE
+        self.login = login if login is not None else not settings.DEBUG_MODE
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def _get_connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = _connect(self.mail_server, self.ttls, self.login, self.username, self.password)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _discard_connection(self):
+        connection = self._local.connection
+        self._local.connection = None
+        with self._lock:
+            self._connections.remove(connection)
+
+    def send(self, from_addr, to_addr, subject, message, mimetype='html'):
+        """Send a message, reconnecting once if the server has closed the
+        connection since the last message.
+
+        :return: True if sent, None if email is disabled or not configured
+        """
+        if not settings.USE_EMAIL:
+            return
+        if self.login and (self.username is None or self.password is None):
+            logger.error('Mail username and password not set; skipping send.')
+            return
+        msg = _make_message(from_addr, to_addr, subject, message, mimetype).as_string()
+        try:
+            self._get_connection().sendmail(from_addr, [to_addr], msg)
+        except smtplib.SMTPServerDisconnected:
+            self._discard_connection()
+            self._get_connection().sendmail(from_addr, [to_addr], msg)
+        return True
+
+    def close(self):
+        """Close the connections of all threads."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            try:
+                connection.quit()
+            except smtplib.SMTPException:
+                pass
@@ -5,7 +5,8 @@ from modularodm.storedobject import StoredObject as GenericStoredObject
 from modularodm.ext.concurrency import with_proxies, proxied_members
 
 from bson import ObjectId
-from .handlers import client, database, set_up_storage
+from . import batch
+from .handlers import client, client_manager, database, set_up_storage
 
 
 from api.base.api_globals import api_globals
@@ -33,13 +34,28 @@ def get_cache_key():
 
 @with_proxies(proxied_members, get_cache_key)
 class StoredObject(GenericStoredObject):
-    pass
+
+    @classmethod
+    def load_many(cls, keys):
+        """Load records by primary key with one `$in` query per batch of
+        uncached keys. See `framework.mongo.batch.load_many`.
+        """
+        return batch.load_many(cls, keys)
+
+    @classmethod
+    def prefetch(cls, instances, field_names):
+        """Warm the request cache with the records referenced by
+        ``field_names`` on ``instances``. See `framework.mongo.batch.prefetch`.
+        """
+        return batch.prefetch(cls, instances, field_names)
 
 
 __all__ = [
     'StoredObject',
     'ObjectId',
     'client',
+    'client_manager',
     'database',
+    'get_cache_key',
     'set_up_storage',
 ]
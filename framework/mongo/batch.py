@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Batched loading of modular-odm records. Loaded records are placed in the
+request-local object cache set up by ``with_proxies``, so subsequent calls to
+``Model.load(pk)`` within the same request are served without a query.
+"""
+import collections
+
+from modularodm import Q
+
+
+# Maximum number of primary keys sent in a single `$in` query
+BATCH_SIZE = 1000
+
+
+def _is_cached(model, key):
+    return model._load_from_cache(key) is not None
+
+
+def load_many(model, keys, batch_size=BATCH_SIZE):
+    """Load records of ``model`` by primary key, issuing one `$in` query per
+    ``batch_size`` keys that are not already cached.
+
+    :param type model: StoredObject subclass
+    :param keys: Iterable of primary keys
+    :return list: Loaded records in the order of ``keys``; missing records
+        are omitted
+    """
+    keys = [key for key in keys if key is not None]
+    missing = []
+    seen = set()
+    for key in keys:
+        if key not in seen and not _is_cached(model, key):
+            missing.append(key)
+        seen.add(key)
+    for start in xrange(0, len(missing), batch_size):
+        chunk = missing[start:start + batch_size]
+        # Iterating the queryset places each record in the object cache
+        list(model.find(Q(model._primary_name, 'in', chunk)))
+    loaded = (model.load(key) for key in keys)
+    return [record for record in loaded if record is not None]
+
+
+class BatchLoader(object):
+    """Collect pending primary keys per model and load them together.
+
+    Example: ::
+
+        loader = BatchLoader()
+        for log in logs:
+            loader.add(User, log.params.get('user'))
+        loader.flush()  # One query for all users
+    """
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self._pending = collections.OrderedDict()
+
+    def add(self, model, key):
+        if key is not None:
+            self._pending.setdefault(model, collections.OrderedDict())[key] = None
+
+    def add_many(self, model, keys):
+        for key in keys:
+            self.add(model, key)
+
+    def flush(self):
+        """Load all pending keys, one `$in` query per collection and batch.
+
+        :return dict: Mapping from model to list of loaded records
+        """
+        pending, self._pending = self._pending, collections.OrderedDict()
+        return {
+            model: load_many(model, keys.keys(), batch_size=self.batch_size)
+            for model, keys in pending.iteritems()
+        }
+
+
+def _foreign_field(model, field_name):
+    field = model._fields[field_name]
+    # List fields wrap the field describing their items
+    return getattr(field, '_field_instance', field)
+
+
+def _foreign_keys(instance, field_name):
+    if hasattr(instance._fields[field_name], '_field_instance'):
+        return getattr(instance, field_name)._to_primary_keys()
+    # Read the stored key; attribute access would load the record itself
+    return [instance.to_storage().get(field_name)]
+
+
+def prefetch(model, instances, field_names, batch_size=BATCH_SIZE):
+    """Load the records referenced by ``field_names`` on each of ``instances``
+    with one query per referenced collection.
+
+    Example: ::
+
+        Node.prefetch(nodes, ['contributors', 'logs', 'tags'])
+
+    :param type model: StoredObject subclass of ``instances``
+    :param instances: Iterable of ``model`` records
+    :param field_names: Names of foreign fields or foreign list fields
+    """
+    instances = [instance for instance in instances if instance is not None]
+    loader = BatchLoader(batch_size=batch_size)
+    for field_name in field_names:
+        base_class = _foreign_field(model, field_name).base_class
+        for instance in instances:
+            loader.add_many(base_class, _foreign_keys(instance, field_name))
+    return loader.flush()
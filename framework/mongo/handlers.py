@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import os
 import logging
+import threading
 
 import pymongo
 from flask import g
@@ -15,7 +17,10 @@ logger = logging.getLogger(__name__)
 def get_mongo_client():
     """Create MongoDB client and authenticate database.
     """
-    client = pymongo.MongoClient(settings.DB_HOST, settings.DB_PORT)
+    kwargs = {'max_pool_size': settings.DB_MAX_POOL_SIZE}
+    if settings.DB_WAIT_QUEUE_TIMEOUT_MS is not None:
+        kwargs['waitQueueTimeoutMS'] = settings.DB_WAIT_QUEUE_TIMEOUT_MS
+    client = pymongo.MongoClient(settings.DB_HOST, settings.DB_PORT, **kwargs)
 
     db = client[settings.DB_NAME]
 
@@ -25,20 +30,101 @@ def get_mongo_client():
     return client
 
 
+class MongoClientManager(object):
+    """Own a single pooled `MongoClient` per process. The client is built
+    lazily and rebuilt whenever the current pid differs from the pid that
+    built it, so that gunicorn and celery prefork workers never share sockets
+    with their parent.
+
+    Requests pin a pooled socket to the current thread for their duration
+    (TokuMX transactions are bound to a connection) and return it to the pool
+    when they end.
+
+    :param factory: Callable returning a new `MongoClient`
+    """
+    def __init__(self, factory=get_mongo_client):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._client = None
+        self._pid = None
+        self._clients_created = 0
+        self._requests_active = 0
+        self._requests_peak = 0
+        self._requests_total = 0
+
+    @property
+    def client(self):
+        pid = os.getpid()
+        if self._client is None or self._pid != pid:
+            with self._lock:
+                if self._client is None or self._pid != pid:
+                    self._reset(pid)
+        return self._client
+
+    def _reset(self, pid):
+        # Don't close a client inherited across a fork; its sockets belong to
+        # the parent process
+        self._client = self._factory()
+        self._pid = pid
+        self._clients_created += 1
+        self._requests_active = 0
+        self._requests_peak = 0
+        self._requests_total = 0
+
+    def start_request(self):
+        """Pin a pooled socket to the current thread."""
+        self.client.start_request()
+        with self._lock:
+            self._requests_active += 1
+            self._requests_total += 1
+            self._requests_peak = max(self._requests_peak, self._requests_active)
+
+    def end_request(self):
+        """Return the socket pinned by `start_request` to the pool."""
+        self.client.end_request()
+        with self._lock:
+            self._requests_active = max(self._requests_active - 1, 0)
+
+    def stats(self):
+        """Return a dict of pool statistics for the current process.
+        """
+        client = self.client
+        pool = getattr(client, '_MongoClient__pool', None)
+        idle_sockets = getattr(pool, 'sockets', None)
+        return {
+            'pid': self._pid,
+            'max_pool_size': settings.DB_MAX_POOL_SIZE,
+            'wait_queue_timeout_ms': settings.DB_WAIT_QUEUE_TIMEOUT_MS,
+            'clients_created': self._clients_created,
+            'requests_active': self._requests_active,
+            'requests_peak': self._requests_peak,
+            'requests_total': self._requests_total,
+            'idle_sockets': len(idle_sockets) if idle_sockets is not None else None,
+        }
+
+
+client_manager = MongoClientManager()
+
+
 def connection_before_request():
-    """Attach MongoDB client to `g`.
+    """Pin a pooled MongoDB socket to the request's thread.
     """
-    g._mongo_client = get_mongo_client()
+    client_manager.start_request()
+    g._mongo_request_started = True
 
 
 def connection_teardown_request(error=None):
-    """Close MongoDB client if attached to `g`.
+    """Release the pooled MongoDB socket pinned for the request.
     """
     try:
-        g._mongo_client.close()
+        started = g._mongo_request_started
     except AttributeError:
         if not settings.DEBUG_MODE:
-            logger.error('MongoDB client not attached to request.')
+            logger.error('MongoDB request not started.')
+        return
+    if started:
+        client_manager.end_request()
+        g._mongo_request_started = False
 
 
 handlers = {
@@ -47,18 +133,11 @@ handlers = {
 }
 
 
-# Set up getters for `LocalProxy` objects
-_mongo_client = get_mongo_client()
-
-
 def _get_current_client():
-    """Getter for `client` proxy. Return default client if no client attached
-    to `g` or no request context.
+    """Getter for `client` proxy. Return the pooled client for the current
+    process.
     """
-    try:
-        return g._mongo_client
-    except (AttributeError, RuntimeError):
-        return _mongo_client
+    return client_manager.client
 
 
 def _get_current_database():
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""Compare the indices declared by models with the queries Mongo actually runs.
+
+Models declare their compound indices in `__indices__`, which `set_up_storage`
+creates. `advise` reads the profiler log (`system.profile`, filled once
+profiling is enabled) and reports:
+
+* query shapes that no index serves, by total time spent;
+* indices that no profiled query could use;
+* declared indices missing from the database.
+
+Only queries slower than the profiler's threshold are logged, so "unused"
+means unused by the slow queries sampled, not unused altogether.
+
+Example: ::
+
+    report = advise(database, get_index_catalogue(MODELS))
+    print(format_report(report))
+"""
+import collections
+
+from bson.son import SON
+
+LOGICAL_OPERATORS = ('$and', '$or', '$nor')
+
+
+def normalize_keys(key_or_list):
+    """Return the field names of an index specification, in order."""
+    if isinstance(key_or_list, basestring):
+        return (key_or_list, )
+    return tuple(key for key, direction in key_or_list)
+
+
+def get_index_catalogue(schemas, prefix=''):
+    """Map each collection to the indices declared by its schema.
+
+    :return dict: Collection name to a list of tuples of field names
+    """
+    catalogue = collections.defaultdict(list)
+    for schema in schemas:
+        collection = '{0}{1}'.format(prefix, schema._name)
+        for index in getattr(schema, '__indices__', []):
+            catalogue[collection].append(normalize_keys(index['key_or_list']))
+    return catalogue
+
+
+def get_database_indices(db, collection):
+    """Return the indices that exist on ``collection``, except the one on `_id`."""
+    return [
+        normalize_keys(info['key'])
+        for name, info in db[collection].index_information().iteritems()
+        if name != '_id_'
+    ]
+
+
+def get_query_fields(query):
+    """Return the set of fields a query document filters on, including inside
+    `$and`, `$or` and `$nor`.
+    """
+    fields = set()
+    for key, value in (query or {}).iteritems():
+        if key in LOGICAL_OPERATORS:
+            for clause in value:
+                fields |= get_query_fields(clause)
+        elif not key.startswith('$'):
+            fields.add(key)
+    return fields
+
+
+def parse_profile_entry(entry):
+    """Extract the collection, filter and sort of a profiler entry, across the
+    formats logged by MongoDB 2.4 to 3.2 and TokuMX.
+
+    :return tuple: (collection, filter, sort), or None for entries without a query
+    """
+    collection = entry.get('ns', '').split('.', 1)[-1]
+    op = entry.get('op')
+    command = entry.get('command') or {}
+    query = entry.get('query') or {}
+    sort = {}
+    if op == 'command' and 'count' in command:
+        collection, query = command['count'], command.get('query') or {}
+    elif op not in ('query', 'update', 'remove', 'getmore'):
+        return None
+    if 'filter' in query:
+        query, sort = query['filter'], query.get('sort') or {}
+    elif '$query' in query or 'query' in query and isinstance(query['query'], dict):
+        sort = query.get('$orderby') or query.get('orderby') or {}
+        query = query.get('$query', query.get('query'))
+    return collection, query, sort
+
+
+def serves(index, fields, sort):
+    """Whether an index can be used for a query on ``fields`` sorted by ``sort``:
+    its leading field must be filtered on or, failing that, be the first sort
+    key. ``sort`` must keep its key order, e.g. a SON or a tuple of keys.
+    """
+    if index[0] in fields:
+        return True
+    return bool(sort) and index[0] == next(iter(sort))
+
+
+QueryShape = collections.namedtuple('QueryShape', ['collection', 'fields', 'sort'])
+
+
+def advise(db, catalogue, entries=None, min_millis=0):
+    """Compare profiled queries with the declared and existing indices.
+
+    :param db: pymongo Database
+    :param dict catalogue: Output of `get_index_catalogue`
+    :param entries: Profiler entries, as SON; by default read from ``db.system.profile``
+    :param int min_millis: Ignore queries faster than this
+    :return dict: With keys `missing` (list of (shape, count, millis), slowest
+        first), `unused` and `unapplied` (lists of (collection, index))
+    """
+    if entries is None:
+        # As SON, so that the order of sort keys is kept
+        entries = db['system.profile'].find({'millis': {'$gte': min_millis}}, as_class=SON)
+    stats = collections.defaultdict(lambda: [0, 0])
+    seen = collections.defaultdict(list)
+    for entry in entries:
+        if entry.get('millis', 0) < min_millis:
+            continue
+        parsed = parse_profile_entry(entry)
+        if parsed is None:
+            continue
+        collection, query, sort = parsed
+        shape = QueryShape(collection, tuple(sorted(get_query_fields(query))), tuple(sort))
+        stats[shape][0] += 1
+        stats[shape][1] += entry.get('millis', 0)
+        seen[collection].append(shape)
+
+    existing = {}
+    for collection in set(seen) | set(catalogue):
+        existing[collection] = get_database_indices(db, collection)
+
+    missing = []
+    for shape, (count, millis) in stats.iteritems():
+        candidates = existing[shape.collection] + catalogue.get(shape.collection, [])
+        if not shape.fields and not shape.sort:
+            continue  # Unfiltered scans are not helped by an index
+        if shape.fields == ('_id', ) or any(serves(index, shape.fields, shape.sort) for index in candidates):
+            continue
+        missing.append((shape, count, millis))
+    missing.sort(key=lambda each: each[2], reverse=True)
+
+    unused = [
+        (name, index)
+        for name, existing_indices in sorted(existing.iteritems())
+        for index in existing_indices
+        if seen[name] and not any(serves(index, shape.fields, shape.sort) for shape in seen[name])
+    ]
+    unapplied = [
+        (name, index)
+        for name, declared_indices in sorted(catalogue.iteritems())
+        for index in declared_indices
+        if index not in existing[name]
+    ]
+    return {'missing': missing, 'unused': unused, 'unapplied': unapplied}
+
+
+def format_report(report):
+    lines = ['Query shapes without a usable index:']
+    for shape, count, millis in report['missing']:
+        lines.append('  {0}: filter on {1}{2} -- {3} queries, {4}ms'.format(
+            shape.collection,
+            ', '.join(shape.fields) or 'nothing',
+            ', sort on {0}'.format(', '.join(shape.sort)) if shape.sort else '',
+            count,
+            millis,
+        ))
+    lines.append('Indices not used by any profiled query:')
+    lines.extend('  {0}: {1}'.format(collection, ', '.join(index)) for collection, index in report['unused'])
+    lines.append('Declared indices missing from the database:')
+    lines.extend('  {0}: {1}'.format(collection, ', '.join(index)) for collection, index in report['unapplied'])
+    return '\n'.join(lines)
@@ -5,7 +5,6 @@ import urllib
 import urlparse
 import bson.objectid
 import httplib as http
-from datetime import datetime
 
 import itsdangerous
 
@@ -14,7 +13,6 @@ from werkzeug.local import LocalProxy
 from weakref import WeakKeyDictionary
 
 from framework.flask import redirect
-from framework.mongo import database
 
 from website import settings
 
@@ -162,8 +160,7 @@ def before_request():
             session.data['auth_user_username'] = user.username
             session.data['auth_user_id'] = user._primary_key
             session.data['auth_user_fullname'] = user.fullname
-            user.date_last_login = datetime.utcnow()
-            user.save()
+            user.update_date_last_login()
         else:
             # Invalid key: Not found in database
             session.data['auth_error_code'] = http.UNAUTHORIZED
@@ -176,12 +173,18 @@ def before_request():
             session = Session.load(session_id) or Session(_id=session_id)
         except itsdangerous.BadData:
             return
+        if session._is_loaded:
+            session.snapshot()
         if session.data.get('auth_user_id'):
-            database['user'].update({'_id': session.data.get('auth_user_id')}, {'$set': {'date_last_login': datetime.utcnow()}}, w=0)
+            # TODO: Fix circular import
+            from framework.auth.core import User
+            user = User.load(session.data['auth_user_id'])
+            if user:
+                user.update_date_last_login()
         set_session(session)
 
 def after_request(response):
     if session.data.get('auth_user_id'):
-        session.save()
+        session.save_changes()
 
     return response
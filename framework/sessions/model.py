@@ -1,18 +1,93 @@
 # -*- coding: utf-8 -*-
+import copy
+import datetime
 
+import pymongo
 from bson import ObjectId
 from modularodm import fields
 
-from framework.mongo import StoredObject
+from framework.mongo import StoredObject, database
+
+from website import settings
 
 
 class Session(StoredObject):
 
+    __indices__ = [{
+        # `scripts.clear_sessions`
+        'unique': False,
+        'key_or_list': [('date_modified', pymongo.ASCENDING)]
+    }, {
+        # `User.get_or_create_cookie`
+        'unique': False,
+        'key_or_list': [
+            ('data.auth_user_id', pymongo.ASCENDING),
+            ('date_modified', pymongo.DESCENDING),
+        ]
+    }]
+
     _id = fields.StringField(primary=True, default=lambda: str(ObjectId()))
     date_created = fields.DateTimeField(auto_now_add=True)
     date_modified = fields.DateTimeField(auto_now=True)
     data = fields.DictionaryField()
 
+    _data_snapshot = None
+
     @property
     def is_authenticated(self):
         return 'auth_user_id' in self.data
+
+    def snapshot(self):
+        """Remember the current contents of `data`; `save_changes` then only
+        writes keys modified after this call.
+        """
+        self._data_snapshot = copy.deepcopy(self.data)
+
+    def get_changes(self):
+        """Return the keys of `data` set or removed since `snapshot`.
+
+        :return tuple: Dict of changed values and list of removed keys
+        """
+        snapshot = self._data_snapshot or {}
+        changed = {
+            key: value for key, value in self.data.iteritems()
+            if key not in snapshot or snapshot[key] != value
+        }
+        removed = [key for key in snapshot if key not in self.data]
+        return changed, removed
+
+    def save_changes(self, now=None):
+        """Persist modified keys of `data` with a single `$set`/`$unset`.
+        If the data is unchanged, only `date_modified` is refreshed, at most
+        once per ``SESSION_TOUCH_INTERVAL``, so that `scripts.clear_sessions`
+        keeps sessions that are still in use. Unsaved sessions, or sessions
+        loaded without a snapshot, are saved in full.
+
+        :return bool: Whether anything was written
+        """
+        if not self._is_loaded or self._data_snapshot is None:
+            self.save()
+            self.snapshot()
+            return True
+        now = now or datetime.datetime.utcnow()
+        changed, removed = self.get_changes()
+        if not changed and not removed:
+            if self.date_modified and now - self.date_modified < settings.SESSION_TOUCH_INTERVAL:
+                return False
+            self.date_modified = now
+            database['session'].update({'_id': self._id}, {'$set': {'date_modified': now}})
+            return True
+        if any('.' in key or key.startswith('$') for key in changed.keys() + removed):
+            # Keys that cannot be used in a field path
+            self.save()
+            self.snapshot()
+            return True
+        self.date_modified = now
+        update = {'$set': {'date_modified': self.date_modified}}
+        for key, value in changed.iteritems():
+            update['$set']['data.{0}'.format(key)] = value
+        if removed:
+            update['$unset'] = {'data.{0}'.format(key): True for key in removed}
+        database['session'].update({'_id': self._id}, update)
+        self.snapshot()
+        return True
@@ -1,5 +1,8 @@
 from __future__ import absolute_import
 import re
+import time
+import threading
+import collections
 
 from werkzeug.utils import secure_filename as werkzeug_secure_filename
 
@@ -28,3 +31,51 @@ def secure_filename(filename):
         pass
 
     return secure
+
+
+class TTLCache(object):
+    """Thread-safe, in-process cache whose entries expire ``ttl`` seconds
+    after being set. Once ``max_size`` entries are held, the least recently
+    used entry is evicted.
+
+    :param float ttl: Seconds an entry stays valid; 0 disables the cache
+    :param int max_size: Maximum number of entries
+    """
+    def __init__(self, ttl, max_size, clock=time.time):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._clock = clock
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires, value = self._data.pop(key)
+            except KeyError:
+                return default
+            if expires <= self._clock():
+                return default
+            # Re-insert to mark as most recently used
+            self._data[key] = (expires, value)
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (self._clock() + self.ttl, value)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
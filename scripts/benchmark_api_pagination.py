@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare the latency of deep pages fetched by offset, as page-number pagination
+does, and by keyset, as `page[cursor]` pagination does, on the users collection.
+
+Usage: ::
+
+    python -m scripts.benchmark_api_pagination [page_size] [repeat]
+"""
+import os
+import sys
+import timeit
+import logging
+
+from website.app import init_app
+from website.models import User
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.base.settings')
+from api.base.pagination import get_keyset_query  # noqa
+
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+PAGES = (1, 10, 100, 1000, 5000)
+
+
+def fetch_by_offset(page, page_size):
+    return list(User.find().sort('_id').offset((page - 1) * page_size).limit(page_size))
+
+
+def fetch_by_keyset(last_id, page_size):
+    query = get_keyset_query('_id', last_id, last_id, descending=False) if last_id else None
+    return list(User.find(query).sort('_id').limit(page_size))
+
+
+def benchmark(page, page_size=10, repeat=5):
+    offset = (page - 1) * page_size
+    # The cursor a client would hold after walking to this page; not timed
+    last_id = User.find().sort('_id')[offset - 1]._id if offset else None
+    offset_time = min(timeit.repeat(lambda: fetch_by_offset(page, page_size), number=1, repeat=repeat))
+    keyset_time = min(timeit.repeat(lambda: fetch_by_keyset(last_id, page_size), number=1, repeat=repeat))
+    return offset_time, keyset_time
+
+
+def main(page_size=10, repeat=5):
+    total = User.find().count()
+    logger.info('Users: {0}, page size: {1}'.format(total, page_size))
+    for page in PAGES:
+        if (page - 1) * page_size >= total:
+            break
+        offset_time, keyset_time = benchmark(page, page_size=page_size, repeat=repeat)
+        logger.info('Page {0:>5}: offset {1:8.2f}ms, keyset {2:8.2f}ms'.format(
+            page, offset_time * 1000, keyset_time * 1000,
+        ))
+
+
+if __name__ == '__main__':
+    init_app(set_backends=True, routes=False)
+    main(*[int(arg) for arg in sys.argv[1:3]])
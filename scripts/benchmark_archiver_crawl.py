@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare sequential and concurrent sizing of an addon file tree against a
+local fake WaterButler that serves a synthetic tree with a fixed latency.
+
+Usage: ::
+
+    python -m scripts.benchmark_archiver_crawl [depth] [breadth] [latency_ms]
+"""
+import sys
+import json
+import time
+import logging
+import threading
+import urlparse
+import BaseHTTPServer
+import SocketServer
+
+import requests
+
+from website.addons.base import StorageAddonBase, GenericRootNode
+from website.archiver.crawler import FileTreeCrawler
+from website.archiver.utils import aggregate_file_tree_metadata
+
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+FILES_PER_FOLDER = 5
+
+
+def list_folder(path, depth, breadth):
+    """Children of ``path`` in a tree of ``depth`` levels of ``breadth`` folders."""
+    level = path.strip('/').count('/') + 1 if path != '/' else 0
+    children = [
+        {'path': '{0}file{1}'.format(path, i), 'name': 'file{0}'.format(i), 'kind': 'file', 'size': 1024}
+        for i in range(FILES_PER_FOLDER)
+    ]
+    if level < depth:
+        children.extend(
+            {'path': '{0}folder{1}/'.format(path, i), 'name': 'folder{0}'.format(i), 'kind': 'folder'}
+            for i in range(breadth)
+        )
+    return children
+
+
+class ThreadedHTTPServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+def make_server(depth, breadth, latency):
+
+    class FakeWaterButlerHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            path = urlparse.parse_qs(urlparse.urlparse(self.path).query)['path'][0]
+            time.sleep(latency)
+            body = json.dumps({'data': list_folder(path, depth, breadth)})
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadedHTTPServer(('127.0.0.1', 0), FakeWaterButlerHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+class FakeConfig(object):
+    short_name = 'benchmark'
+
+
+class FakeAddon(StorageAddonBase):
+    config = FakeConfig()
+    root_node = GenericRootNode()
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def _get_fileobj_child_metadata_url(self, filenode, user, cookie=None, version=None):
+        return '{0}/data?path={1}'.format(self.base_url, filenode['path'])
+
+
+class FakeUser(object):
+    def get_or_create_cookie(self):
+        return 'cookie'
+
+
+def crawl_sequentially(addon, filenode=None, delay=1.0 / 5.0):
+    """The previous approach: one request at a time, pausing after each."""
+    filenode = filenode or {'path': '/', 'kind': 'folder', 'name': ''}
+    if filenode['kind'] == 'file':
+        return filenode
+    res = requests.get(addon._get_fileobj_child_metadata_url(filenode, None))
+    time.sleep(delay)
+    filenode['children'] = [
+        crawl_sequentially(addon, child, delay)
+        for child in addon._handle_fileobj_child_metadata_response(res)
+    ]
+    return filenode
+
+
+def main(depth=3, breadth=4, latency_ms=50):
+    server = make_server(depth, breadth, latency_ms / 1000.0)
+    addon = FakeAddon('http://127.0.0.1:{0}'.format(server.server_address[1]))
+    try:
+        start = time.time()
+        sequential = aggregate_file_tree_metadata('benchmark', crawl_sequentially(addon), None)
+        sequential_time = time.time() - start
+
+        start = time.time()
+        crawler = FileTreeCrawler(addon, FakeUser())
+        concurrent = crawler.crawl()
+        concurrent_time = time.time() - start
+    finally:
+        server.shutdown()
+
+    assert sequential.num_files == concurrent.num_files
+    logger.info('Folders: {0}, files: {1}'.format(crawler.requests_made, concurrent.num_files))
+    logger.info('Sequential: {0:.2f}s'.format(sequential_time))
+    logger.info('Concurrent ({0} workers): {1:.2f}s'.format(crawler.workers, concurrent_time))
+    logger.info('Speedup: {0:.1f}x'.format(sequential_time / concurrent_time))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:4]])
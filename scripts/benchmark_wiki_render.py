@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare cold and warm rendering of large wiki pages.
+
+Cold renders run markdown, Pygments highlighting and bleach on every call;
+warm renders are served from the HTML cached on the page. The page used is
+never saved.
+
+Usage: ::
+
+    python -m scripts.benchmark_wiki_render <node_id> [sections] [repeat]
+"""
+import sys
+import timeit
+import logging
+
+from website.app import init_app
+from website.models import Node
+from website.addons.wiki.model import NodeWikiPage
+
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+SECTION = u'''
+## Section {0}
+
+Some *emphasized* text, a [[wiki link {0}]] and a http://example.com/{0} link.
+
+- item one
+- item two
+
+```python
+def section_{0}(value):
+    return [value * i for i in range({0})]
+```
+'''
+
+
+def make_content(sections):
+    return u'\n'.join(SECTION.format(i) for i in range(sections))
+
+
+def benchmark(node, sections=200, repeat=5):
+    page = NodeWikiPage(page_name='benchmark', content=make_content(sections))
+
+    def cold():
+        page.clear_rendered_cache()
+        page.html(node)
+
+    def warm():
+        page.html(node)
+
+    cold_time = min(timeit.repeat(cold, number=1, repeat=repeat))
+    warm()
+    warm_time = min(timeit.repeat(warm, number=1, repeat=repeat))
+    return len(page.content), cold_time, warm_time
+
+
+def main(node_id, sections=200, repeat=5):
+    node = Node.load(node_id)
+    if node is None:
+        sys.exit('Node {0} not found'.format(node_id))
+    size, cold_time, warm_time = benchmark(node, sections=sections, repeat=repeat)
+    logger.info('Page size: {0} characters'.format(size))
+    logger.info('Cold render: {0:.2f}ms'.format(cold_time * 1000))
+    logger.info('Warm render: {0:.4f}ms'.format(warm_time * 1000))
+    logger.info('Speedup: {0:.0f}x'.format(cold_time / max(warm_time, 1e-9)))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    init_app(set_backends=True, routes=False)
+    main(sys.argv[1], *[int(arg) for arg in sys.argv[2:4]])
@@ -0,0 +1,55 @@
+"""Populate `Conference.submissions`, the IDs of nodes tagged with each
+conference endpoint, which conference listings are now served from.
+"""
+import re
+import sys
+import logging
+
+from framework.mongo import database
+from framework.transactions.context import TokuTransaction
+from website.app import init_app
+from scripts import utils as script_utils
+
+logger = logging.getLogger(__name__)
+
+
+def get_submission_ids(endpoint):
+    # Tags match endpoints case-insensitively, as in `Node.tags` queries
+    pattern = re.compile('^{0}$'.format(re.escape(endpoint)), re.IGNORECASE)
+    tag_ids = [tag['_id'] for tag in database['tag'].find({'_id': pattern}, {'_id': True})]
+    if not tag_ids:
+        return []
+    return [
+        node['_id']
+        for node in database['node'].find({'tags': {'$in': tag_ids}}, {'_id': True})
+    ]
+
+
+def migrate(dry_run=True):
+    count = 0
+    for conference in database['conference'].find({}, {'_id': True}):
+        submission_ids = get_submission_ids(conference['_id'])
+        logger.info('Setting {0} submissions on conference {1}'.format(len(submission_ids), conference['_id']))
+        if not dry_run:
+            database['conference'].update(
+                {'_id': conference['_id']},
+                {
+                    '$set': {'submissions': submission_ids},
+                    '$inc': {'submissions_version': 1},
+                },
+            )
+        count += 1
+    logger.info('Migrated {0} conferences'.format(count))
+
+
+def main():
+    init_app(routes=False)
+    dry_run = 'dry' in sys.argv
+    if not dry_run:
+        script_utils.add_file_logger(logger, __file__)
+    with TokuTransaction():
+        migrate(dry_run=dry_run)
+
+
+if __name__ == '__main__':
+    main()
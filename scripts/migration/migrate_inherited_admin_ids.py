@@ -0,0 +1,84 @@
+"""Populate `Node.inherited_admin_ids`, the users who are admins on an
+ancestor of each node, so that read access inherited from parent admins is
+checked without loading the ancestors.
+"""
+import sys
+import logging
+
+from framework.mongo import database
+from framework.transactions.context import TokuTransaction
+from website.app import init_app
+from scripts import utils as script_utils
+
+logger = logging.getLogger(__name__)
+
+
+def get_child_ids(node):
+    # `nodes` holds (id, collection) pairs; skip pointers
+    return [
+        child[0] for child in node.get('nodes') or []
+        if child[1] == 'node'
+    ]
+
+
+def get_admin_ids(node):
+    return {
+        user_id for user_id, perms in (node.get('permissions') or {}).iteritems()
+        if 'admin' in perms
+    }
+
+
+def compute_inherited_admin_ids(nodes):
+    """Map each node id to its inherited admin ids, walking down from the
+    top-level nodes.
+
+    :param dict nodes: Raw node documents keyed by id
+    """
+    child_ids = {node_id: get_child_ids(node) for node_id, node in nodes.iteritems()}
+    all_child_ids = {child_id for ids in child_ids.itervalues() for child_id in ids}
+    inherited = {}
+    stack = [(node_id, set()) for node_id in nodes if node_id not in all_child_ids]
+    while stack:
+        node_id, admin_ids = stack.pop()
+        if node_id in inherited or node_id not in nodes:
+            continue
+        inherited[node_id] = sorted(admin_ids)
+        node = nodes[node_id]
+        if node.get('is_deleted'):
+            # Deleted nodes pass no rights to their children
+            child_admin_ids = set()
+        else:
+            child_admin_ids = admin_ids | get_admin_ids(node)
+        stack.extend((child_id, child_admin_ids) for child_id in child_ids[node_id])
+    return inherited
+
+
+def migrate(dry_run=True):
+    nodes = {
+        node['_id']: node
+        for node in database['node'].find({}, {'nodes': True, 'permissions': True, 'is_deleted': True})
+    }
+    count = 0
+    for node_id, admin_ids in compute_inherited_admin_ids(nodes).iteritems():
+        if admin_ids:
+            logger.info('Setting inherited_admin_ids={0} on node {1}'.format(admin_ids, node_id))
+        if not dry_run:
+            database['node'].update(
+                {'_id': node_id},
+                {'$set': {'inherited_admin_ids': admin_ids}},
+            )
+        count += 1
+    logger.info('Migrated {0} nodes'.format(count))
+
+
+def main():
+    init_app(routes=False)
+    dry_run = 'dry' in sys.argv
+    if not dry_run:
+        script_utils.add_file_logger(logger, __file__)
+    with TokuTransaction():
+        migrate(dry_run=dry_run)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Populate `Node.num_logs` from the length of each node's log list, so that
+log counts can be read without loading the list.
+"""
+import sys
+import logging
+
+from framework.mongo import database
+from framework.transactions.context import TokuTransaction
+from website.app import init_app
+from scripts import utils as script_utils
+
+logger = logging.getLogger(__name__)
+
+
+def migrate(dry_run=True):
+    count = 0
+    cursor = database['node'].find({}, {'logs': True})
+    for node in cursor:
+        num_logs = len(node.get('logs') or [])
+        logger.info('Setting num_logs={0} on node {1}'.format(num_logs, node['_id']))
+        if not dry_run:
+            database['node'].update(
+                {'_id': node['_id']},
+                {'$set': {'num_logs': num_logs}},
+            )
+        count += 1
+    logger.info('Migrated {0} nodes'.format(count))
+
+
+def main():
+    init_app(routes=False)
+    dry_run = 'dry' in sys.argv
+    if not dry_run:
+        script_utils.add_file_logger(logger, __file__)
+    with TokuTransaction():
+        migrate(dry_run=dry_run)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Populate `ancestor_ids` and `materialized_path` on OsfStorage file nodes,
+which used to store an empty materialized path and compute it by loading
+each parent in turn.
+"""
+import sys
+import logging
+
+from framework.mongo import database
+from framework.transactions.context import TokuTransaction
+from website.app import init_app
+from scripts import utils as script_utils
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of folder ids sent in a single `$in` query
+BATCH_SIZE = 1000
+
+
+def get_children(folder_ids):
+    for start in xrange(0, len(folder_ids), BATCH_SIZE):
+        cursor = database['storedfilenode'].find(
+            {'parent': {'$in': folder_ids[start:start + BATCH_SIZE]}},
+            {'parent': True, 'name': True, 'is_file': True},
+        )
+        for child in cursor:
+            yield child
+
+
+def compute_lineage(roots):
+    """Yield (id, ancestor_ids, materialized_path) for each root and every
+    file node below it, a level of the tree at a time.
+
+    :param list roots: Ids of root folders
+    """
+    level = {root_id: ([], '/') for root_id in roots}
+    while level:
+        for _id, (ancestor_ids, path) in level.iteritems():
+            yield _id, ancestor_ids, path
+        folder_ids = [_id for _id, (_, path) in level.iteritems() if path.endswith('/')]
+        next_level = {}
+        for child in get_children(folder_ids):
+            ancestor_ids, path = level[child['parent']]
+            next_level[child['_id']] = (
+                ancestor_ids + [child['parent']],
+                path + child['name'] + ('' if child['is_file'] else '/'),
+            )
+        level = next_level
+
+
+def migrate(dry_run=True):
+    roots = [
+        root['_id'] for root in
+        database['storedfilenode'].find({'provider': 'osfstorage', 'parent': None}, {'_id': True})
+    ]
+    count = 0
+    for _id, ancestor_ids, path in compute_lineage(roots):
+        logger.debug('Setting materialized_path={0!r} on file node {1}'.format(path, _id))
+        if not dry_run:
+            database['storedfilenode'].update(
+                {'_id': _id},
+                {'$set': {'ancestor_ids': ancestor_ids, 'materialized_path': path}},
+            )
+        count += 1
+    logger.info('Migrated {0} file nodes'.format(count))
+
+
+def main():
+    init_app(routes=False)
+    dry_run = 'dry' in sys.argv
+    if not dry_run:
+        script_utils.add_file_logger(logger, __file__)
+    with TokuTransaction():
+        migrate(dry_run=dry_run)
+
+
+if __name__ == '__main__':
+    main()
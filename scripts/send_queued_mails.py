@@ -1,9 +1,14 @@
 import sys
+import time
 import logging
+import collections
 from datetime import datetime
+from multiprocessing.pool import ThreadPool
 
 from modularodm import Q
 
+from framework.email.tasks import SMTPSender
+from framework.mongo import database
 from framework.transactions.context import TokuTransaction
 from website.app import init_app
 from website import mails, settings
@@ -13,7 +18,12 @@ from scripts.utils import add_file_logger
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-def main(dry_run=True):
+# Scheduler mode: number of concurrent SMTP sends, and number of mails
+# prepared and marked as sent per transaction
+SEND_WORKERS = 4
+BATCH_SIZE = 100
+
+def main(dry_run=True, scheduler=False):
     #find all emails to be sent, pops the top one for each user(to obey the once
     #a week requirement), checks to see if one has been sent this week, and if
     #not send the email, otherwise leave it in the queue
@@ -26,6 +36,11 @@ def main(dry_run=True):
 
     logger.info('Emails being sent at {0}'.format(datetime.utcnow().isoformat()))
 
+    if scheduler:
+        if not dry_run:
+            send_mails(list(emails_to_be_sent))
+        return
+
     for mail in emails_to_be_sent:
         if not dry_run:
             with TokuTransaction():
@@ -40,24 +55,106 @@ def main(dry_run=True):
                     pass
 
 def find_queued_mails_ready_to_be_sent():
+    # Served by the (sent_at, send_at) index on QueuedMail
     return mails.QueuedMail.find(
-        Q('send_at', 'lt', datetime.utcnow()) &
-        Q('sent_at', 'eq', None)
-    )
+        Q('sent_at', 'eq', None) &
+        Q('send_at', 'lt', datetime.utcnow())
+    ).sort('send_at')
+
+def get_last_sent(user_ids, since):
+    """Find when each of ``user_ids`` was last sent a queued mail after
+    ``since``, in a single aggregation.
+
+    :return dict: Mapping from user id to the time of their last mail
+    """
+    result = database['queuedmail'].aggregate([
+        {'$match': {'user': {'$in': list(user_ids)}, 'sent_at': {'$gt': since}}},
+        {'$group': {'_id': '$user', 'last_sent': {'$max': '$sent_at'}}},
+    ])
+    return {each['_id']: each['last_sent'] for each in result['result']}
 
 def pop_and_verify_mails_for_each_user(user_queue):
-    for user_emails in user_queue.values():
-        mail = user_emails[0]
-        mails_past_week = mails.QueuedMail.find(
-            Q('user', 'eq', mail.user) &
-            Q('sent_at', 'gt', datetime.utcnow() - settings.WAIT_BETWEEN_MAILS)
+    last_sent = get_last_sent(user_queue.keys(), datetime.utcnow() - settings.WAIT_BETWEEN_MAILS)
+    for user_id, user_emails in user_queue.items():
+        if user_id not in last_sent:
+            yield user_emails[0]
+
+def send_mails(mails_to_send, workers=SEND_WORKERS, batch_size=BATCH_SIZE, sender=None):
+    """Send queued mails through a pool of ``workers`` threads sharing
+    reused SMTP connections. Presends run and mails are marked as sent in
+    one transaction per batch.
+
+    :return: Counter of mails sent, not sent by their presend, and failed
+    """
+    sender = sender or SMTPSender()
+    pool = ThreadPool(workers)
+    stats = collections.Counter()
+    start = time.time()
+    try:
+        for index in range(0, len(mails_to_send), batch_size):
+            send_batch(mails_to_send[index:index + batch_size], sender, pool, stats)
+    finally:
+        pool.close()
+        pool.join()
+        sender.close()
+    elapsed = time.time() - start
+    logger.info(
+        'Sent {sent} emails, skipped {skipped} and failed {failed} in {elapsed:.1f}s ({rate:.1f} emails/s)'.format(
+            sent=stats['sent'],
+            skipped=stats['skipped'],
+            failed=stats['failed'],
+            elapsed=elapsed,
+            rate=stats['sent'] / elapsed if elapsed else 0,
         )
-        if not mails_past_week.count():
-            yield mail
+    )
+    return stats
+
+def send_batch(batch, sender, pool, stats):
+    with TokuTransaction():
+        # Presends and rendering use the database, so they run on this thread
+        prepared = []
+        for mail in batch:
+            try:
+                message = mail.prepare()
+                if message is None:
+                    mails.QueuedMail.remove_one(mail)
+                    stats['skipped'] += 1
+                    continue
+                to_addr, template, context = message
+                prepared.append((mail, dict(
+                    from_addr=settings.FROM_EMAIL,
+                    to_addr=to_addr,
+                    subject=template.subject(**context),
+                    message=template.html(**context),
+                )))
+            except Exception as error:
+                logger.error('Email of type {0} to be sent to {1} caused an ERROR'.format(mail.email_type, mail.to_addr))
+                logger.exception(error)
+                stats['failed'] += 1
+
+        def send(kwargs):
+            try:
+                sender.send(**kwargs)
+                return True
+            except Exception as error:
+                logger.error('Email to {0} failed to be sent'.format(kwargs['to_addr']))
+                logger.exception(error)
+                return False
+
+        results = pool.map(send, [kwargs for _, kwargs in prepared])
+        sent_ids = [mail._id for (mail, _), sent in zip(prepared, results) if sent]
+        stats['sent'] += len(sent_ids)
+        stats['failed'] += len(prepared) - len(sent_ids)
+        if sent_ids:
+            database['queuedmail'].update(
+                {'_id': {'$in': sent_ids}},
+                {'$set': {'sent_at': datetime.utcnow()}},
+                multi=True,
+            )
 
 if __name__ == '__main__':
     dry_run = 'dry' in sys.argv
     init_app(routes=False)
     if not dry_run:
         add_file_logger(logger, __file__)
-    main(dry_run=dry_run)
+    main(dry_run=dry_run, scheduler='scheduler' in sys.argv)
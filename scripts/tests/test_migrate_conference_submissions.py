@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+from nose.tools import *  # noqa
+
+from framework.auth.core import Auth
+from framework.mongo import database
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory
+from tests.test_conferences import ConferenceFactory
+from website.models import Conference
+
+from scripts.migration.migrate_conference_submissions import migrate
+
+
+class TestMigrateConferenceSubmissions(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateConferenceSubmissions, self).setUp()
+        self.conference = ConferenceFactory()
+        self.submission = ProjectFactory()
+        self.submission.add_tag(self.conference.endpoint.upper(), Auth(self.submission.creator))
+        self.other = ProjectFactory()
+        self.other.add_tag('other', Auth(self.other.creator))
+        database['conference'].update(
+            {},
+            {'$unset': {'submissions': True, 'submissions_version': True}},
+            multi=True,
+        )
+        Conference._clear_caches()
+
+    def test_migrate(self):
+        migrate(dry_run=False)
+        Conference._clear_caches()
+        conference = Conference.load(self.conference._id)
+        assert_equal(conference.submissions, [self.submission._id])
+        assert_equal(conference.submissions_version, 1)
+
+    def test_dry_run(self):
+        migrate(dry_run=True)
+        assert_not_in('submissions', database['conference'].find_one({'_id': self.conference._id}))
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+from nose.tools import *  # noqa
+
+from framework.mongo import database
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory, NodeFactory, UserFactory
+from website.models import Node
+
+from scripts.migration.migrate_inherited_admin_ids import migrate
+
+
+class TestMigrateInheritedAdminIds(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateInheritedAdminIds, self).setUp()
+        self.project = ProjectFactory()
+        self.user = UserFactory()
+        self.component = NodeFactory(parent=self.project, creator=self.user)
+        self.subcomponent = NodeFactory(parent=self.component, creator=self.user)
+        database['node'].update(
+            {},
+            {'$unset': {'inherited_admin_ids': True}},
+            multi=True,
+        )
+        Node._clear_caches()
+
+    def test_migrate(self):
+        migrate(dry_run=False)
+        Node._clear_caches()
+        assert_equal(Node.load(self.project._id).inherited_admin_ids, [])
+        assert_equal(
+            Node.load(self.component._id).inherited_admin_ids,
+            [self.project.creator._id],
+        )
+        assert_equal(
+            set(Node.load(self.subcomponent._id).inherited_admin_ids),
+            {self.project.creator._id, self.user._id},
+        )
+
+    def test_deleted_parent_passes_no_rights(self):
+        database['node'].update({'_id': self.project._id}, {'$set': {'is_deleted': True}})
+        migrate(dry_run=False)
+        Node._clear_caches()
+        assert_equal(Node.load(self.component._id).inherited_admin_ids, [])
+        assert_equal(Node.load(self.subcomponent._id).inherited_admin_ids, [self.user._id])
+
+    def test_dry_run(self):
+        migrate(dry_run=True)
+        assert_not_in('inherited_admin_ids', database['node'].find_one({'_id': self.component._id}))
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+from nose.tools import *  # noqa
+
+from framework.mongo import database
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory
+
+from scripts.migration.migrate_node_num_logs import migrate
+
+
+class TestMigrateNodeNumLogs(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateNodeNumLogs, self).setUp()
+        self.project = ProjectFactory()
+        database['node'].update(
+            {'_id': self.project._id},
+            {'$unset': {'num_logs': True}},
+        )
+
+    def test_migrate(self):
+        migrate(dry_run=False)
+        self.project.reload()
+        assert_equal(self.project.num_logs, len(self.project.logs))
+
+    def test_dry_run(self):
+        migrate(dry_run=True)
+        assert_not_in('num_logs', database['node'].find_one({'_id': self.project._id}))
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+from nose.tools import *  # noqa
+
+from framework.mongo import database
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory
+from website.files.models import StoredFileNode
+
+from scripts.migration.migrate_osfstorage_lineage import migrate
+
+
+class TestMigrateOsfStorageLineage(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateOsfStorageLineage, self).setUp()
+        self.project = ProjectFactory()
+        self.root = self.project.get_addon('osfstorage').get_root()
+        self.folder = self.root.append_folder('Cloud')
+        self.file = self.folder.append_file('Carp')
+        database['storedfilenode'].update(
+            {'provider': 'osfstorage'},
+            {'$set': {'materialized_path': ''}, '$unset': {'ancestor_ids': True}},
+            multi=True,
+        )
+        StoredFileNode._clear_caches()
+
+    def test_migrate(self):
+        migrate(dry_run=False)
+        StoredFileNode._clear_caches()
+        root = StoredFileNode.load(self.root._id)
+        folder = StoredFileNode.load(self.folder._id)
+        file_node = StoredFileNode.load(self.file._id)
+        assert_equal((root.ancestor_ids, root.materialized_path), ([], '/'))
+        assert_equal((folder.ancestor_ids, folder.materialized_path), ([self.root._id], '/Cloud/'))
+        assert_equal(
+            (file_node.ancestor_ids, file_node.materialized_path),
+            ([self.root._id, self.folder._id], '/Cloud/Carp'),
+        )
+
+    def test_unmigrated_paths_are_computed(self):
+        assert_equal(StoredFileNode.load(self.file._id).wrapped().materialized_path, '/Cloud/Carp')
+
+    def test_dry_run(self):
+        migrate(dry_run=True)
+        assert_equal(database['storedfilenode'].find_one({'_id': self.file._id})['materialized_path'], '')
@@ -5,7 +5,10 @@ from nose.tools import *
 from tests.base import OsfTestCase
 from tests.factories import UserFactory
 
-from scripts.send_queued_mails import main, pop_and_verify_mails_for_each_user, find_queued_mails_ready_to_be_sent
+from scripts.send_queued_mails import (
+    main, pop_and_verify_mails_for_each_user, find_queued_mails_ready_to_be_sent,
+    get_last_sent, send_mails,
+)
 from website import mails, settings
 
 class TestSendQueuedMails(OsfTestCase):
@@ -73,3 +76,51 @@ class TestSendQueuedMails(OsfTestCase):
         mail3 = self.queue_mail(send_at=datetime.utcnow())
         mails = find_queued_mails_ready_to_be_sent()
         assert_equal(len(mails), 2)
+
+    def test_get_last_sent(self):
+        user = UserFactory()
+        old = datetime.utcnow() - timedelta(days=30)
+        recent = datetime.utcnow() - timedelta(days=1)
+        for sent_at in (old, recent):
+            mails.QueuedMail(user=user, sent_at=sent_at, to_addr=user.username).save()
+        last_sent = get_last_sent([user._id, self.user._id], datetime.utcnow() - timedelta(days=7))
+        assert_equal(last_sent.keys(), [user._id])
+        assert_equal(last_sent[user._id].date(), recent.date())
+
+    @mock.patch('scripts.send_queued_mails.SMTPSender')
+    def test_scheduler_sends_and_marks_sent(self, mock_sender):
+        users = [UserFactory() for _ in range(3)]
+        for user in users:
+            user.osf_mailing_lists[settings.OSF_HELP_LIST] = True
+            user.save()
+            self.queue_mail(user=user)
+        main(dry_run=False, scheduler=True)
+        sender = mock_sender.return_value
+        assert_equal(sender.send.call_count, 3)
+        assert_equal(
+            set(call[1]['to_addr'] for call in sender.send.call_args_list),
+            set(user.username for user in users),
+        )
+        assert_true(sender.close.called)
+        assert_equal(len(find_queued_mails_ready_to_be_sent()), 0)
+
+    def test_send_mails_batches_and_counts(self):
+        self.queue_mail()
+        skipped = self.queue_mail(user=UserFactory())  # not on the help list
+        sender = mock.Mock()
+        stats = send_mails(list(find_queued_mails_ready_to_be_sent()), workers=2, batch_size=1, sender=sender)
+        assert_equal(stats['sent'], 1)
+        assert_equal(stats['skipped'], 1)
+        assert_equal(sender.send.call_count, 1)
+        assert_equal(mails.QueuedMail.find().count(), 1)
+        assert_is_none(mails.QueuedMail.load(skipped._id))
+
+    def test_send_mails_failed_send_is_not_marked_sent(self):
+        mail = self.queue_mail()
+        sender = mock.Mock()
+        sender.send.side_effect = Exception('connection refused')
+        stats = send_mails([mail], sender=sender)
+        assert_equal(stats['failed'], 1)
+        assert_equal(stats['sent'], 0)
+        mail.reload()
+        assert_is_none(mail.sent_at)
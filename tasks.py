@@ -361,10 +361,19 @@ def elasticsearch():
         print("Your system is not recognized, you will have to start elasticsearch manually")
 
 @task
-def migrate_search(delete=False, index=settings.ELASTIC_INDEX):
-    """Migrate the search-enabled models."""
-    from website.search_migration.migrate import migrate
-    migrate(delete, index=index)
+def migrate_search(delete=False, index=settings.ELASTIC_INDEX, resume=False, workers=None, chunk_size=None):
+    """Migrate the search-enabled models.
+
+    Pass --resume to continue an interrupted migration from its checkpoint.
+    """
+    from website.search_migration import migrate as search_migration
+    search_migration.migrate(
+        delete,
+        index=index,
+        resume=resume,
+        workers=int(workers or search_migration.WORKERS),
+        chunk_size=int(chunk_size or search_migration.CHUNK_SIZE),
+    )
 
 @task
 def rebuild_search():
@@ -376,6 +385,25 @@ def rebuild_search():
     migrate_search()
 
 
+@task
+def index_advisor(min_millis=0, slowms=None):
+    """Compare queries in the Mongo profiler log with the models' declared indices.
+
+    Pass --slowms=<ms> to enable profiling of queries slower than <ms> first; run
+    the advisor again once the log has filled.
+    """
+    import pymongo
+    from framework.mongo import database
+    from framework.mongo import indices
+    from website.models import MODELS
+    if slowms is not None:
+        database.set_profiling_level(pymongo.SLOW_ONLY, slow_ms=int(slowms))
+        print('Profiling queries slower than {0}ms'.format(slowms))
+        return
+    report = indices.advise(database, indices.get_index_catalogue(MODELS), min_millis=int(min_millis))
+    print(indices.format_report(report))
+
+
 @task
 def mailserver(port=1025):
     """Run a SMTP test server."""
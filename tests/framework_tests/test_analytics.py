@@ -3,6 +3,7 @@
 Unit tests for analytics logic in framework/analytics/__init__.py
 """
 
+import mock
 import unittest
 
 from nose.tools import *  # flake8: noqa  (PEP8 asserts)
@@ -11,7 +12,9 @@ from flask import Flask
 from datetime import datetime
 
 from framework import analytics, sessions
+from framework.analytics.buffer import CounterBuffer
 from framework.sessions import session
+from website import settings
 
 from tests.base import OsfTestCase
 from tests.factories import UserFactory, ProjectFactory
@@ -104,6 +107,15 @@ class TestUpdateCounters(UpdateCountersTestCase):
         count = analytics.get_basic_counters('download:{0}:{1}:{2}'.format(self.node, self.fid, self.vid), db=self.db)
         assert_equal(count, (1, 2))
 
+    def test_visited_pages_are_capped(self):
+        session.data['visited'] = ['page{0}'.format(i) for i in range(3)]
+        with mock.patch.object(settings, 'SESSION_MAX_VISITED_PAGES', 3):
+            analytics.update_counter('node:{0}'.format(self.node._id), db=self.db)
+        assert_equal(
+            session.data['visited'],
+            ['page1', 'page2', 'node:{0}'.format(self.node._id)],
+        )
+
     def test_get_basic_counters(self):
         page = 'node:' + str(self.node._id)
 
@@ -116,6 +128,24 @@ class TestUpdateCounters(UpdateCountersTestCase):
         count = analytics.get_basic_counters(page, db=self.db)
         assert_equal(count, (3, 5))
 
+    def test_get_basic_counters_many(self):
+        pages = ['node:{0}'.format(self.node._id), 'download:{0}:a.txt'.format(self.node._id), 'node:missing']
+        collection = self.db['pagecounters']
+        collection.update({'_id': pages[0]}, {'$inc': {'total': 5, 'unique': 3}}, True, False)
+        collection.update({'_id': analytics.clean_page(pages[1])}, {'$inc': {'total': 2}}, True, False)
+
+        counts = analytics.get_basic_counters_many(pages, db=self.db)
+        assert_equal(counts, {
+            pages[0]: (3, 5),
+            pages[1]: (0, 2),
+            pages[2]: (None, None),
+        })
+        for page in pages:
+            assert_equal(counts[page], analytics.get_basic_counters(page, db=self.db))
+
+    def test_get_basic_counters_many_empty(self):
+        assert_equal(analytics.get_basic_counters_many([], db=self.db), {})
+
     @unittest.skip('Reverted the fix for #2281. Unskip this once we use GUIDs for keys in the download counts collection')
     def test_update_counters_different_files(self):
         # Regression test for https://github.com/CenterForOpenScience/osf.io/issues/2281
@@ -143,3 +173,61 @@ class TestUpdateCounters(UpdateCountersTestCase):
         assert_equal(count, (1, 2))
         count = analytics.get_basic_counters('download:{0}:{1}'.format(self.node, fid2), db=self.db)
         assert_equal(count, (1, 1))
+
+
+class TestCounterBuffer(OsfTestCase):
+
+    def setUp(self):
+        super(TestCounterBuffer, self).setUp()
+        self.buffer = CounterBuffer(interval=3600, max_keys=100, db=self.db)
+
+    def tearDown(self):
+        self.buffer.stop()
+        super(TestCounterBuffer, self).tearDown()
+
+    def test_increments_aggregated_per_document(self):
+        for _ in range(3):
+            self.buffer.add('pagecounters', 'node:abc12', {'total': 1, 'unique': 0})
+        self.buffer.add('pagecounters', 'node:def34', {'total': 1})
+        assert_is_none(self.db['pagecounters'].find_one({'_id': 'node:abc12'}))
+        with mock.patch.object(self.buffer, '_write', wraps=self.buffer._write) as mock_write:
+            assert_equal(self.buffer.flush(), 2)
+        assert_equal(mock_write.call_count, 2)
+        assert_equal(self.db['pagecounters'].find_one({'_id': 'node:abc12'})['total'], 3)
+        assert_equal(self.buffer.stats['flushed'], 4)
+        assert_equal(self.buffer.pending, 0)
+
+    def test_flushes_when_full(self):
+        self.buffer.max_keys = 2
+        self.buffer.add('pagecounters', 'a', {'total': 1})
+        self.buffer.add('pagecounters', 'b', {'total': 1})
+        assert_equal(self.buffer.pending, 0)
+        assert_equal(self.db['pagecounters'].find({'_id': {'$in': ['a', 'b']}}).count(), 2)
+
+    def test_stop_flushes_and_reports_late_increments(self):
+        self.buffer.add('pagecounters', 'a', {'total': 1})
+        self.buffer.stop()
+        assert_equal(self.db['pagecounters'].find_one({'_id': 'a'})['total'], 1)
+        self.buffer.add('pagecounters', 'a', {'total': 1})
+        assert_equal(self.buffer.stats['late'], 1)
+        assert_equal(self.db['pagecounters'].find_one({'_id': 'a'})['total'], 2)
+
+    def test_failed_writes_reported_as_dropped(self):
+        self.buffer.add('pagecounters', 'a', {'total': 2})
+        with mock.patch.object(self.buffer, '_write', side_effect=Exception):
+            self.buffer.flush()
+        assert_equal(self.buffer.stats['dropped'], 2)
+
+    def test_update_counter_uses_buffer_when_enabled(self):
+        decoratorapp = Flask('decorators')
+        with decoratorapp.test_request_context():
+            sessions.set_session(sessions.Session())
+            with mock.patch.object(settings, 'ANALYTICS_BUFFER_ENABLED', True):
+                with mock.patch.object(analytics, 'counter_buffer') as mock_buffer:
+                    analytics.update_counter('node:abc12', db=self.db)
+        mock_buffer.add.assert_called_once_with('pagecounters', 'node:abc12', {
+            'total': 1,
+            'unique': 1,
+            'date.{0}.total'.format(datetime.utcnow().strftime('%Y/%m/%d')): 1,
+            'date.{0}.unique'.format(datetime.utcnow().strftime('%Y/%m/%d')): 1,
+        })
@@ -2,9 +2,11 @@
 import unittest
 import smtplib
 
+import mock
+
 from nose.tools import *  # PEP8 asserts
 
-from framework.email.tasks import send_email
+from framework.email.tasks import send_email, SMTPSender
 from website import settings
 
 # Check if local mail server is running
@@ -27,5 +29,40 @@ class TestEmail(unittest.TestCase):
                                  message="<h1>Greetings!</h1>", ttls=False, login=False))
 
 
+@mock.patch('framework.email.tasks.settings.USE_EMAIL', True)
+@mock.patch('framework.email.tasks.smtplib.SMTP')
+class TestSMTPSender(unittest.TestCase):
+
+    def make_sender(self):
+        return SMTPSender(mail_server='localhost', username='user', password='pass', ttls=False, login=True)
+
+    def test_reuses_connection(self, mock_smtp):
+        sender = self.make_sender()
+        for i in range(3):
+            assert_true(sender.send('foo@bar.com', 'baz@quux.com', 'subject', 'message'))
+        assert_equal(mock_smtp.call_count, 1)
+        assert_equal(mock_smtp.return_value.sendmail.call_count, 3)
+        mock_smtp.return_value.login.assert_called_once_with('user', 'pass')
+
+    def test_reconnects_when_disconnected(self, mock_smtp):
+        sender = self.make_sender()
+        sender.send('foo@bar.com', 'baz@quux.com', 'subject', 'message')
+        mock_smtp.return_value.sendmail.side_effect = [smtplib.SMTPServerDisconnected(), None]
+        assert_true(sender.send('foo@bar.com', 'baz@quux.com', 'subject', 'message'))
+        assert_equal(mock_smtp.call_count, 2)
+
+    def test_close_quits_connections(self, mock_smtp):
+        sender = self.make_sender()
+        sender.send('foo@bar.com', 'baz@quux.com', 'subject', 'message')
+        sender.close()
+        assert_true(mock_smtp.return_value.quit.called)
+
+    def test_skips_without_credentials(self, mock_smtp):
+        sender = SMTPSender(mail_server='localhost', username=None, password=None, login=True)
+        sender.username = sender.password = None
+        assert_is_none(sender.send('foo@bar.com', 'baz@quux.com', 'subject', 'message'))
+        assert_false(mock_smtp.called)
+
+
 if __name__ == '__main__':
     unittest.main()
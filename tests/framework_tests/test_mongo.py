@@ -3,11 +3,13 @@ Tests related to functions in framework.mongo
 """
 from unittest import TestCase
 
+import mock
+
 from nose.tools import *  # flake8: noqa
 
 from modularodm.exceptions import ValidationError, ValidationValueError
 
-from framework.mongo import validators
+from framework.mongo import handlers, validators
 
 class TestValidators(TestCase):
 
@@ -62,3 +64,40 @@ class TestValidators(TestCase):
 
         with assert_raises(ValidationError):
             new_validator({'k': 'v', 'k2': 'v2'})
+
+
+class TestMongoClientManager(TestCase):
+
+    def setUp(self):
+        self.factory = mock.Mock(side_effect=lambda: mock.Mock())
+        self.manager = handlers.MongoClientManager(factory=self.factory)
+
+    def test_client_is_shared_within_process(self):
+        assert_is(self.manager.client, self.manager.client)
+        assert_equal(self.factory.call_count, 1)
+
+    @mock.patch('framework.mongo.handlers.os.getpid')
+    def test_client_is_rebuilt_after_fork(self, mock_getpid):
+        mock_getpid.return_value = 1
+        parent_client = self.manager.client
+        mock_getpid.return_value = 2
+        child_client = self.manager.client
+        assert_is_not(parent_client, child_client)
+        assert_equal(self.factory.call_count, 2)
+        assert_false(parent_client.close.called)
+
+    def test_start_and_end_request_pin_socket(self):
+        self.manager.start_request()
+        self.manager.client.start_request.assert_called_once_with()
+        self.manager.end_request()
+        self.manager.client.end_request.assert_called_once_with()
+
+    def test_stats(self):
+        self.manager.start_request()
+        self.manager.start_request()
+        self.manager.end_request()
+        stats = self.manager.stats()
+        assert_equal(stats['clients_created'], 1)
+        assert_equal(stats['requests_active'], 1)
+        assert_equal(stats['requests_peak'], 2)
+        assert_equal(stats['requests_total'], 2)
@@ -0,0 +1,51 @@
+import mock
+from nose.tools import *  # noqa (PEP8 asserts)
+
+from framework.mongo.batch import BatchLoader
+from tests import factories
+from tests.base import OsfTestCase
+from website.models import Node, User
+
+
+class TestBatchLoading(OsfTestCase):
+
+    def setUp(self):
+        super(TestBatchLoading, self).setUp()
+        self.users = [factories.UserFactory() for _ in range(3)]
+        self.user_ids = [user._id for user in self.users]
+        User._clear_caches()
+
+    def test_load_many_preserves_order_and_skips_missing(self):
+        keys = list(reversed(self.user_ids)) + ['notauser']
+        loaded = User.load_many(keys)
+        assert_equal([user._id for user in loaded], list(reversed(self.user_ids)))
+
+    def test_load_many_issues_one_query(self):
+        with mock.patch.object(User, 'find', wraps=User.find) as mock_find:
+            User.load_many(self.user_ids)
+            assert_equal(mock_find.call_count, 1)
+            # Subsequent loads are served from the request cache
+            User.load_many(self.user_ids)
+            assert_equal(mock_find.call_count, 1)
+
+    def test_batch_loader_flush(self):
+        project = factories.ProjectFactory(creator=self.users[0])
+        loader = BatchLoader()
+        loader.add_many(User, self.user_ids)
+        loader.add(Node, project._id)
+        loader.add(Node, None)
+        loaded = loader.flush()
+        assert_equal(len(loaded[User]), 3)
+        assert_equal(loaded[Node], [project])
+        assert_equal(loader.flush(), {})
+
+    def test_prefetch_foreign_list(self):
+        project = factories.ProjectFactory(creator=self.users[0])
+        for user in self.users[1:]:
+            project.add_contributor(user)
+        project.save()
+        loaded = Node.prefetch([project], ['contributors'])
+        assert_equal(
+            set(user._id for user in loaded[User]),
+            set(self.user_ids),
+        )
@@ -0,0 +1,88 @@
+import pymongo
+from bson.son import SON
+from nose.tools import *  # noqa (PEP8 asserts)
+
+from framework.mongo import database
+from framework.mongo import indices
+from tests.base import OsfTestCase
+from website.models import MODELS
+
+COLLECTION = 'indexadvisortest'
+
+
+class TestQueryParsing(OsfTestCase):
+
+    def test_get_query_fields_includes_logical_clauses(self):
+        query = {
+            'a': 1,
+            '$or': [{'b': {'$gt': 2}}, {'$and': [{'c': 3}, {'d': 4}]}],
+        }
+        assert_equal(indices.get_query_fields(query), {'a', 'b', 'c', 'd'})
+
+    def test_parse_legacy_query_entry(self):
+        entry = {'op': 'query', 'ns': 'osf.node', 'query': {'$query': {'a': 1}, '$orderby': {'b': -1}}}
+        assert_equal(indices.parse_profile_entry(entry), ('node', {'a': 1}, {'b': -1}))
+
+    def test_parse_find_command_entry(self):
+        entry = {'op': 'query', 'ns': 'osf.node', 'query': {'find': 'node', 'filter': {'a': 1}, 'sort': {'b': 1}}}
+        assert_equal(indices.parse_profile_entry(entry), ('node', {'a': 1}, {'b': 1}))
+
+    def test_parse_count_entry(self):
+        entry = {'op': 'command', 'ns': 'osf.$cmd', 'command': {'count': 'comment', 'query': {'node': 'abc'}}}
+        assert_equal(indices.parse_profile_entry(entry), ('comment', {'node': 'abc'}, {}))
+
+    def test_parse_ignores_inserts(self):
+        assert_is_none(indices.parse_profile_entry({'op': 'insert', 'ns': 'osf.node'}))
+
+    def test_serves_first_sort_key(self):
+        sort = tuple(SON([('date', -1), ('title', 1)]))
+        assert_true(indices.serves(('date', 'title'), set(), sort))
+        assert_false(indices.serves(('title', ), set(), sort))
+
+
+class TestAdvise(OsfTestCase):
+
+    def setUp(self):
+        super(TestAdvise, self).setUp()
+        database[COLLECTION].ensure_index([('a', pymongo.ASCENDING)])
+        database[COLLECTION].ensure_index([('d', pymongo.ASCENDING)])
+
+    def tearDown(self):
+        super(TestAdvise, self).tearDown()
+        database.drop_collection(COLLECTION)
+
+    def entry(self, query, millis=10):
+        return {'op': 'query', 'ns': 'osf.' + COLLECTION, 'query': query, 'millis': millis}
+
+    def test_report(self):
+        entries = [
+            self.entry({'a': 1, 'b': 2}),
+            self.entry({'b': 2}, millis=30),
+            self.entry({'b': 3}, millis=20),
+        ]
+        catalogue = {COLLECTION: [('c', )]}
+        report = indices.advise(database, catalogue, entries=entries)
+        assert_equal(len(report['missing']), 1)
+        shape, count, millis = report['missing'][0]
+        assert_equal(shape.fields, ('b', ))
+        assert_equal((count, millis), (2, 50))
+        assert_equal(report['unused'], [(COLLECTION, ('d', ))])
+        assert_equal(report['unapplied'], [(COLLECTION, ('c', ))])
+        assert_in('filter on b', indices.format_report(report))
+
+    def test_min_millis(self):
+        report = indices.advise(database, {}, entries=[self.entry({'b': 2}, millis=5)], min_millis=10)
+        assert_equal(report['missing'], [])
+
+
+class TestIndexCatalogue(OsfTestCase):
+
+    def test_declared_indices_are_applied(self):
+        catalogue = indices.get_index_catalogue(MODELS)
+        assert_in(('date_modified', ), catalogue['session'])
+        assert_in(('metadata.sha256', 'metadata.vault', 'metadata.archive'), catalogue['fileversion'])
+        assert_in(('node', 'date_created', 'date_modified'), catalogue['comment'])
+        for collection in ('session', 'fileversion', 'comment', 'storedfilenode'):
+            existing = indices.get_database_indices(database, collection)
+            for index in catalogue[collection]:
+                assert_in(index, existing)
@@ -1,5 +1,10 @@
+import datetime
+
+import mock
 from nose.tools import *
 
+from framework.mongo import database
+
 from framework.sessions import utils
 from tests import factories
 from tests.base import DbTestCase
@@ -34,3 +39,45 @@ class SessionUtilsTestCase(DbTestCase):
 
         utils.remove_sessions_for_user(self.user)
         assert_equal(1, Session.find().count())
+
+
+class SessionSaveChangesTestCase(DbTestCase):
+
+    def setUp(self, *args, **kwargs):
+        super(SessionSaveChangesTestCase, self).setUp(*args, **kwargs)
+        self.session = Session(data={'auth_user_id': 'abc12', 'status': []})
+        self.session.save()
+        self.session.snapshot()
+
+    def tearDown(self, *args, **kwargs):
+        super(SessionSaveChangesTestCase, self).tearDown(*args, **kwargs)
+        Session.remove()
+
+    def stored_data(self):
+        return database['session'].find_one({'_id': self.session._id})['data']
+
+    def test_unchanged_session_not_written(self):
+        with mock.patch.object(Session, 'save') as mock_save:
+            assert_false(self.session.save_changes())
+        assert_false(mock_save.called)
+
+    def test_changed_keys_written(self):
+        self.session.data['status'].append('message')
+        self.session.data['visited'] = ['page']
+        del self.session.data['auth_user_id']
+        with mock.patch.object(Session, 'save') as mock_save:
+            assert_true(self.session.save_changes())
+        assert_false(mock_save.called)
+        assert_equal(self.stored_data(), {'status': ['message'], 'visited': ['page']})
+        assert_false(self.session.save_changes())
+
+    def test_new_session_saved_in_full(self):
+        session = Session(data={'auth_user_id': 'abc12'})
+        assert_true(session.save_changes())
+        assert_equal(Session.load(session._id).data, {'auth_user_id': 'abc12'})
+
+    def test_unchanged_session_touched_after_interval(self):
+        now = datetime.datetime(2030, 1, 1)
+        assert_true(self.session.save_changes(now=now))
+        assert_equal(database['session'].find_one({'_id': self.session._id})['date_modified'], now)
+        assert_false(self.session.save_changes(now=now + datetime.timedelta(seconds=1)))
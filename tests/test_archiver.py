@@ -30,6 +30,7 @@ from website.archiver import utils as archiver_utils
 from website.app import *  # noqa
 from website.archiver import listeners
 from website.archiver.tasks import *   # noqa
+from website.archiver.crawler import FileTreeCrawler
 from website.archiver.model import ArchiveTarget, ArchiveJob
 from website.archiver.decorators import fail_archive_on_error
 
@@ -85,6 +86,13 @@ class MockAddon(mock.MagicMock, StorageAddonBase):
     def _get_file_tree(self, user, version):
         return FILE_TREE
 
+    def _get_file_tree_stat_result(self, user, cookie=None, version=None):
+        return archiver_utils.aggregate_file_tree_metadata(
+            self.config.short_name,
+            self._get_file_tree(user, version),
+            user,
+        )
+
     def after_register(self, *args):
         return None, None
 
@@ -196,6 +204,66 @@ class TestStorageAddonBase(ArchiverTestCase):
         for addon in [a for a in settings.ADDONS_ARCHIVABLE if a not in ['wiki']]:
             self._test_addon(addon)
 
+
+class TestFileTreeCrawler(ArchiverTestCase):
+
+    def setUp(self):
+        super(TestFileTreeCrawler, self).setUp()
+        self.addon = self.src.get_or_add_addon('dropbox', auth=self.auth)
+        self.requests_made = []
+
+    def _register(self, status=200):
+        def callback(request, uri, headers):
+            path = request.querystring['path'][0]
+            self.requests_made.append(path)
+            body = TestStorageAddonBase.RESP_MAP[path] if status == 200 else {'message': 'error'}
+            return (status, headers, json.dumps(body))
+        url = waterbutler_url_for(
+            'metadata',
+            provider='dropbox',
+            path='/',
+            node=self.src,
+            user=self.user,
+            view_only=True,
+        )
+        httpretty.register_uri(httpretty.GET, url, body=callback, content_type='application/json')
+
+    @httpretty.activate
+    def test_crawl(self):
+        self._register()
+        result = FileTreeCrawler(self.addon, self.user, workers=2).crawl()
+        assert_equal(result.disk_usage, 128 + 256)
+        assert_equal(result.num_files, 2)
+        assert_equal(
+            result._to_dict(),
+            archiver_utils.aggregate_file_tree_metadata('dropbox', FILE_TREE, self.user)._to_dict(),
+        )
+        assert_equal(sorted(self.requests_made), ['/', '/qwerty'])  # no requests made for files
+
+    @httpretty.activate
+    def test_crawl_uses_a_single_cookie(self):
+        self._register()
+        with mock.patch.object(self.user, 'get_or_create_cookie', return_value='cookie') as mock_cookie:
+            FileTreeCrawler(self.addon, self.user).crawl()
+        assert_equal(mock_cookie.call_count, 1)
+
+    def test_crawl_file(self):
+        result = FileTreeCrawler(self.addon, self.user).crawl(FILE_TREE['children'][0])
+        assert_equal(result.disk_usage, 128)
+
+    @httpretty.activate
+    def test_crawl_error(self):
+        self._register(status=404)
+        with assert_raises(HTTPError) as ctx:
+            FileTreeCrawler(self.addon, self.user).crawl()
+        assert_equal(ctx.exception.code, 404)
+
+    @httpretty.activate
+    def test_get_file_tree_stat_result(self):
+        self._register()
+        result = self.addon._get_file_tree_stat_result(self.user)
+        assert_equal(result.disk_usage, 128 + 256)
+
 class TestArchiverTasks(ArchiverTestCase):
 
     @use_fake_addons
@@ -107,6 +107,36 @@ class TestAuthUtils(OsfTestCase):
             auth.get_user(email=user.username, password='wrong')
         )
 
+    def test_get_user_caches_verified_credentials(self):
+        user = AuthUserFactory()
+        assert_equal(auth.get_user(email=user.username, password='password'), user)
+        with mock.patch.object(User, 'check_password') as mock_check:
+            assert_equal(auth.get_user(email=user.username, password='password'), user)
+        assert_false(mock_check.called)
+
+    def test_get_user_cache_does_not_match_wrong_password(self):
+        user = AuthUserFactory()
+        auth.get_user(email=user.username, password='password')
+        assert_false(auth.get_user(email=user.username, password='wrong'))
+
+    def test_get_user_cache_invalidated_on_password_change(self):
+        user = AuthUserFactory()
+        auth.get_user(email=user.username, password='password')
+        user.set_password('bohemianrhapsody')
+        user.save()
+        assert_false(auth.get_user(email=user.username, password='password'))
+        assert_equal(auth.get_user(email=user.username, password='bohemianrhapsody'), user)
+
+    def test_update_date_last_login_is_throttled(self):
+        user = UserFactory()
+        now = datetime.datetime.utcnow().replace(microsecond=0)
+        assert_true(user.update_date_last_login(now=now))
+        assert_false(user.update_date_last_login(now=now + datetime.timedelta(seconds=1)))
+        later = now + settings.DATE_LAST_LOGIN_THROTTLE
+        assert_true(user.update_date_last_login(now=later))
+        user.reload()
+        assert_equal(user.date_last_login, later)
+
 
 class TestAuthObject(OsfTestCase):
 
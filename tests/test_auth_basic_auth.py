@@ -44,6 +44,17 @@ class TestAuthBasicAuthentication(OsfTestCase):
         res = self.app.get(self.reachable_url, auth=self.user1.auth)
         assert_equal(res.status_code, 200)
 
+    def test_valid_credential_with_non_ascii_password(self):
+        self.user1.set_password(u'p\xe9ssword')
+        self.user1.save()
+        # Credentials reach get_user as UTF-8 encoded byte strings
+        auth = (self.user1.username, 'p\xc3\xa9ssword')
+        res = self.app.get(self.reachable_url, auth=auth)
+        assert_equal(res.status_code, 200)
+        # Served from the credential cache
+        res = self.app.get(self.reachable_url, auth=auth)
+        assert_equal(res.status_code, 200)
+
     def test_valid_credential_authenticates_but_user_lacks_object_permissions(self):
         res = self.app.get(self.unreachable_url, auth=self.user1.auth, expect_errors=True)
         assert_equal(res.status_code, 403)
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import json
 import mock
 import unittest
 from nose.tools import *  # flake8: noqa (PEP8 asserts)
@@ -67,6 +68,22 @@ class TestCASClient(OsfTestCase):
         OsfTestCase.setUp(self)
         self.base_url = 'http://accounts.test.test'
         self.client = cas.CasClient(self.base_url)
+        cas.profile_cache.clear()
+
+    def tearDown(self):
+        cas.profile_cache.clear()
+        OsfTestCase.tearDown(self)
+
+    def register_profile(self, user_id='abc12'):
+        self.profile_requests = 0
+        def callback(request, uri, headers):
+            self.profile_requests += 1
+            return (200, headers, json.dumps({'id': user_id, 'scope': ['osf.full_read']}))
+        httpretty.register_uri(
+            httpretty.GET,
+            self.client.get_profile_url(),
+            body=callback,
+        )
 
     @httpretty.activate
     def test_service_validate(self):
@@ -140,9 +157,53 @@ class TestCASClient(OsfTestCase):
         with assert_raises(cas.CasHTTPError):
             res = self.client.revoke_application_tokens(client_id, client_secret)
 
-    @unittest.skip('finish me')
+    @httpretty.activate
     def test_profile_valid_access_token_returns_cas_response(self):
-        assert 0
+        self.register_profile()
+        resp = self.client.profile('access-token')
+        assert_true(resp.authenticated)
+        assert_equal(resp.user, 'abc12')
+        assert_equal(resp.attributes['accessToken'], 'access-token')
+        assert_equal(resp.attributes['accessTokenScope'], {'osf.full_read'})
+
+    @httpretty.activate
+    def test_profile_is_cached(self):
+        self.register_profile()
+        first = self.client.profile('access-token')
+        second = cas.CasClient(self.base_url).profile('access-token')
+        assert_is(first, second)
+        assert_equal(self.profile_requests, 1)
+        self.client.profile('access-token', use_cache=False)
+        assert_equal(self.profile_requests, 2)
+
+    @httpretty.activate
+    def test_profile_errors_are_not_cached(self):
+        url = self.client.get_profile_url()
+        httpretty.register_uri(httpretty.GET, url, status=500)
+        with assert_raises(cas.CasHTTPError):
+            self.client.profile('access-token')
+        assert_is_none(cas.profile_cache.get('access-token'))
+
+    @httpretty.activate
+    def test_token_revocation_invalidates_cached_profile(self):
+        self.register_profile()
+        self.client.profile('access-token')
+        self.client.profile('other-token')
+        httpretty.register_uri(httpretty.POST, self.client.get_auth_token_revocation_url(), status=204)
+        self.client.revoke_tokens({'token': 'access-token'})
+        assert_is_none(cas.profile_cache.get('access-token'))
+        assert_is_not_none(cas.profile_cache.get('other-token'))
+
+    @httpretty.activate
+    def test_application_revocation_clears_cached_profiles(self):
+        self.register_profile()
+        self.client.profile('access-token')
+        httpretty.register_uri(httpretty.POST, self.client.get_auth_token_revocation_url(), status=204)
+        self.client.revoke_application_tokens('fake_id', 'fake_secret')
+        assert_equal(len(cas.profile_cache), 0)
+
+    def test_clients_share_a_session(self):
+        assert_is(cas.CasClient(self.base_url).session, self.client.session)
 
     @unittest.skip('finish me')
     def test_get_login_url(self):
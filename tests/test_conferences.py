@@ -17,7 +17,7 @@ from website import settings
 from website.models import User, Node
 from website.conferences import views
 from website.conferences.model import Conference
-from website.conferences import utils, message
+from website.conferences import utils, message, signals
 from website.util import api_url_for, web_url_for
 
 from tests.base import OsfTestCase, fake
@@ -412,6 +412,10 @@ class TestMessage(ContextTestCase):
 
 class TestConferenceEmailViews(OsfTestCase):
 
+    def setUp(self):
+        super(TestConferenceEmailViews, self).setUp()
+        views.submissions_cache.clear()
+
     def test_redirect_to_meetings_url(self):
         url = '/presentations/'
         res = self.app.get(url)
@@ -494,6 +498,34 @@ class TestConferenceEmailViews(OsfTestCase):
         assert_equal(res.status_code, 200)
         assert_equal(len(res.json), n_conference_nodes)
 
+    def test_conference_data_downloads(self):
+        conference = ConferenceFactory()
+        nodes = create_fake_conference_nodes(3, conference.endpoint)
+        root = nodes[0].get_addon('osfstorage').get_root()
+        poster = root.append_file('poster.pdf')
+        root.append_file('notes.txt')
+        page = 'download:{0}:{1}'.format(nodes[0]._id, poster._id)
+        self.db['pagecounters'].update({'_id': page}, {'$inc': {'total': 4}}, True, False)
+
+        data = views.conference_data(conference.endpoint)
+        by_title = dict((each['title'], each) for each in data)
+        assert_equal(by_title[nodes[0].title]['download'], 4)
+        assert_in('poster.pdf', by_title[nodes[0].title]['downloadUrl'])
+        for node in nodes[1:]:
+            assert_equal(by_title[node.title]['download'], 0)
+            assert_equal(by_title[node.title]['downloadUrl'], '')
+
+    def test_get_conference_files(self):
+        nodes = create_fake_conference_nodes(2, 'conference')
+        poster = nodes[0].get_addon('osfstorage').get_root().append_file('poster.pdf')
+
+        with mock.patch('website.files.models.base.get_basic_counters_many') as mock_counts:
+            mock_counts.return_value = {'download:{0}:{1}'.format(nodes[0]._id, poster._id): (1, 2)}
+            files = views._get_conference_files(nodes)
+        assert_equal(mock_counts.call_count, 1)
+        assert_equal(files.keys(), [nodes[0]._id])
+        assert_equal(files[nodes[0]._id].get_download_count(), 2)
+
     def test_conference_results(self):
         conference = ConferenceFactory()
 
@@ -516,6 +548,85 @@ class TestConferenceModel(OsfTestCase):
         assert_equal(conf.field_names['submission1'], 'poster')
         assert_equal(conf.field_names['mail_subject'], 'Presentation title')
 
+class TestConferenceSubmissionIndex(OsfTestCase):
+
+    def setUp(self):
+        super(TestConferenceSubmissionIndex, self).setUp()
+        views.submissions_cache.clear()
+        self.conference = ConferenceFactory()
+        self.node = ProjectFactory(is_public=True)
+        self.auth = Auth(self.node.creator)
+
+    def get_submissions(self):
+        self.conference.reload()
+        return views.get_conference_submissions(self.conference)
+
+    def test_tagging_adds_submission(self):
+        self.node.add_tag(self.conference.endpoint.upper(), self.auth)
+        self.conference.reload()
+        assert_equal(self.conference.submissions, [self.node._id])
+        assert_equal(self.conference.submissions_version, 1)
+
+    def test_untagging_removes_submission(self):
+        self.node.add_tag(self.conference.endpoint, self.auth)
+        self.node.remove_tag(self.conference.endpoint, self.auth)
+        self.conference.reload()
+        assert_equal(self.conference.submissions, [])
+        assert_equal(self.conference.submissions_version, 2)
+
+    def test_untagging_keeps_submission_tagged_in_other_case(self):
+        self.node.add_tag(self.conference.endpoint, self.auth)
+        self.node.add_tag(self.conference.endpoint.upper(), self.auth)
+        self.node.remove_tag(self.conference.endpoint, self.auth)
+        self.conference.reload()
+        assert_equal(self.conference.submissions, [self.node._id])
+
+    def test_unrelated_tags_ignored(self):
+        self.node.add_tag('unrelated', self.auth)
+        self.conference.reload()
+        assert_equal(self.conference.submissions, [])
+        assert_equal(self.conference.submissions_version, 0)
+
+    def test_submissions_rendered_once(self):
+        self.node.add_tag(self.conference.endpoint, self.auth)
+        with mock.patch.object(views, '_render_conference_node', wraps=views._render_conference_node) as mock_render:
+            first = self.get_submissions()
+            second = views.get_conference_submissions(self.conference)
+        assert_equal(mock_render.call_count, 1)
+        assert_equal(first, second)
+        assert_equal(self.conference.num_submissions, 1)
+
+    def test_new_submission_invalidates_cache(self):
+        self.node.add_tag(self.conference.endpoint, self.auth)
+        assert_equal(len(self.get_submissions()), 1)
+        node = ProjectFactory(is_public=True)
+        node.add_tag(self.conference.endpoint, Auth(node.creator))
+        assert_equal(len(self.get_submissions()), 2)
+
+    def test_private_and_deleted_submissions_hidden(self):
+        self.node.add_tag(self.conference.endpoint, self.auth)
+        assert_equal(len(self.get_submissions()), 1)
+        self.node.set_privacy('private', auth=self.auth)
+        assert_equal(self.get_submissions(), [])
+        self.node.set_privacy('public', auth=self.auth)
+        self.node.is_deleted = True
+        self.node.save()
+        assert_equal(self.get_submissions(), [])
+
+    def test_submission_added_signal_invalidates_cache(self):
+        version = self.conference.submissions_version
+        signals.submission_added.send(self.conference, node=self.node)
+        self.conference.reload()
+        assert_equal(self.conference.submissions_version, version + 1)
+
+    def test_conference_submissions_does_not_save_conferences(self):
+        self.node.add_tag(self.conference.endpoint, self.auth)
+        with mock.patch.object(Conference, 'save') as mock_save:
+            res = views.conference_submissions()
+        assert_equal(len(res['submissions']), 1)
+        assert_false(mock_save.called)
+
+
 class TestConferenceIntegration(ContextTestCase):
 
     @mock.patch('website.conferences.views.send_mail')
@@ -560,6 +671,8 @@ class TestConferenceIntegration(ContextTestCase):
         assert_equal(nodes.count(), 1)
         node = nodes[0]
         assert_equal(node.get_wiki_page('home').content, body)
+        conference.reload()
+        assert_in(node._id, conference.submissions)
         assert_true(mock_send_mail.called)
         call_args, call_kwargs = mock_send_mail.call_args
         assert_absolute(call_kwargs['conf_view_url'])
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import time
+import datetime
 import unittest
 import logging
 import functools
@@ -12,7 +13,9 @@ from framework.auth.core import Auth
 from website import settings
 import website.search.search as search
 from website.search import elastic_search
+from website.search import update_queue
 from website.search.util import build_query
+from website.search_migration import migrate as search_migration
 from website.search_migration.migrate import migrate
 from website.models import Retraction, NodeLicense, Tag
 
@@ -823,6 +826,32 @@ class TestSearchMigration(SearchTestCase):
             assert_equal(var[settings.ELASTIC_INDEX + '_v{}'.format(n + 1)]['aliases'].keys()[0], settings.ELASTIC_INDEX)
             assert not var.get(settings.ELASTIC_INDEX + '_v{}'.format(n))
 
+    def test_migration_indexes_nodes_and_users(self):
+        migrate(delete=False, index=settings.ELASTIC_INDEX, app=self.app.app)
+        assert_equal(len(query_user(self.user.fullname)['results']), 1)
+        assert_equal(len(query(self.project.title)['results']), 1)
+
+    def test_migration_restores_refresh_interval(self):
+        migrate(delete=False, index=settings.ELASTIC_INDEX, app=self.app.app)
+        index = settings.ELASTIC_INDEX + '_v1'
+        index_settings = self.es.indices.get_settings(index=index)
+        assert_equal(index_settings[index]['settings']['index']['refresh_interval'], '1s')
+
+    @mock.patch(
+        'website.search_migration.migrate.CHECKPOINT_PATH',
+        '/tmp/test_search_migration_checkpoint.json'
+    )
+    def test_migration_resumes_from_checkpoint(self):
+        with mock.patch('website.search_migration.migrate.migrate_users', side_effect=RuntimeError):
+            with assert_raises(RuntimeError):
+                migrate(delete=False, index=settings.ELASTIC_INDEX, app=self.app.app)
+        assert_equal(search_migration.load_checkpoint()['node'], self.project._id)
+        migrate(delete=False, index=settings.ELASTIC_INDEX, app=self.app.app, resume=True)
+        var = self.es.indices.get_aliases()
+        # The interrupted migration's index is reused rather than a new version
+        assert_equal(var[settings.ELASTIC_INDEX + '_v1']['aliases'].keys()[0], settings.ELASTIC_INDEX)
+        assert_is_none(search_migration.load_checkpoint())
+
 class TestSearchFiles(SearchTestCase):
 
     def setUp(self):
@@ -897,3 +926,87 @@ class TestSearchFiles(SearchTestCase):
         node.save()
         find = query_file('The Dock of the Bay.mp3')['results']
         assert_equal(len(find), 0)
+
+
+class TestSearchUpdateQueue(SearchTestCase):
+
+    def setUp(self):
+        super(TestSearchUpdateQueue, self).setUp()
+        self.queue_enabled = settings.SEARCH_QUEUE_ENABLED
+        settings.SEARCH_QUEUE_ENABLED = True
+        update_queue.database[update_queue.COLLECTION].remove()
+
+    def tearDown(self):
+        super(TestSearchUpdateQueue, self).tearDown()
+        settings.SEARCH_QUEUE_ENABLED = self.queue_enabled
+
+    def _flush(self):
+        later = datetime.datetime.utcnow() + datetime.timedelta(seconds=settings.SEARCH_QUEUE_WINDOW + 1)
+        flushed = update_queue.flush(now=later)
+        self.es.indices.refresh(index=elastic_search.INDEX)
+        return flushed
+
+    @property
+    def es(self):
+        return search.search_engine.es
+
+    def test_updates_are_coalesced(self):
+        project = ProjectFactory(is_public=True, title='Green Onions')
+        project.set_title('Time Is Tight', auth=Auth(project.creator))
+        project.save()
+        project.set_description('Booker T.', auth=Auth(project.creator))
+        project.save()
+        queued = update_queue.database[update_queue.COLLECTION].find({'doc_id': project._id})
+        assert_equal(queued.count(), 1)
+        assert_equal(len(query('Time Is Tight')['results']), 0)
+
+        assert_true(self._flush())
+        assert_equal(update_queue.get_stats()['depth'], 0)
+        assert_equal(len(query('Time Is Tight')['results']), 1)
+
+    def test_entries_within_window_are_not_flushed(self):
+        update_queue.enqueue('node', ProjectFactory(is_public=True)._id)
+        assert_equal(update_queue.flush(), 0)
+
+    def test_entries_past_max_lag_are_flushed(self):
+        update_queue.enqueue('node', ProjectFactory(is_public=True)._id)
+        later = datetime.datetime.utcnow() + datetime.timedelta(seconds=settings.SEARCH_QUEUE_MAX_LAG + 1)
+        # Still within the window, but waiting longer than the maximum lag
+        with mock.patch.object(settings, 'SEARCH_QUEUE_WINDOW', settings.SEARCH_QUEUE_MAX_LAG * 2):
+            assert_equal(update_queue.flush(now=later), 1)
+
+    def test_failed_entries_are_kept(self):
+        project = ProjectFactory(is_public=True)
+        user = UserFactory()
+        update_queue.database[update_queue.COLLECTION].remove()
+        update_queue.enqueue('node', project._id)
+        update_queue.enqueue('user', user._id)
+        failures = [
+            (('user', user._id), {'index': {'status': 500}}),
+            (('file', 'abc12'), {'index': {'status': 500}}),
+        ]
+        with mock.patch.object(search, 'bulk_update_documents', return_value=(1, failures)):
+            assert_equal(self._flush(), 1)
+        queued = update_queue.database[update_queue.COLLECTION]
+        assert_equal(
+            set(entry['_id'] for entry in queued.find()),
+            {'user:{0}'.format(user._id), 'file:abc12'},
+        )
+
+    def test_deleted_node_is_removed(self):
+        project = ProjectFactory(is_public=True, title='Hip Hug-Her')
+        self._flush()
+        assert_equal(len(query('Hip Hug-Her')['results']), 1)
+        project.is_deleted = True
+        project.save()
+        self._flush()
+        assert_equal(len(query('Hip Hug-Her')['results']), 0)
+
+    def test_stats_lag(self):
+        update_queue.enqueue('user', UserFactory()._id)
+        later = datetime.datetime.utcnow() + datetime.timedelta(seconds=30)
+        assert_greater_equal(update_queue.get_stats(now=later)['lag'], 29)
+
+    def test_enqueue_invalid_doc_type(self):
+        with assert_raises(ValueError):
+            update_queue.enqueue('wiki', 'abc12')
@@ -2679,6 +2679,7 @@ class TestProject(OsfTestCase):
         user = UserFactory()
         node = NodeFactory(parent=self.project, creator=user)
         self.project.set_permissions(self.project.creator, ['read', 'write'])
+        self.project.save()
         assert_false(node.is_admin_parent(self.project.creator))
 
     def test_has_permission_read_parent_admin(self):
@@ -2779,6 +2780,48 @@ class TestProject(OsfTestCase):
         assert_equal(child1.admin_contributor_ids, set())
         assert_equal(child2.admin_contributor_ids, {child1.creator._id})
 
+    def test_inherited_admin_ids(self):
+        child = ProjectFactory(parent=self.project)
+        grandchild = NodeFactory(parent=child)
+        assert_equal(self.project.inherited_admin_ids, [])
+        assert_equal(child.inherited_admin_ids, [self.project.creator._id])
+        assert_equal(
+            set(grandchild.inherited_admin_ids),
+            {self.project.creator._id, child.creator._id},
+        )
+
+    def test_inherited_admin_ids_updated_on_new_admin(self):
+        child = NodeFactory(parent=self.project)
+        grandchild = NodeFactory(parent=child)
+        user = UserFactory()
+        self.project.add_contributor(user, permissions=['read', 'write', 'admin'], auth=self.auth)
+        self.project.save()
+        assert_in(user._id, child.inherited_admin_ids)
+        assert_in(user._id, grandchild.inherited_admin_ids)
+        assert_true(grandchild.has_permission(user, 'read'))
+        self.project.remove_contributor(user, auth=self.auth)
+        self.project.save()
+        assert_not_in(user._id, grandchild.inherited_admin_ids)
+        assert_false(grandchild.has_permission(user, 'read'))
+
+    def test_inherited_admin_ids_cleared_on_parent_delete(self):
+        child = NodeFactory(parent=self.project)
+        self.project.is_deleted = True
+        self.project.save()
+        assert_equal(child.inherited_admin_ids, [])
+
+    def test_inherited_admin_ids_not_copied_to_fork(self):
+        child = NodeFactory(parent=self.project)
+        fork = child.fork_node(Auth(child.creator))
+        assert_equal(fork.inherited_admin_ids, [])
+
+    def test_has_permission_does_not_load_parents(self):
+        child = NodeFactory(parent=self.project)
+        with mock.patch.object(Node, 'parent_node', new_callable=mock.PropertyMock) as mock_parent:
+            assert_true(child.has_permission(self.project.creator, 'read'))
+            assert_true(child.can_view(self.auth))
+        assert_false(mock_parent.called)
+
     def test_admin_contributors(self):
         assert_equal(self.project.admin_contributors, [])
         child1 = ProjectFactory(parent=self.project)
@@ -3006,6 +3049,7 @@ class TestProject(OsfTestCase):
         # Add some logs
         for _ in range(5):
             self.project.logs.append(NodeLogFactory())
+        self.project.save()
         # Expected logs appears
         assert_equal(
             self.project.get_recent_logs(3),
@@ -3018,9 +3062,46 @@ class TestProject(OsfTestCase):
 
     def test_date_modified(self):
         self.project.logs.append(NodeLogFactory())
+        self.project.save()
         assert_equal(self.project.date_modified, self.project.logs[-1].date)
         assert_not_equal(self.project.date_modified, self.project.date_created)
 
+    def test_add_log_increments_num_logs(self):
+        num_logs = self.project.num_logs
+        self.project.add_log(
+            NodeLog.TAG_ADDED,
+            params={'node': self.project._primary_key},
+            auth=self.auth,
+        )
+        assert_equal(self.project.num_logs, num_logs + 1)
+        assert_equal(self.project.num_logs, len(self.project.logs))
+
+    def test_get_logs_queryset_filters_by_user(self):
+        other_user = UserFactory()
+        self.project.add_contributor(other_user, auth=self.auth, save=True)
+        log = self.project.add_log(
+            NodeLog.TAG_ADDED,
+            params={'node': self.project._primary_key},
+            auth=Auth(other_user),
+        )
+        assert_equal(list(self.project.get_logs_queryset(user=other_user)), [log])
+
+    def test_get_logs_page(self):
+        for _ in range(4):
+            self.project.logs.append(NodeLogFactory())
+        self.project.save()
+        expected = list(reversed(self.project.logs))
+        logs, cursor = self.project.get_logs_page(size=3)
+        assert_equal(logs, expected[:3])
+        assert_is_not_none(cursor)
+        logs, cursor = self.project.get_logs_page(size=3, cursor=cursor)
+        assert_equal(logs, expected[3:])
+        assert_is_none(cursor)
+
+    def test_get_logs_page_invalid_cursor(self):
+        with assert_raises(ValueError):
+            self.project.get_logs_page(cursor='notacursor')
+
     def test_replace_contributor(self):
         contrib = UserFactory()
         self.project.add_contributor(contrib, auth=Auth(self.project.creator))
@@ -21,6 +21,7 @@ from website.notifications import emails
 from website.notifications import utils
 from website.project.model import Node
 from website import mails
+from website import settings
 from website.util import api_url_for
 from website.util import web_url_for
 
@@ -850,6 +851,48 @@ class TestCompileSubscriptions(OsfTestCase):
         assert_equal(subs, {'email_transactional': [], 'email_digest': [self.user_1._id], 'none': []})
 
 
+    def test_event_subscription_overrides_node(self):
+        self.shared_sub.email_transactional.append(self.user_1)
+        self.shared_sub.save()
+        file_sub = factories.NotificationSubscriptionFactory(
+            _id=self.shared_node._id + '_xyz42_file_updated',
+            owner=self.shared_node,
+            event_name='xyz42_file_updated'
+        )
+        file_sub.save()
+        file_sub.email_digest.append(self.user_1)
+        file_sub.save()
+        subs = emails.compile_subscriptions(self.shared_node, 'file_updated', 'xyz42_file_updated')
+        assert_equal(subs, {'email_transactional': [], 'email_digest': [self.user_1._id], 'none': []})
+
+    def test_cached_within_request(self):
+        self.base_sub.email_transactional.append(self.user_1)
+        self.base_sub.save()
+        with mock.patch.object(emails, 'resolve_subscriptions', wraps=emails.resolve_subscriptions) as mock_resolve:
+            first = emails.compile_subscriptions(self.shared_node, 'file_updated')
+            first['email_transactional'].append('modified')
+            second = emails.compile_subscriptions(self.shared_node, 'file_updated')
+        assert_equal(mock_resolve.call_count, 1)
+        assert_equal(second, {'email_transactional': [self.user_1._id], 'none': [], 'email_digest': []})
+
+    def test_cache_cleared_on_subscription_save(self):
+        emails.compile_subscriptions(self.shared_node, 'file_updated')
+        self.base_sub.email_transactional.append(self.user_1)
+        self.base_sub.save()
+        result = emails.compile_subscriptions(self.shared_node, 'file_updated')
+        assert_equal({'email_transactional': [self.user_1._id], 'none': [], 'email_digest': []}, result)
+
+    def test_cache_cleared_on_permission_change(self):
+        self.base_sub.email_transactional.append(self.user_4)
+        self.base_sub.save()
+        result = emails.compile_subscriptions(self.shared_node, 'file_updated')
+        assert_equal({'email_transactional': [], 'none': [], 'email_digest': []}, result)
+        self.base_project.add_contributor(self.user_4, permissions='admin', auth=Auth(self.user_1))
+        self.base_project.save()
+        result = emails.compile_subscriptions(self.shared_node, 'file_updated')
+        assert_equal({'email_transactional': [self.user_4._id], 'none': [], 'email_digest': []}, result)
+
+
 class TestMoveSubscription(OsfTestCase):
     def setUp(self):
         super(TestMoveSubscription, self).setUp()
@@ -1169,6 +1212,68 @@ class TestSendEmails(OsfTestCase):
         assert_equal(emails.localize_timestamp(timestamp, self.user), formatted_datetime)
 
 
+class TestStoreEmails(OsfTestCase):
+    def setUp(self):
+        super(TestStoreEmails, self).setUp()
+        self.user = factories.UserFactory()
+        self.project = factories.ProjectFactory()
+        self.node = factories.NodeFactory(parent=self.project)
+        self.recipients = [factories.UserFactory() for _ in range(3)]
+        self.recipients[2].timezone = 'America/New_York'
+        self.recipients[2].save()
+        self.recipient_ids = [recipient._id for recipient in self.recipients]
+        self.timestamp = datetime.datetime.utcnow().replace(tzinfo=pytz.utc)
+
+    @mock.patch('website.notifications.emails.mails.render_message')
+    def test_message_rendered_once_per_timezone_and_locale(self, mock_render):
+        mock_render.return_value = 'message'
+        emails.store_emails(
+            self.recipient_ids + [self.user._id], 'email_transactional', 'comments',
+            self.user, self.node, self.timestamp, content='hi',
+        )
+        assert_equal(mock_render.call_count, 2)
+        digests = list(NotificationDigest.find(Q('event', 'eq', 'comments')))
+        assert_equal(
+            sorted(digest.user_id for digest in digests),
+            sorted(self.recipient_ids),
+        )
+        for digest in digests:
+            assert_equal(digest.message, 'message')
+            assert_equal(digest.send_type, 'email_transactional')
+            assert_equal(digest.node_lineage, [self.project._id, self.node._id])
+
+    def test_message_localized_per_recipient(self):
+        emails.store_emails(
+            self.recipient_ids, 'email_digest', 'comments',
+            self.user, self.node, self.timestamp, content='hi', gravatar_url='', url='',
+        )
+        for recipient in self.recipients:
+            digest = NotificationDigest.find_one(Q('user_id', 'eq', recipient._id))
+            assert_in(emails.localize_timestamp(self.timestamp, recipient), digest.message)
+
+    def test_none_notification_type_stores_nothing(self):
+        emails.store_emails(self.recipient_ids, 'none', 'comments', self.user, self.node, self.timestamp)
+        assert_equal(NotificationDigest.find().count(), 0)
+
+    @mock.patch('website.notifications.emails.enqueue_task')
+    def test_deferred(self, mock_enqueue):
+        with mock.patch.object(settings, 'NOTIFICATIONS_DEFER_DIGESTS', True):
+            emails.store_emails(
+                self.recipient_ids, 'email_transactional', 'comments',
+                self.user, self.node, self.timestamp, content='hi', target_user=self.recipients[0],
+            )
+        assert_equal(NotificationDigest.find().count(), 0)
+        signature = mock_enqueue.call_args[0][0]
+        assert_equal(signature.args[3], self.user._id)
+        assert_equal(signature.args[4], self.node._id)
+        assert_equal(signature.args[6]['target_user'], self.recipients[0]._id)
+
+        with mock.patch('website.notifications.emails.mails.render_message') as mock_render:
+            mock_render.return_value = 'message'
+            signature()
+        assert_equal(NotificationDigest.find().count(), 3)
+
+
 class TestSendDigest(OsfTestCase):
     def setUp(self):
         super(TestSendDigest, self).setUp()
@@ -1203,7 +1308,7 @@ class TestSendDigest(OsfTestCase):
             node_lineage=[self.project._id]
         )
         d3.save()
-        user_groups = get_users_emails(send_type)
+        user_groups = list(get_users_emails(send_type))
         expected = [
             {
                 u'user_id': self.user_1._id,
@@ -1223,6 +1328,8 @@ class TestSendDigest(OsfTestCase):
             }
         ]
 
+        # Users are streamed in order of id
+        expected.sort(key=lambda group: group['user_id'])
         assert_equal(len(user_groups), 2)
         assert_equal(user_groups, expected)
         digest_ids = [d._id, d2._id, d3._id]
@@ -1254,7 +1361,7 @@ class TestSendDigest(OsfTestCase):
             node_lineage=[self.project._id]
         )
         d3.save()
-        user_groups = get_users_emails(send_type)
+        user_groups = list(get_users_emails(send_type))
         expected = [
             {
                 u'user_id': self.user_1._id,
@@ -1274,6 +1381,8 @@ class TestSendDigest(OsfTestCase):
             }
         ]
 
+        # Users are streamed in order of id
+        expected.sort(key=lambda group: group['user_id'])
         assert_equal(len(user_groups), 2)
         assert_equal(user_groups, expected)
         digest_ids = [d._id, d2._id, d3._id]
@@ -1290,7 +1399,7 @@ class TestSendDigest(OsfTestCase):
             node_lineage=[factories.ProjectFactory()._id]
         )
         d.save()
-        user_groups = get_users_emails(send_type)
+        user_groups = list(get_users_emails(send_type))
         send_users_email(send_type)
         assert_true(mock_send_mail.called)
         assert_equals(mock_send_mail.call_count, len(user_groups))
@@ -1307,7 +1416,77 @@ class TestSendDigest(OsfTestCase):
         assert_equal(kwargs['name'], user.fullname)
         message = group_by_node(user_groups[last_user_index]['info'])
         assert_equal(kwargs['message'], message)
-        assert_equal(kwargs['callback'], remove_notifications(email_notification_ids=email_notification_ids))
+        assert_equal(NotificationDigest.find(Q('_id', 'in', email_notification_ids)).count(), 0)
+
+    @mock.patch('website.mails.send_mail')
+    def test_send_users_email_in_batches(self, mock_send_mail):
+        send_type = 'email_transactional'
+        users = [factories.UserFactory() for _ in range(3)]
+        for user in users:
+            for _ in range(2):
+                factories.NotificationDigestFactory(
+                    user_id=user._id,
+                    send_type=send_type,
+                    timestamp=datetime.datetime.utcnow(),
+                    message='Hello',
+                    node_lineage=[self.project._id]
+                ).save()
+        with mock.patch('website.notifications.tasks.DIGEST_BATCH_SIZE', 2):
+            with mock.patch('website.notifications.tasks.remove_notifications',
+                            wraps=remove_notifications) as mock_remove:
+                send_users_email(send_type)
+        assert_equal(mock_send_mail.call_count, 3)
+        assert_equal(mock_remove.call_count, 2)
+        assert_equal(NotificationDigest.find(Q('send_type', 'eq', send_type)).count(), 0)
+        assert_is_none(self.db['notificationdigestcheckpoint'].find_one({'_id': send_type}))
+
+    @mock.patch('website.mails.send_mail')
+    def test_send_users_email_failure_keeps_progress(self, mock_send_mail):
+        send_type = 'email_digest'
+        users = sorted([factories.UserFactory() for _ in range(3)], key=lambda user: user._id)
+        for user in users:
+            factories.NotificationDigestFactory(
+                user_id=user._id,
+                send_type=send_type,
+                timestamp=datetime.datetime.utcnow(),
+                message='Hello',
+                node_lineage=[self.project._id]
+            ).save()
+        mock_send_mail.side_effect = [None, Exception('Mail server unavailable')]
+        with assert_raises(Exception):
+            send_users_email(send_type)
+        # The first user was mailed; their digest is gone and they are not mailed again
+        assert_equal(NotificationDigest.find(Q('user_id', 'eq', users[0]._id)).count(), 0)
+        assert_equal(NotificationDigest.find(Q('user_id', 'eq', users[1]._id)).count(), 1)
+        checkpoint = self.db['notificationdigestcheckpoint'].find_one({'_id': send_type})
+        assert_equal(checkpoint['user_id'], users[0]._id)
+
+        mock_send_mail.reset_mock()
+        mock_send_mail.side_effect = None
+        send_users_email(send_type)
+        assert_equal(
+            [call[1]['to_addr'] for call in mock_send_mail.call_args_list],
+            [users[1].username, users[2].username],
+        )
+
+    @mock.patch('website.mails.send_mail')
+    def test_send_users_email_resumes_after_checkpoint(self, mock_send_mail):
+        send_type = 'email_digest'
+        users = sorted([factories.UserFactory() for _ in range(2)], key=lambda user: user._id)
+        for user in users:
+            factories.NotificationDigestFactory(
+                user_id=user._id,
+                send_type=send_type,
+                timestamp=datetime.datetime.utcnow(),
+                message='Hello',
+                node_lineage=[self.project._id]
+            ).save()
+        self.db['notificationdigestcheckpoint'].insert({'_id': send_type, 'user_id': users[0]._id})
+        send_users_email(send_type)
+        assert_equal(mock_send_mail.call_count, 1)
+        assert_equal(mock_send_mail.call_args[1]['to_addr'], users[1].username)
+        assert_equal(NotificationDigest.find(Q('user_id', 'eq', users[0]._id)).count(), 1)
+        assert_is_none(self.db['notificationdigestcheckpoint'].find_one({'_id': send_type}))
 
     def test_remove_sent_digest_notifications(self):
         d = factories.NotificationDigestFactory(
@@ -11,11 +11,12 @@ from tests.base import OsfTestCase
 from tests.factories import RegistrationFactory
 
 from framework.routing import Rule, json_renderer
-from framework.utils import secure_filename
+from framework.utils import secure_filename, TTLCache
 from website.routes import process_rules, OsfWebRenderer
 from website import settings
 from website import util
 from website.util import paths
+from website.util import throttle
 from website.util.mimetype import get_mimetype
 from website.util import web_url_for, api_url_for, is_json_request, waterbutler_url_for, conjunct, api_v2_url
 from website.project import utils as project_utils
@@ -214,6 +215,12 @@ class TestUrlForHelpers(unittest.TestCase):
         assert_in('path=path', url)
         assert_in('provider=provider', url)
 
+    def test_waterbutler_url_for_explicit_cookie(self):
+        user = mock.Mock()
+        url = waterbutler_url_for('upload', 'provider', 'path', mock.Mock(_id='_id'), user=user, cookie='cookie', view_only=False)
+        assert_in('cookie=cookie', url)
+        assert_false(user.get_or_create_cookie.called)
+
 
 class TestGetMimeTypes(unittest.TestCase):
     def test_get_markdown_mimetype_from_filename(self):
@@ -280,6 +287,46 @@ class TestFrameworkUtils(unittest.TestCase):
         )
 
 
+class TestTTLCache(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0
+        self.cache = TTLCache(ttl=10, max_size=2, clock=lambda: self.now)
+
+    def test_get_and_set(self):
+        assert_is_none(self.cache.get('key'))
+        self.cache.set('key', 'value')
+        assert_equal(self.cache.get('key'), 'value')
+
+    def test_entries_expire(self):
+        self.cache.set('key', 'value')
+        self.now = 10
+        assert_is_none(self.cache.get('key'))
+        assert_equal(len(self.cache), 0)
+
+    def test_least_recently_used_evicted(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+        assert_equal(self.cache.get('a'), 1)
+        assert_is_none(self.cache.get('b'))
+        assert_equal(self.cache.get('c'), 3)
+
+    def test_delete_and_clear(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.delete('a')
+        assert_is_none(self.cache.get('a'))
+        self.cache.clear()
+        assert_equal(len(self.cache), 0)
+
+    def test_zero_ttl_disables(self):
+        cache = TTLCache(ttl=0, max_size=2)
+        cache.set('key', 'value')
+        assert_is_none(cache.get('key'))
+
+
 class TestWebpackFilter(unittest.TestCase):
 
     def setUp(self):
@@ -419,3 +466,36 @@ class TestSignalUtils(unittest.TestCase):
             self.signal_.send()
         self.mock_listener.assert_not_called()
 
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.sleeps = []
+        self.bucket = throttle.TokenBucket(2, clock=lambda: self.now, sleep=self.sleep)
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def test_allows_burst_up_to_capacity(self):
+        assert_equal(self.bucket.acquire(), 0)
+        assert_equal(self.bucket.acquire(), 0)
+        assert_equal(self.sleeps, [])
+
+    def test_waits_when_empty(self):
+        self.bucket.acquire()
+        self.bucket.acquire()
+        assert_almost_equal(self.bucket.acquire(), 0.5)
+
+    def test_refills_over_time(self):
+        self.bucket.acquire()
+        self.bucket.acquire()
+        self.now += 10
+        assert_equal(self.bucket.acquire(), 0)
+        assert_equal(self.bucket.tokens, 1)
+
+    def test_get_bucket_is_shared(self):
+        assert_is(throttle.get_bucket('provider', 5), throttle.get_bucket('provider', 5))
+        assert_equal(throttle.get_bucket('provider', 3).rate, 3)
@@ -2556,6 +2556,29 @@ class TestWatchViews(OsfTestCase):
         assert_equal(res.json['pages'], 2)
         assert_equal(res.json['logs'][0]['action'], 'file_added')
 
+    def test_get_watched_logs_with_cursor(self):
+        project = ProjectFactory()
+        for _ in range(12):
+            project.logs.append(NodeLogFactory(user=self.user, action="file_added"))
+        project.save()
+        watch_cfg = WatchConfigFactory(node=project)
+        self.user.watch(watch_cfg)
+        self.user.save()
+        url = api_url_for("watched_logs_get")
+        res = self.app.get(url, auth=self.auth)
+        cursor = res.json['next_cursor']
+        assert_true(cursor)
+        res = self.app.get(url, {'cursor': cursor}, auth=self.auth)
+        assert_equal(len(res.json['logs']), 3)
+        assert_is_none(res.json['next_cursor'])
+
+    def test_get_watched_logs_invalid_cursor(self):
+        url = api_url_for("watched_logs_get")
+        res = self.app.get(
+            url, {'cursor': 'invalid'}, auth=self.auth, expect_errors=True
+        )
+        assert_equal(res.status_code, 400)
+
     def test_get_more_watched_logs_invalid_page(self):
         project = ProjectFactory()
         watch_cfg = WatchConfigFactory(node=project)
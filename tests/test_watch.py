@@ -12,6 +12,7 @@ from framework.exceptions import HTTPError
 from tests.base import OsfTestCase
 from tests.factories import (UserFactory, ProjectFactory,
                              WatchConfigFactory)
+from website.project import feeds
 from website.views import paginate
 import math
 
@@ -65,14 +66,10 @@ class TestWatching(OsfTestCase):
         assert_equal(n_watched_now, n_watched_then - 1)
         assert_false(self.user.is_watching(self.project))
 
-    @unittest.skip("Won't work because the old log's id doesn't encode the "
-                   "correct log date")
     def test_get_recent_log_ids(self):
         self._watch_project(self.project)
         log_ids = list(self.user.get_recent_log_ids())
         assert_equal(self.last_log._id, log_ids[0])
-        # This part won't work
-        # TODO(sloria): Rethink.
         assert_equal(len(log_ids), 1)
 
     def test_get_recent_log_ids_since(self):
@@ -127,5 +124,55 @@ class TestWatching(OsfTestCase):
         with assert_raises(HTTPError):
             paginate(self.user.get_recent_log_ids(), total, page, size)
 
+class TestFeeds(OsfTestCase):
+
+    def setUp(self):
+        super(TestFeeds, self).setUp()
+        self.user = UserFactory()
+        self.auth = Auth(user=self.user)
+        self.projects = [ProjectFactory(creator=self.user) for _ in range(3)]
+        now = dt.datetime.utcnow()
+        # Interleave log dates across projects
+        for offset in range(6):
+            project = self.projects[offset % 3]
+            project.add_log(
+                'tag_added',
+                params={'project': project._primary_key},
+                auth=self.auth,
+                log_date=now - dt.timedelta(minutes=offset),
+            )
+        self.node_ids = [project._id for project in self.projects]
+
+    def test_iter_logs_is_reverse_chronological(self):
+        logs = list(feeds.iter_logs(self.node_ids))
+        dates = [log.date for log in logs]
+        assert_equal(dates, sorted(dates, reverse=True))
+        assert_equal(len(logs), feeds.count_logs(self.node_ids))
+
+    def test_iter_logs_since(self):
+        since = dt.datetime.utcnow() - dt.timedelta(minutes=2, seconds=30)
+        logs = list(feeds.iter_logs(self.node_ids, since=since))
+        assert_equal(len(logs), 3)
+        assert_equal(feeds.count_logs(self.node_ids, since=since), 3)
+
+    def test_iter_logs_skips_shared_logs(self):
+        fork = self.projects[0].fork_node(self.auth)
+        logs = list(feeds.iter_logs([self.projects[0]._id, fork._id]))
+        log_ids = [log._id for log in logs]
+        assert_equal(len(log_ids), len(set(log_ids)))
+
+    def test_get_logs_page_with_cursor(self):
+        expected = list(feeds.iter_logs(self.node_ids))
+        logs, cursor = feeds.get_logs_page(self.node_ids, size=4)
+        assert_equal(logs, expected[:4])
+        logs, cursor = feeds.get_logs_page(self.node_ids, size=4, cursor=cursor)
+        assert_equal(logs, expected[4:8])
+
+    def test_get_logs_page_with_offset(self):
+        expected = list(feeds.iter_logs(self.node_ids))
+        logs, _ = feeds.get_logs_page(self.node_ids, size=4, offset=4)
+        assert_equal(logs, expected[4:8])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -490,7 +490,48 @@ class TestFileObj(FilesTestCase):
         pass
 
     def test_get_download_count(self):
-        pass
+        file = models.StoredFileNode(
+            path='afile',
+            name='name',
+            is_file=True,
+            node=self.node,
+            provider='test',
+            materialized_path='/long/path/to/name',
+        ).wrapped()
+        file.save()
+        page = 'download:{0}:{1}'.format(self.node._id, file._id)
+        self.db['pagecounters'].update({'_id': page}, {'$inc': {'total': 3, 'unique': 2}}, True, False)
+
+        assert_equal(file.get_download_count(), 3)
+        assert_equal(file.get_download_count(version=0), 0)
+
+    def test_prefetch_download_counts(self):
+        files = []
+        for name in ('one', 'two', 'three'):
+            file = models.StoredFileNode(
+                path=name,
+                name=name,
+                is_file=True,
+                node=self.node,
+                provider='test',
+                materialized_path='/' + name,
+            ).wrapped()
+            file.save()
+            files.append(file)
+        for count, file in enumerate(files[:2], 1):
+            page = 'download:{0}:{1}'.format(self.node._id, file._id)
+            self.db['pagecounters'].update({'_id': page}, {'$inc': {'total': count}}, True, False)
+        version_page = 'download:{0}:{1}:0'.format(self.node._id, files[0]._id)
+        self.db['pagecounters'].update({'_id': version_page}, {'$inc': {'total': 7}}, True, False)
+
+        models.File.prefetch_download_counts(files, versions=(None, 0))
+
+        with mock.patch('website.files.models.base.get_basic_counters') as mock_get:
+            assert_equal([file.get_download_count() for file in files], [1, 2, 0])
+            assert_equal(files[0].get_download_count(version=0), 7)
+            assert_equal(files[1].get_download_count(version=0), 0)
+            assert_equal(files[0].serialize()['downloads'], 1)
+        assert_false(mock_get.called)
 
 
 class TestFolderObj(FilesTestCase):
@@ -6,7 +6,6 @@ import mimetypes
 from bson import ObjectId
 from modularodm import fields
 from mako.lookup import TemplateLookup
-from time import sleep
 
 import requests
 from modularodm import Q
@@ -22,7 +21,7 @@ from framework.exceptions import (
 from website import settings
 from website.addons.base import serializer
 from website.project.model import Node
-from website.util import waterbutler_url_for
+from website.util import throttle, waterbutler_url_for
 
 from website.oauth.signals import oauth_complete
 
@@ -689,6 +688,10 @@ class AddonNodeSettingsBase(AddonSettingsBase):
 ############
 # Archiver #
 ############
+def get_crawl_rate(provider):
+    """Maximum WaterButler metadata requests per second for ``provider``."""
+    return settings.ARCHIVER_CRAWL_RATE_LIMITS.get(provider, settings.ARCHIVER_CRAWL_DEFAULT_RATE)
+
 class GenericRootNode(object):
     path = '/'
     name = ''
@@ -708,7 +711,7 @@ class StorageAddonBase(object):
             name = name + ": {folder}".format(folder=folder_name)
         return name
 
-    def _get_fileobj_child_metadata(self, filenode, user, cookie=None, version=None):
+    def _get_fileobj_child_metadata_url(self, filenode, user, cookie=None, version=None):
         kwargs = dict(
             provider=self.config.short_name,
             path=filenode.get('path', ''),
@@ -717,22 +720,34 @@ class StorageAddonBase(object):
             view_only=True,
         )
         if cookie:
+            # Avoids looking up the user's session for every folder
             kwargs['cookie'] = cookie
         if version:
             kwargs['version'] = version
-        metadata_url = waterbutler_url_for(
+        return waterbutler_url_for(
             'metadata',
             **kwargs
         )
-        res = requests.get(metadata_url)
+
+    def _handle_fileobj_child_metadata_response(self, res, version=None):
+        """Return the list of child metadata from a WaterButler metadata
+        response. Called from crawler threads, so must not touch the database.
+        """
         if res.status_code != 200:
             raise HTTPError(res.status_code, data={
                 'error': res.json(),
             })
-        # TODO: better throttling?
-        sleep(1.0 / 5.0)
         return res.json().get('data', [])
 
+    def _get_fileobj_child_metadata(self, filenode, user, cookie=None, version=None, session=None):
+        metadata_url = self._get_fileobj_child_metadata_url(filenode, user, cookie=cookie, version=version)
+        throttle.get_bucket(
+            self.config.short_name,
+            get_crawl_rate(self.config.short_name),
+        ).acquire()
+        res = (session or requests).get(metadata_url)
+        return self._handle_fileobj_child_metadata_response(res, version=version)
+
     def _get_file_tree(self, filenode=None, user=None, cookie=None, version=None):
         """
         Recursively get file metadata
@@ -756,6 +771,14 @@ class StorageAddonBase(object):
         ]
         return filenode
 
+    def _get_file_tree_stat_result(self, user, cookie=None, version=None):
+        """Crawl the file tree concurrently and return its size as an
+        `AggregateStatResult`, without building the nested metadata of
+        `_get_file_tree`.
+        """
+        from website.archiver.crawler import FileTreeCrawler
+        return FileTreeCrawler(self, user, cookie=cookie, version=version).crawl()
+
 class AddonOAuthNodeSettingsBase(AddonNodeSettingsBase):
     _meta = {
         'abstract': True,
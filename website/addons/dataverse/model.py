@@ -1,18 +1,14 @@
 # -*- coding: utf-8 -*-
-from time import sleep
-import requests
 import httplib as http
 
 from modularodm import fields
 
 from framework.auth.decorators import Auth
-from framework.exceptions import HTTPError
 
 from website.addons.base import (
     AddonOAuthNodeSettingsBase, AddonOAuthUserSettingsBase, exceptions,
 )
 from website.addons.base import StorageAddonBase
-from website.util import waterbutler_url_for
 
 from website.addons.dataverse.client import connect_from_settings_or_401
 from website.addons.dataverse import serializer
@@ -71,33 +67,13 @@ class AddonDataverseNodeSettings(StorageAddonBase, AddonOAuthNodeSettingsBase):
     def complete(self):
         return bool(self.has_auth and self.dataset_doi is not None)
 
-    def _get_fileobj_child_metadata(self, filenode, user, cookie=None, version=None):
-        kwargs = dict(
-            provider=self.config.short_name,
-            path=filenode.get('path', ''),
-            node=self.owner,
-            user=user,
-            view_only=True,
+    def _handle_fileobj_child_metadata_response(self, res, version=None):
+        # The Dataverse API returns a 404 if the dataset has no published files
+        if res.status_code == http.NOT_FOUND and version == 'latest-published':
+            return []
+        return super(AddonDataverseNodeSettings, self)._handle_fileobj_child_metadata_response(
+            res, version=version
         )
-        if cookie:
-            kwargs['cookie'] = cookie
-        if version:
-            kwargs['version'] = version
-        metadata_url = waterbutler_url_for(
-            'metadata',
-            **kwargs
-        )
-        res = requests.get(metadata_url)
-        if res.status_code != 200:
-            # The Dataverse API returns a 404 if the dataset has no published files
-            if res.status_code == http.NOT_FOUND and version == 'latest-published':
-                return []
-            raise HTTPError(res.status_code, data={
-                'error': res.json(),
-            })
-        # TODO: better throttling?
-        sleep(1.0 / 5.0)
-        return res.json().get('data', [])
 
     def delete(self, save=True):
         self.deauthorize(add_log=False)
@@ -13,6 +13,8 @@ import datetime
 
 from modularodm import exceptions as modm_errors
 
+from framework.mongo import database
+
 
 from website.files import models
 from website.addons.osfstorage import utils
@@ -235,6 +237,50 @@ class TestOsfstorageFileNode(StorageTestCase):
         child = self.node_settings.get_root().append_folder('Cloud').append_file('Carp')
         assert_equals('/Cloud/Carp', child.materialized_path)
 
+    def test_lineage_is_stored(self):
+        root = self.node_settings.get_root()
+        folder = root.append_folder('Cloud')
+        child = folder.append_file('Carp')
+        stored = models.StoredFileNode.load(child._id)
+        assert_equal(stored.materialized_path, '/Cloud/Carp')
+        assert_equal(stored.ancestor_ids, [root._id, folder._id])
+
+    def test_lineage(self):
+        root = self.node_settings.get_root()
+        folder = root.append_folder('Cloud')
+        child = folder.append_file('Carp')
+        assert_equal(child.lineage(), [child, folder, root])
+        assert_equal(root.lineage(), [root])
+
+    def test_move_folder_updates_descendants(self):
+        root = self.node_settings.get_root()
+        move_to = root.append_folder('Sky')
+        folder = root.append_folder('Cloud')
+        subfolder = folder.append_folder('Rain')
+        child = subfolder.append_file('Carp')
+
+        folder.move_under(move_to, name='Fog')
+        child.reload()
+        subfolder.reload()
+
+        assert_equal(subfolder.materialized_path, '/Sky/Fog/Rain/')
+        assert_equal(child.materialized_path, '/Sky/Fog/Rain/Carp')
+        assert_equal(child.ancestor_ids, [root._id, move_to._id, folder._id, subfolder._id])
+        assert_equal(child.lineage(), [child, subfolder, folder, move_to, root])
+
+    def test_copy_folder_stores_lineage(self):
+        root = self.node_settings.get_root()
+        folder = root.append_folder('Cloud')
+        folder.append_file('Carp')
+        copy_to = root.append_folder('Sky')
+
+        copied = folder.copy_under(copy_to)
+        child = list(copied.children)[0]
+
+        assert_equal(child.materialized_path, '/Sky/Cloud/Carp')
+        assert_equal(child.ancestor_ids, [root._id, copy_to._id, copied._id])
+        assert_equal(folder.materialized_path, '/Cloud/')
+
     def test_copy(self):
         to_copy = self.node_settings.get_root().append_file('Carp')
         copy_to = self.node_settings.get_root().append_folder('Cloud')
@@ -261,6 +307,32 @@ class TestOsfstorageFileNode(StorageTestCase):
         assert_equal(new_project, move_to.node)
         assert_equal(new_project, child.node)
 
+    def test_move_unmigrated_folder_across_nodes(self):
+        new_project = ProjectFactory()
+        move_to = new_project.get_addon('osfstorage').get_root().append_folder('Cloud')
+
+        to_move = self.node_settings.get_root().append_folder('Carp')
+        subfolder = to_move.append_folder('Fog')
+        child = subfolder.append_file('A dee um')
+        # Saved before lineage was stored
+        database['storedfilenode'].update(
+            {'_id': {'$in': [to_move._id, subfolder._id, child._id]}},
+            {'$set': {'materialized_path': ''}, '$unset': {'ancestor_ids': True}},
+            multi=True,
+        )
+        models.StoredFileNode._clear_caches()
+
+        to_move = models.OsfStorageFileNode.load(to_move._id)
+        to_move.move_under(move_to)
+        subfolder = models.OsfStorageFileNode.load(subfolder._id)
+        child = models.OsfStorageFileNode.load(child._id)
+
+        assert_equal(new_project, subfolder.node)
+        assert_equal(new_project, child.node)
+        assert_equal(child.materialized_path, '/Cloud/Carp/Fog/A dee um')
+        assert_equal(child.stored_object.materialized_path, '/Cloud/Carp/Fog/A dee um')
+        assert_equal(child.ancestor_ids, [move_to.parent._id, move_to._id, to_move._id, subfolder._id])
+
     def test_copy_rename(self):
         to_copy = self.node_settings.get_root().append_file('Carp')
         copy_to = self.node_settings.get_root().append_folder('Cloud')
@@ -3,7 +3,6 @@ from __future__ import unicode_literals
 import httplib
 import logging
 
-from modularodm import Q
 from modularodm.storage.base import KeyExistsException
 
 from flask import request
@@ -77,6 +76,8 @@ def osfstorage_update_metadata(node_addon, payload, **kwargs):
 def osfstorage_get_revisions(file_node, node_addon, payload, **kwargs):
     is_anon = has_anonymous_link(node_addon.owner, Auth(private_key=request.args.get('view_only')))
 
+    models.OsfStorageFile.prefetch_download_counts([file_node], versions=range(len(file_node.versions)))
+
     # Return revisions in descending order
     return {
         'revisions': [
@@ -103,16 +104,7 @@ def osfstorage_move_hook(source, destination, name=None, **kwargs):
 @must_be_signed
 @decorators.autoload_filenode(default_root=True)
 def osfstorage_get_lineage(file_node, node_addon, **kwargs):
-    #TODO Profile
-    list(models.OsfStorageFolder.find(Q('node', 'eq', node_addon.owner)))
-
-    lineage = []
-
-    while file_node:
-        lineage.append(file_node.serialize())
-        file_node = file_node.parent
-
-    return {'data': lineage}
+    return {'data': [each.serialize() for each in file_node.lineage()]}
 
 
 @must_be_signed
@@ -129,9 +121,11 @@ def osfstorage_get_metadata(file_node, **kwargs):
 @must_be_signed
 @decorators.autoload_filenode(must_be='folder')
 def osfstorage_get_children(file_node, **kwargs):
+    children = list(file_node.children)
+    models.OsfStorageFile.prefetch_download_counts(child for child in children if child.is_file)
     return [
         child.serialize()
-        for child in file_node.children
+        for child in children
     ]
 
 
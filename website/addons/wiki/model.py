@@ -2,6 +2,8 @@
 
 import datetime
 import functools
+import hashlib
+import json
 import logging
 
 from bleach import linkify
@@ -14,11 +16,12 @@ from modularodm import fields
 
 from framework.forms.utils import sanitize
 from framework.guid.model import GuidStoredObject
+from framework.mongo import database
 
 from website import settings
 from website.addons.base import AddonNodeSettingsBase
 from website.addons.wiki import utils as wiki_utils
-from website.addons.wiki.settings import WIKI_CHANGE_DATE
+from website.addons.wiki.settings import WIKI_CHANGE_DATE, WIKI_RENDER_CACHE_SIZE, WIKI_RENDER_VERSION
 from website.project.signals import write_permissions_revoked
 
 from website.exceptions import NodeStateError
@@ -152,6 +155,17 @@ def render_content(content, node):
     return sanitized_content
 
 
+def get_render_key(node):
+    """Return a key identifying everything besides page content that the
+    rendered HTML of a wiki page on ``node`` depends on.
+    """
+    settings_json = json.dumps(
+        [WIKI_RENDER_VERSION, node.url, settings.WIKI_WHITELIST],
+        sort_keys=True,
+    )
+    return hashlib.sha1(settings_json).hexdigest()
+
+
 class NodeWikiPage(GuidStoredObject):
 
     _id = fields.StringField(primary=True)
@@ -162,6 +176,10 @@ class NodeWikiPage(GuidStoredObject):
     is_current = fields.BooleanField()
     content = fields.StringField(default='')
 
+    # Cached output of `html`, keyed by `get_render_key`. Forks and registrations
+    # share pages, so one page may be rendered for several nodes
+    rendered_cache = fields.DictionaryField()
+
     user = fields.ForeignField('user')
     node = fields.ForeignField('node')
 
@@ -178,7 +196,31 @@ class NodeWikiPage(GuidStoredObject):
         return self.date < WIKI_CHANGE_DATE
 
     def html(self, node):
-        """The cleaned HTML of the page"""
+        """The cleaned HTML of the page. Saved versions never change, so the
+        output is cached on the page for each node URL and set of render
+        settings it is shown with.
+        """
+        render_key = get_render_key(node)
+        cache = self.rendered_cache or {}
+        if render_key in cache:
+            return cache[render_key]
+        rendered = self.render(node)
+        if len(cache) >= WIKI_RENDER_CACHE_SIZE:
+            # Start over rather than track usage; rarely hit outside of pages
+            # shared by many forks and registrations
+            cache = {}
+            update = {'rendered_cache': {render_key: rendered}}
+        else:
+            update = {'rendered_cache.{0}'.format(render_key): rendered}
+        cache[render_key] = rendered
+        self.rendered_cache = cache
+        if self._is_loaded:
+            # Store the cache directly; saving would update the search index
+            database['nodewikipage'].update({'_id': self._id}, {'$set': update})
+        return rendered
+
+    def render(self, node):
+        """Render the page content to cleaned HTML, bypassing the cache."""
         sanitized_content = render_content(self.content, node=node)
         try:
             return linkify(
@@ -215,7 +257,13 @@ class NodeWikiPage(GuidStoredObject):
 
         return self.content
 
+    def clear_rendered_cache(self):
+        self.rendered_cache = {}
+
     def save(self, *args, **kwargs):
+        if self.node and not self._is_loaded:
+            # Render new versions once, up front
+            self.html(self.node)
         rv = super(NodeWikiPage, self).save(*args, **kwargs)
         if self.node:
             self.node.update_search()
@@ -223,6 +271,7 @@ class NodeWikiPage(GuidStoredObject):
 
     def rename(self, new_name, save=True):
         self.page_name = new_name
+        self.clear_rendered_cache()
         if save:
             self.save()
 
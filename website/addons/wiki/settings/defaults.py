@@ -11,3 +11,11 @@ SHAREJS_DB_URL = 'mongodb://{}:{}/{}'.format(settings.DB_HOST, settings.DB_PORT,
 
 # TODO: Change to release date for wiki change
 WIKI_CHANGE_DATE = datetime.datetime.utcfromtimestamp(1423760098)
+
+# Increment to invalidate all cached wiki HTML, e.g. after upgrading markdown
+# or changing the markdown extensions
+WIKI_RENDER_VERSION = 1
+
+# Number of rendered copies kept per page; pages are shared by forks and
+# registrations, each of which renders its own links
+WIKI_RENDER_CACHE_SIZE = 8
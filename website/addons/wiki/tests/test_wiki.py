@@ -20,6 +20,7 @@ from website.exceptions import NodeStateError
 from website.addons.wiki import settings
 from website.addons.wiki import views
 from website.addons.wiki.exceptions import InvalidVersionError
+from website.addons.wiki import model as wiki_model
 from website.addons.wiki.model import NodeWikiPage, render_content
 from website.addons.wiki.utils import (
     get_sharejs_uuid, generate_private_uuid, share_db, delete_share_doc,
@@ -43,6 +44,75 @@ class TestNodeWikiPageModel(OsfTestCase):
             page.save()
 
 
+class TestNodeWikiPageRenderCache(OsfTestCase):
+
+    def setUp(self):
+        super(TestNodeWikiPageRenderCache, self).setUp()
+        self.project = ProjectFactory()
+        self.wiki = NodeWikiFactory(content='# Title\n\n[[other]]', node=self.project)
+
+    def test_rendered_on_save(self):
+        key = wiki_model.get_render_key(self.project)
+        assert_equal(self.wiki.rendered_cache, {key: self.wiki.render(self.project)})
+
+    def test_html_served_from_cache(self):
+        with mock.patch.object(wiki_model, 'render_content') as mock_render:
+            html = self.wiki.html(self.project)
+        assert_false(mock_render.called)
+        assert_equal(html, self.wiki.rendered_cache[wiki_model.get_render_key(self.project)])
+
+    def test_cache_persisted_for_loaded_pages(self):
+        self.wiki.clear_rendered_cache()
+        self.wiki.save()
+        NodeWikiPage._clear_caches()
+        wiki = NodeWikiPage.load(self.wiki._id)
+        assert_equal(wiki.rendered_cache, {})
+        html = wiki.html(self.project)
+        NodeWikiPage._clear_caches()
+        key = wiki_model.get_render_key(self.project)
+        assert_equal(NodeWikiPage.load(self.wiki._id).rendered_cache, {key: html})
+
+    def test_render_key_depends_on_node_url(self):
+        other = ProjectFactory()
+        assert_not_equal(
+            wiki_model.get_render_key(self.project),
+            wiki_model.get_render_key(other),
+        )
+        html = self.wiki.html(other)
+        assert_in(other.web_url_for('project_wiki_view', wname='other'), html)
+        assert_equal(self.wiki.rendered_cache[wiki_model.get_render_key(other)], html)
+
+    def test_render_for_two_nodes(self):
+        # Forks and registrations share wiki pages with their source
+        fork = ProjectFactory()
+        self.wiki.html(fork)
+        NodeWikiPage._clear_caches()
+        wiki = NodeWikiPage.load(self.wiki._id)
+        with mock.patch.object(wiki_model, 'render_content') as mock_render:
+            with mock.patch.object(wiki_model, 'database') as mock_database:
+                wiki.html(self.project)
+                wiki.html(fork)
+        assert_false(mock_render.called)
+        assert_false(mock_database.called)
+        assert_false(mock_database.__getitem__.called)
+
+    def test_cache_is_bounded(self):
+        with mock.patch.object(wiki_model, 'WIKI_RENDER_CACHE_SIZE', 2):
+            self.wiki.html(ProjectFactory())
+            other = ProjectFactory()
+            html = self.wiki.html(other)
+        assert_equal(self.wiki.rendered_cache, {wiki_model.get_render_key(other): html})
+
+    def test_render_key_depends_on_render_version(self):
+        key = wiki_model.get_render_key(self.project)
+        with mock.patch.object(wiki_model, 'WIKI_RENDER_VERSION', -1):
+            assert_not_equal(wiki_model.get_render_key(self.project), key)
+
+    def test_rename_clears_cache(self):
+        self.wiki.rename('renamed', save=False)
+        assert_equal(self.wiki.rendered_cache, {})
+
+
 class TestWikiViews(OsfTestCase):
 
     def setUp(self):
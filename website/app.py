@@ -25,6 +25,7 @@ from website.project.licenses import ensure_licenses
 # This import is necessary to set up the archiver signal listeners
 from website.archiver import listeners  # noqa
 from website.mails import listeners  # noqa
+from website.conferences import listeners  # noqa
 
 
 def build_js_config_files(settings):
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""Concurrent traversal of an addon's file tree through the WaterButler
+metadata API, used to size an addon before it is archived.
+
+Folder listings are fetched by a bounded pool of threads sharing one
+keep-alive session and the provider's rate limit. Each listing is folded into
+the `AggregateStatResult` tree as soon as it arrives, so the raw metadata of
+the whole tree is never held in memory.
+"""
+import Queue
+import logging
+import httplib as http
+from multiprocessing.pool import ThreadPool
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+
+from framework.exceptions import HTTPError
+
+from website import settings
+from website.archiver import StatResult, AggregateStatResult
+from website.addons.base import get_crawl_rate
+from website.util import throttle
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+
+def make_session(pool_size):
+    """Return a keep-alive session that retries failed and throttled
+    requests with exponential backoff.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=settings.ARCHIVER_CRAWL_RETRIES,
+            backoff_factor=settings.ARCHIVER_CRAWL_BACKOFF,
+            status_forcelist=RETRY_STATUSES,
+        ),
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def to_stat_result(metadata):
+    """Convert WaterButler file or folder metadata to a stat result.
+
+    :return tuple: The stat result and whether its children must be fetched
+    """
+    target_id = metadata['path'].lstrip('/')
+    if metadata.get('kind') == 'file':
+        return StatResult(
+            target_id=target_id,
+            target_name=metadata['name'],
+            disk_usage=metadata.get('size') or 0,
+        ), False
+    result = AggregateStatResult(target_id=target_id, target_name=metadata['name'], targets=[])
+    # Folders that report a size are listed as-is, like `_get_file_tree`
+    return result, 'size' not in metadata
+
+
+class FileTreeCrawler(object):
+    """Size the file tree of a `StorageAddonBase` addon.
+
+    Example: ::
+
+        result = FileTreeCrawler(addon, user).crawl()
+        result.disk_usage, result.num_files
+
+    :param addon: Node settings of the addon to crawl
+    :param User user: User whose credentials are sent to WaterButler
+    :param str version: File version to list, e.g. for Dataverse
+    :param int workers: Number of concurrent metadata requests
+    """
+    def __init__(self, addon, user, cookie=None, version=None, workers=None, session=None):
+        self.addon = addon
+        self.user = user
+        self.cookie = cookie or user.get_or_create_cookie()
+        self.version = version
+        self.workers = workers or settings.ARCHIVER_CRAWL_WORKERS
+        self.session = session or make_session(self.workers)
+        provider = addon.config.short_name
+        self.bucket = throttle.get_bucket(provider, get_crawl_rate(provider))
+        self.requests_made = 0
+        self._results = Queue.Queue()
+
+    def _fetch(self, target, url):
+        """Fetch one folder listing; runs in a pool thread."""
+        try:
+            self.bucket.acquire()
+            try:
+                res = self.session.get(url)
+            except requests.RequestException as error:
+                raise HTTPError(http.BAD_GATEWAY, data={'error': str(error)})
+            children = self.addon._handle_fileobj_child_metadata_response(res, version=self.version)
+            self._results.put((target, children, None))
+        except Exception as error:
+            self._results.put((target, None, error))
+
+    def _submit(self, pool, target, filenode):
+        url = self.addon._get_fileobj_child_metadata_url(
+            filenode, self.user, cookie=self.cookie, version=self.version,
+        )
+        self.requests_made += 1
+        pool.apply_async(self._fetch, (target, url))
+
+    def crawl(self, filenode=None):
+        """Crawl the tree below ``filenode``, by default the addon's root.
+
+        :return: `AggregateStatResult` for ``filenode``, or `StatResult` if it
+            is a file
+        :raises: HTTPError if a listing cannot be fetched
+        """
+        filenode = filenode or {
+            'path': '/',
+            'kind': 'folder',
+            'name': self.addon.root_node.name,
+        }
+        root, needs_crawl = to_stat_result(filenode)
+        if not needs_crawl:
+            return root
+        pool = ThreadPool(self.workers)
+        try:
+            self._submit(pool, root, filenode)
+            pending = 1
+            while pending:
+                target, children, error = self._results.get()
+                pending -= 1
+                if error is not None:
+                    raise error
+                for child in children:
+                    result, child_needs_crawl = to_stat_result(child)
+                    target.targets.append(result)
+                    if child_needs_crawl:
+                        self._submit(pool, result, child)
+                        pending += 1
+        finally:
+            pool.terminate()
+        logger.debug('Crawled {0} folders of {1}'.format(self.requests_made, self.addon.config.short_name))
+        return root
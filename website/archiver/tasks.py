@@ -17,7 +17,6 @@ from website.archiver import (
     NO_ARCHIVE_LIMIT,
     AggregateStatResult,
 )
-from website.archiver import utils
 from website.archiver.model import ArchiveJob
 from website.archiver import signals as archiver_signals
 
@@ -103,7 +102,7 @@ def stat_addon(addon_short_name, job_pk):
     src, dst, user = job.info()
     src_addon = src.get_addon(addon_name)
     try:
-        file_tree = src_addon._get_file_tree(user=user, version=version)
+        file_tree_result = src_addon._get_file_tree_stat_result(user=user, version=version)
     except HTTPError as e:
         dst.archive_job.update_target(
             addon_short_name,
@@ -114,7 +113,7 @@ def stat_addon(addon_short_name, job_pk):
     result = AggregateStatResult(
         src_addon._id,
         addon_short_name,
-        targets=[utils.aggregate_file_tree_metadata(addon_short_name, file_tree, user)],
+        targets=[file_tree_result],
     )
     return result
 
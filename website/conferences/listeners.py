@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""Keep the submission index of each conference up to date."""
+
+from website.project import signals as project_signals
+from website.conferences import signals as conference_signals
+from website.conferences import utils
+
+# Node fields that change whether or how a node is listed as a submission
+SUBMISSION_FIELDS = {'tags', 'title', 'is_public', 'is_deleted'}
+
+
+@project_signals.node_updated.connect
+def update_submissions(node, fields):
+    if SUBMISSION_FIELDS.intersection(fields):
+        utils.update_submission_index(node)
+
+
+@conference_signals.submission_added.connect
+def invalidate_submissions(conference, node):
+    # Attachments are uploaded after the node is tagged, so listings rendered
+    # in between lack the download link
+    conference.invalidate_submissions()
@@ -4,7 +4,7 @@ import bson
 from modularodm import fields, Q
 from modularodm.exceptions import ModularOdmException
 
-from framework.mongo import StoredObject
+from framework.mongo import database, StoredObject
 
 from website.conferences.exceptions import ConferenceError
 
@@ -43,6 +43,11 @@ class Conference(StoredObject):
 
     # Cached number of submissions
     num_submissions = fields.IntegerField(default=0)
+    #: IDs of nodes tagged with the endpoint, maintained as tags change;
+    # privacy and deletion are checked when submissions are listed
+    submissions = fields.StringField(list=True, index=True)
+    #: Incremented whenever submissions change, to invalidate rendered listings
+    submissions_version = fields.IntegerField(default=0)
 
     @classmethod
     def get_by_endpoint(cls, endpoint, active=True):
@@ -54,6 +59,27 @@ class Conference(StoredObject):
         except ModularOdmException:
             raise ConferenceError('Endpoint {0} not found'.format(endpoint))
 
+    def _update_submissions(self, update=None):
+        # Written directly so that concurrent submissions do not overwrite
+        # each other; the loaded object is kept in step
+        update = dict(update or {}, **{'$inc': {'submissions_version': 1}})
+        database['conference'].update({'_id': self._id}, update)
+        self.submissions_version += 1
+
+    def add_submission(self, node):
+        if node._id not in self.submissions:
+            self._update_submissions({'$addToSet': {'submissions': node._id}})
+            self.submissions.append(node._id)
+
+    def remove_submission(self, node):
+        if node._id in self.submissions:
+            self._update_submissions({'$pull': {'submissions': node._id}})
+            self.submissions.remove(node._id)
+
+    def invalidate_submissions(self):
+        """Mark rendered listings of this conference as out of date."""
+        self._update_submissions()
+
 
 class MailRecord(StoredObject):
     _id = fields.StringField(primary=True, default=lambda: str(bson.ObjectId()))
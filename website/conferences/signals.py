@@ -5,3 +5,4 @@ import blinker
 signals = blinker.Namespace()
 
 osf4m_user_created = signals.signal('osf4m-user-created')
+submission_added = signals.signal('conference-submission-added')
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import uuid
+import operator
 
 import requests
 from modularodm import Q
@@ -13,7 +14,7 @@ from website import util
 from website import security
 from website import settings
 from website.project import new_node
-from website.models import User, Node, MailRecord
+from website.models import User, Node, MailRecord, Conference
 
 
 def record_message(message, created):
@@ -114,3 +115,23 @@ def upload_attachment(user, node, attachment):
 def upload_attachments(user, node, attachments):
     for attachment in attachments:
         upload_attachment(user, node, attachment)
+
+
+def update_submission_index(node):
+    """Add ``node`` to the submissions of each conference whose endpoint it
+    is tagged with, remove it from the others, and invalidate the listings
+    of conferences it belongs to.
+
+    :param Node node:
+    """
+    current = set(Conference.find(Q('submissions', 'eq', node._id)))
+    matching = set()
+    if node.tags:
+        query = reduce(operator.or_, [Q('endpoint', 'iexact', tag._id) for tag in node.tags])
+        matching = set(Conference.find(query))
+    for conference in matching - current:
+        conference.add_submission(node)
+    for conference in current - matching:
+        conference.remove_submission(node)
+    for conference in current & matching:
+        conference.invalidate_submissions()
@@ -8,16 +8,18 @@ from datetime import datetime
 from modularodm import Q
 from modularodm.exceptions import ModularOdmException
 
+from framework.mongo import database
 from framework.exceptions import HTTPError
 from framework.flask import redirect
+from framework.utils import TTLCache
 from framework.transactions.context import TokuTransaction
 from framework.transactions.handlers import no_auto_transaction
 
 from website import settings
-from website.models import Node, Tag
+from website.models import Node
 from website.util import web_url_for
 from website.mails import send_mail
-from website.files.models import StoredFileNode
+from website.files.models import File, StoredFileNode
 from website.mails import CONFERENCE_SUBMITTED, CONFERENCE_INACTIVE, CONFERENCE_FAILED
 
 from website.conferences import utils, signals
@@ -27,6 +29,15 @@ from website.conferences.model import Conference
 
 logger = logging.getLogger(__name__)
 
+# Number of nodes whose files are looked up per query
+CONFERENCE_FILE_BATCH_SIZE = 500
+
+# Rendered submissions, keyed by conference endpoint and submissions version
+submissions_cache = TTLCache(
+    settings.CONFERENCE_SUBMISSIONS_CACHE_TTL,
+    settings.CONFERENCE_SUBMISSIONS_CACHE_SIZE,
+)
+
 
 @no_auto_transaction
 def meeting_hook():
@@ -102,6 +113,7 @@ def add_poster_by_email(conference, message):
         utils.record_message(message, created)
 
     utils.upload_attachments(user, node, message.attachments)
+    signals.submission_added.send(conference, node=node)
 
     download_url = node.web_url_for(
         'addon_view_or_download_file',
@@ -134,15 +146,42 @@ def add_poster_by_email(conference, message):
         signals.osf4m_user_created.send(user, conference=conference, node=node)
 
 
-def _render_conference_node(node, idx, conf):
-    try:
-        record = next(
-            x for x in
-            StoredFileNode.find(
-                Q('node', 'eq', node) &
-                Q('is_file', 'eq', True)
-            ).limit(1)
-        ).wrapped()
+def _get_conference_files(nodes):
+    """Find the first file of each node, with its download count loaded, in
+    a fixed number of queries.
+
+    :return dict: Mapping from node ID to its first file
+    """
+    node_ids = [node._id for node in nodes]
+    first_file_ids = {}
+    for start in range(0, len(node_ids), CONFERENCE_FILE_BATCH_SIZE):
+        chunk = node_ids[start:start + CONFERENCE_FILE_BATCH_SIZE]
+        # Only IDs are fetched here; files come back in natural order, so the
+        # first one seen for a node is the one a per-node query would return
+        for each in database['storedfilenode'].find(
+            {'node': {'$in': chunk}, 'is_file': True},
+            {'node': 1},
+        ):
+            first_file_ids.setdefault(each['node'], each['_id'])
+    if not first_file_ids:
+        return {}
+    records = [
+        each.wrapped()
+        for each in StoredFileNode.find(Q('_id', 'in', first_file_ids.values()))
+    ]
+    File.prefetch_download_counts(records)
+    return dict((record.node._id, record) for record in records)
+
+
+def _render_conference_node(node, idx, conf, files=None):
+    """
+    :param dict files: Files of the nodes being rendered, as returned by
+        `_get_conference_files`
+    """
+    if files is None:
+        files = _get_conference_files([node])
+    record = files.get(node._id)
+    if record is not None:
         download_count = record.get_download_count()
 
         download_url = node.web_url_for(
@@ -152,7 +191,7 @@ def _render_conference_node(node, idx, conf):
             action='download',
             _absolute=True,
         )
-    except StopIteration:
+    else:
         download_url = ''
         download_count = 0
 
@@ -175,23 +214,43 @@ def _render_conference_node(node, idx, conf):
     }
 
 
+def get_conference_submissions(conf):
+    """Render the public submissions of a conference from its submission
+    index. Renderings are cached until the index changes or for
+    `CONFERENCE_SUBMISSIONS_CACHE_TTL` seconds, which bounds how stale
+    download counts and author names can be.
+
+    :param Conference conf:
+    :return list: Rendered submissions
+    """
+    key = (conf.endpoint, conf.submissions_version)
+    ret = submissions_cache.get(key)
+    if ret is None:
+        nodes = list(Node.find(
+            Q('_id', 'in', conf.submissions) &
+            Q('is_public', 'eq', True) &
+            Q('is_deleted', 'eq', False)
+        ))
+        files = _get_conference_files(nodes)
+        ret = [
+            _render_conference_node(each, idx, conf, files=files)
+            for idx, each in enumerate(nodes)
+        ]
+        submissions_cache.set(key, ret)
+        if conf.num_submissions != len(ret):
+            # Cache the number of submissions for the meetings page
+            database['conference'].update({'_id': conf._id}, {'$set': {'num_submissions': len(ret)}})
+            conf.num_submissions = len(ret)
+    return list(ret)
+
+
 def conference_data(meeting):
     try:
         conf = Conference.find_one(Q('endpoint', 'iexact', meeting))
     except ModularOdmException:
         raise HTTPError(httplib.NOT_FOUND)
 
-    nodes = Node.find(
-        Q('tags', 'iexact', meeting) &
-        Q('is_public', 'eq', True) &
-        Q('is_deleted', 'eq', False)
-    )
-
-    ret = [
-        _render_conference_node(each, idx, conf)
-        for idx, each in enumerate(nodes)
-    ]
-    return ret
+    return get_conference_submissions(conf)
 
 
 def redirect_to_meetings(**kwargs):
@@ -208,7 +267,7 @@ def conference_results(meeting):
     except ModularOdmException:
         raise HTTPError(httplib.NOT_FOUND)
 
-    data = conference_data(meeting)
+    data = get_conference_submissions(conf)
 
     return {
         'data': json.dumps(data),
@@ -221,30 +280,12 @@ def conference_results(meeting):
 def conference_submissions(**kwargs):
     """Return data for all OSF4M submissions.
 
-    The total number of submissions for each meeting is calculated and cached
-    in the Conference.num_submissions field.
+    The total number of submissions for each meeting is cached in the
+    Conference.num_submissions field when its submissions are rendered.
     """
     submissions = []
     for conf in Conference.find():
-        # For efficiency, we filter by tag first, then node
-        # instead of doing a single Node query
-        projects = set()
-        for tag in Tag.find(Q('_id', 'iexact', conf.endpoint)):
-            for node in tag.node__tagged:
-                if not node:
-                    continue
-                if not node.is_public or node.is_deleted:
-                    continue
-                projects.add(node)
-
-        for idx, node in enumerate(projects):
-            submissions.append(_render_conference_node(node, idx, conf))
-        num_submissions = len(projects)
-        # Cache the number of submissions
-        conf.num_submissions = num_submissions
-        conf.save()
-        if num_submissions < settings.CONFERENCE_MIN_COUNT:
-            continue
+        submissions.extend(get_conference_submissions(conf))
     submissions.sort(key=lambda submission: submission['dateCreated'], reverse=True)
 
     return {'submissions': submissions}
@@ -15,7 +15,7 @@ from dateutil.parser import parse as parse_date
 from framework.guid.model import Guid
 from framework.mongo import StoredObject
 from framework.mongo.utils import unique_on
-from framework.analytics import get_basic_counters
+from framework.analytics import get_basic_counters, get_basic_counters_many
 
 from website import util
 from website.files import utils
@@ -53,6 +53,7 @@ class TrashedFileNode(StoredObject):
     name = fields.StringField(required=True)
     path = fields.StringField(required=True)
     materialized_path = fields.StringField(required=True)
+    ancestor_ids = fields.StringField(list=True)
 
     checkout = fields.AbstractForeignField('User')
     deleted_by = fields.AbstractForeignField('User')
@@ -103,6 +104,33 @@ class StoredFileNode(StoredObject):
             ('is_file', pymongo.ASCENDING),
             ('provider', pymongo.ASCENDING)
         ]
+    }, {
+        # Children of a folder, and `find_child_by_name`
+        'unique': False,
+        'key_or_list': [
+            ('node', pymongo.ASCENDING),
+            ('parent', pymongo.ASCENDING),
+            ('name', pymongo.ASCENDING)
+        ]
+    }, {
+        'unique': False,
+        'key_or_list': [
+            ('parent', pymongo.ASCENDING),
+            ('name', pymongo.ASCENDING)
+        ]
+    }, {
+        # Children of a folder in the default order of the files API
+        'unique': False,
+        'key_or_list': [
+            ('parent', pymongo.ASCENDING),
+            ('materialized_path', pymongo.ASCENDING)
+        ]
+    }, {
+        # Everything below a folder; see `OsfStorageFileNode.lineage`
+        'unique': False,
+        'key_or_list': [
+            ('ancestor_ids', pymongo.ASCENDING)
+        ]
     }]
 
     _id = fields.StringField(primary=True, default=lambda: str(bson.ObjectId()))
@@ -125,6 +153,9 @@ class StoredFileNode(StoredObject):
     name = fields.StringField(required=True)
     path = fields.StringField(required=True)
     materialized_path = fields.StringField(required=True)
+    # Ids of the folders above this one, root first
+    # Only maintained for OsfStorage, see OsfStorageFileNode.save
+    ancestor_ids = fields.StringField(list=True)
 
     # The User that has this file "checked out"
     # Should only be used for OsfStorage
@@ -417,6 +448,7 @@ class FileNode(object):
             versions=self.versions,
             last_touched=self.last_touched,
             materialized_path=self.materialized_path,
+            ancestor_ids=self.ancestor_ids,
 
             deleted_by=user
         )
@@ -568,16 +600,43 @@ class File(FileNode):
         self.save()
         return version
 
+    @staticmethod
+    def prefetch_download_counts(files, versions=(None, )):
+        """Load the download counts of many files with a single query and
+        store them on each file, so that later calls to `get_download_count`
+        and `serialize` do not touch the database.
+
+        :param files: Iterable of File objects
+        :param versions: Versions to load counts for; None is the file total
+        :return list: The files
+        """
+        files = list(files)
+        pages = [
+            (each, version, each._get_download_page(version))
+            for each in files
+            for version in versions
+        ]
+        counts = get_basic_counters_many(page for _, _, page in pages)
+        for each, version, page in pages:
+            _, count = counts[page]
+            each.__dict__.setdefault('_download_counts', {})[version] = count or 0
+        return files
+
+    def _get_download_page(self, version=None):
+        parts = ['download', self.node._id, self._id]
+        if version is not None:
+            parts.append(version)
+        return ':'.join([format(part) for part in parts])
+
     def get_download_count(self, version=None):
         """Pull the download count from the pagecounter collection
         Limit to version if specified.
         Currently only useful for OsfStorage
         """
-        parts = ['download', self.node._id, self._id]
-        if version is not None:
-            parts.append(version)
-        page = ':'.join([format(part) for part in parts])
-        _, count = get_basic_counters(page)
+        prefetched = self.__dict__.get('_download_counts', {})
+        if version in prefetched:
+            return prefetched[version]
+        _, count = get_basic_counters(self._get_download_page(version))
 
         return count or 0
 
@@ -656,6 +715,17 @@ class FileVersion(StoredObject):
     about where the file is located, hashes and datetimes
     """
 
+    __indices__ = [{
+        # `_find_matching_archive`; sparse as most versions are not yet archived
+        'unique': False,
+        'sparse': True,
+        'key_or_list': [
+            ('metadata.sha256', pymongo.ASCENDING),
+            ('metadata.vault', pymongo.ASCENDING),
+            ('metadata.archive', pymongo.ASCENDING)
+        ]
+    }]
+
     _id = fields.StringField(primary=True, default=lambda: str(bson.ObjectId()))
 
     creator = fields.ForeignField('user')
@@ -1,11 +1,9 @@
 from __future__ import unicode_literals
 
-import os
-
 from modularodm import Q
 
 from website.files import exceptions
-from website.files.models.base import File, Folder, FileNode, FileVersion
+from website.files.models.base import File, Folder, FileNode, FileVersion, StoredFileNode
 
 
 __all__ = ('OsfStorageFile', 'OsfStorageFolder', 'OsfStorageFileNode')
@@ -39,26 +37,52 @@ class OsfStorageFileNode(FileNode):
 
     @property
     def materialized_path(self):
-        """creates the full path to a the given filenode
-        Note: Possibly high complexity/ many database calls
-        USE SPARINGLY
+        """The full path to this filenode, stored on save.
+        Filenodes saved before paths were stored build it from their parents.
+        """
+        return self.stored_object.materialized_path or self._build_lineage()[1]
+
+    def lineage(self):
+        """This filenode followed by each of its parents, up to the root.
+        Loaded with a single query from `ancestor_ids`.
+        """
+        if not self.stored_object.materialized_path and self.parent is not None:
+            # Saved before lineage was stored, walk up instead
+            return [self] + self.parent.lineage()
+        ancestors = StoredFileNode.load_many(reversed(self.ancestor_ids))
+        return [self] + [ancestor.wrapped() for ancestor in ancestors]
+
+    def _build_lineage(self):
+        """Compute the ancestor ids and materialized path of this filenode
+        from those stored on its parent.
+        :rtype: tuple
+        :returns: (ancestor_ids, materialized_path)
         """
-        if not self.parent:
-            return '/'
-        # Note: ODM cache can be abused here
-        # for highly nested folders calling
-        # list(self.__class__.find(Q(nodesetting),Q(folder))
-        # may result in a massive increase in performance
-        def lineage():
-            current = self
-            while current:
-                yield current
-                current = current.parent
-
-        path = os.path.join(*reversed([x.name for x in lineage()]))
-        if self.is_file:
-            return '/{}'.format(path)
-        return '/{}/'.format(path)
+        parent = self.parent
+        if parent is None:
+            return [], '/'
+        if parent.stored_object.materialized_path:
+            ancestor_ids, parent_path = list(parent.ancestor_ids), parent.stored_object.materialized_path
+        else:
+            ancestor_ids, parent_path = parent._build_lineage()
+        return ancestor_ids + [parent._id], parent_path + self.name + ('' if self.is_file else '/')
+
+    def _update_descendants(self, old_path):
+        """Rewrite the stored lineage of everything below this folder after
+        it has been moved or renamed. The subtree is found with one indexed
+        query rather than by walking it a folder at a time.
+        """
+        from website.search import search
+        prefix_ids = list(self.ancestor_ids) + [self._id]
+        for descendant in StoredFileNode.find(Q('ancestor_ids', 'eq', self._id)):
+            ancestor_ids = list(descendant.ancestor_ids)
+            descendant.ancestor_ids = prefix_ids + ancestor_ids[ancestor_ids.index(self._id) + 1:]
+            descendant.materialized_path = self.materialized_path + descendant.materialized_path[len(old_path):]
+            moved_node = descendant.node != self.node
+            descendant.node = self.node
+            descendant.save()
+            if moved_node and descendant.is_file:
+                search.update_file(descendant.wrapped())
 
     @property
     def path(self):
@@ -79,12 +103,33 @@ class OsfStorageFileNode(FileNode):
     def move_under(self, destination_parent, name=None):
         if self.is_checked_out:
             raise exceptions.FileNodeCheckedOutError()
-        return super(OsfStorageFileNode, self).move_under(destination_parent, name)
+        self.name = name or self.name
+        self.parent = destination_parent.stored_object
+        self.node = destination_parent.node
+        # Trust save to update the node of our descendants
+        self.save()
+        return self
 
     def save(self):
         self.path = ''
-        self.materialized_path = ''
-        return super(OsfStorageFileNode, self).save()
+        # Clones are unsaved but carry the lineage of their source
+        was_saved = self.stored_object._is_loaded
+        old_path = self.stored_object.materialized_path if was_saved else ''
+        old_ancestor_ids = list(self.ancestor_ids)
+        self.ancestor_ids, self.materialized_path = self._build_lineage()
+        ret = super(OsfStorageFileNode, self).save()
+        # Roots differ between nodes, so a move across nodes changes ancestor_ids too
+        moved = (old_ancestor_ids, old_path) != (list(self.ancestor_ids), self.materialized_path)
+        if self.is_file or not was_saved:
+            return ret
+        if not old_path:
+            # Saved before lineage was stored, so our descendants' paths can't be
+            # rewritten by prefix. Save each child, which recomputes its own subtree.
+            for child in self.children:
+                child._update_node(recursive=False, save=True)
+        elif moved:
+            self._update_descendants(old_path)
+        return ret
 
 
 class OsfStorageFile(OsfStorageFileNode, File):
@@ -48,6 +48,8 @@ class GenWrapper(object):
         """__getitem__ does not default to __getattr__
         so it must be explicitly overriden
         """
+        if isinstance(x, slice):
+            return [each.wrapped() for each in self.mqs[x]]
         return self.mqs[x].wrapped()
 
     def __len__(self):
@@ -67,6 +69,9 @@ class GenWrapper(object):
     def limit(self, *args, **kwargs):
         return self.__class__(self.mqs.limit(*args, **kwargs))
 
+    def sort(self, *args, **kwargs):
+        return self.__class__(self.mqs.sort(*args, **kwargs))
+
 def validate_location(value):
     if value is None:
         return  # Allow for None locations but not broken dicts
@@ -1,4 +1,5 @@
 import bson
+import pymongo
 from datetime import datetime
 
 from modularodm import fields, Q
@@ -9,6 +10,25 @@ from website.mails import presends
 
 
 class QueuedMail(StoredObject):
+    __indices__ = [
+        {
+            # Finding unsent mails that are due
+            'unique': False,
+            'key_or_list': [
+                ('sent_at', pymongo.ASCENDING),
+                ('send_at', pymongo.ASCENDING),
+            ]
+        },
+        {
+            # Finding when users were last mailed
+            'unique': False,
+            'key_or_list': [
+                ('user', pymongo.ASCENDING),
+                ('sent_at', pymongo.ASCENDING),
+            ]
+        },
+    ]
+
     _id = fields.StringField(primary=True, default=lambda: str(bson.ObjectId()))
     user = fields.ForeignField('User', index=True, required=True)
     to_addr = fields.StringField()
@@ -26,13 +46,11 @@ class QueuedMail(StoredObject):
     data = fields.DictionaryField()
     sent_at = fields.DateTimeField(index=True)
 
-    def send_mail(self):
+    def prepare(self):
         """
-        Grabs the data from this email, checks for user subscription to help mails,
-
-        constructs the mail object and checks presend. Then attempts to send the email
-        through send_mail()
-        :return: boolean based on whether email was sent.
+        Checks presend and the user's subscription to help mails.
+        :return: tuple of the address, Mail and template context to send, or
+            None if the email should not be sent.
         """
         mail_struct = queue_mail_types[self.email_type]
         presend = mail_struct['presend'](self)
@@ -42,7 +60,21 @@ class QueuedMail(StoredObject):
         )
         self.data['osf_url'] = settings.DOMAIN
         if presend and self.user.is_active and self.user.osf_mailing_lists.get(settings.OSF_HELP_LIST):
-            send_mail(self.to_addr or self.user.username, mail, mimetype='html', **(self.data or {}))
+            return self.to_addr or self.user.username, mail, self.data or {}
+        return None
+
+    def send_mail(self):
+        """
+        Grabs the data from this email, checks for user subscription to help mails,
+
+        constructs the mail object and checks presend. Then attempts to send the email
+        through send_mail()
+        :return: boolean based on whether email was sent.
+        """
+        prepared = self.prepare()
+        if prepared:
+            to_addr, mail, context = prepared
+            send_mail(to_addr, mail, mimetype='html', **context)
             self.sent_at = datetime.utcnow()
             self.save()
             return True
@@ -1,11 +1,19 @@
 from babel import dates, core, Locale
+from modularodm import Q
+
+from framework.mongo import database
+from framework.tasks.handlers import enqueue_task
 
 from website import mails
+from website import settings
 from website import models as website_models
 from website.notifications import constants
+from website.notifications import tasks
 from website.notifications import utils
 from website.notifications.model import NotificationDigest
+from website.notifications.model import validate_subscription_type
 from website.notifications.model import NotificationSubscription
+from website.notifications.model import get_subscription_cache
 from website.util import web_url_for
 
 
@@ -46,7 +54,9 @@ def notify(event, user, node, timestamp, **context):
 def store_emails(recipient_ids, notification_type, event, user, node, timestamp, **context):
     """Store notification emails
 
-    Emails are sent via celery beat as digests
+    Emails are sent via celery beat as digests. If
+    `NOTIFICATIONS_DEFER_DIGESTS` is set, the digests are created in a celery
+    task queued after the request.
     :param recipient_ids: List of user ids to send mail to.
     :param notification_type: from constants.Notification_types
     :param event: event that triggered notification
@@ -59,56 +69,129 @@ def store_emails(recipient_ids, notification_type, event, user, node, timestamp,
     if notification_type == 'none':
         return
 
+    recipient_ids = [user_id for user_id in recipient_ids if user_id != user._id]
+    if not recipient_ids:
+        return
+
+    if settings.NOTIFICATIONS_DEFER_DIGESTS:
+        enqueue_task(tasks.store_digests.si(
+            recipient_ids, notification_type, event, user._id, node._id if node else None, timestamp,
+            # Stored objects are passed by key; templates only use `user`
+            dict(
+                (key, getattr(value, '_primary_key', value))
+                for key, value in context.iteritems()
+            ),
+        ))
+    else:
+        create_digests(recipient_ids, notification_type, event, user, node, timestamp, **context)
+
+
+def create_digests(recipient_ids, notification_type, event, user, node, timestamp, **context):
+    """Create the digests for :func:`store_emails`.
+
+    The message differs between recipients only in its timestamp, so it is
+    rendered once per timezone and locale, and all digests are inserted at
+    once.
+    """
+    validate_subscription_type(notification_type)
     template = event + '.html.mako'
     context['user'] = user
     node_lineage_ids = get_node_lineage(node) if node else []
 
+    recipients = dict(
+        (recipient._id, recipient)
+        for recipient in website_models.User.find(Q('_id', 'in', recipient_ids))
+    )
+    messages = {}
+    digests = []
     for user_id in recipient_ids:
-        if user_id == user._id:
+        recipient = recipients.get(user_id)
+        if recipient is None:
             continue
-        recipient = website_models.User.load(user_id)
-        context['localized_timestamp'] = localize_timestamp(timestamp, recipient)
-        message = mails.render_message(template, **context)
-
-        digest = NotificationDigest(
+        key = (recipient.timezone, recipient.locale)
+        if key not in messages:
+            context['localized_timestamp'] = localize_timestamp(timestamp, recipient)
+            messages[key] = mails.render_message(template, **context)
+        digests.append(NotificationDigest(
             timestamp=timestamp,
             send_type=notification_type,
             event=event,
             user_id=user_id,
-            message=message,
+            message=messages[key],
             node_lineage=node_lineage_ids
-        )
-        digest.save()
+        ))
+
+    if digests:
+        database['notificationdigest'].insert([digest.to_storage() for digest in digests])
 
 
-def compile_subscriptions(node, event_type, event=None, level=0):
-    """Recurse through node and parents for subscriptions.
+def compile_subscriptions(node, event_type, event=None):
+    """Resolve the subscriptions of node and its parents for an event.
+
+    Subscriptions on a node override those of its parents, and a
+    subscription to a particular event overrides the node's subscriptions.
+    The lineage and all its subscriptions are loaded at once, and results
+    are cached for the rest of the request or task.
 
     :param node: current node
     :param event_type: Generally node_subscriptions_available
     :param event: Particular event such a file_updated that has specific file subs
-    :param level: How deep the recursion is
     :return: a dict of notification types with lists of users.
     """
-    subscriptions = check_node(node, event_type)
+    cache = get_subscription_cache()
+    key = (node._id, event_type, event)
+    if key not in cache:
+        cache[key] = resolve_subscriptions(node, event_type, event)
+    # Callers modify the lists they are given
+    return {
+        notification_type: list(user_ids)
+        for notification_type, user_ids in cache[key].iteritems()
+    }
+
+
+def resolve_subscriptions(node, event_type, event=None):
+    """Uncached implementation of :func:`compile_subscriptions`."""
+    lineage = get_lineage(node)
+    levels = [(each, utils.to_subscription_key(each._id, event_type)) for each in lineage]
     if event:
-        subscriptions = check_node(node, event)  # Gets particular event subscriptions
-        parent_subscriptions = compile_subscriptions(node, event_type, level=level + 1)  # get node and parent subs
-    elif node.parent_id:
-        parent_subscriptions = \
-            compile_subscriptions(website_models.Node.load(node.parent_id), event_type, level=level + 1)
-    else:
-        parent_subscriptions = check_node(None, event_type)
-    for notification_type in parent_subscriptions:
-        p_sub_n = parent_subscriptions[notification_type]
-        p_sub_n.extend(subscriptions[notification_type])
-        for nt in subscriptions:
-            if notification_type != nt:
-                p_sub_n = list(set(p_sub_n).difference(set(subscriptions[nt])))
-        if level == 0:
-            p_sub_n, removed = utils.separate_users(node, p_sub_n)
-        parent_subscriptions[notification_type] = p_sub_n
-    return parent_subscriptions
+        levels.append((node, utils.to_subscription_key(node._id, event)))
+    documents = {
+        document['_id']: document
+        for document in database['notificationsubscription'].find(
+            {'_id': {'$in': [subscription_key for _, subscription_key in levels]}},
+            dict.fromkeys(constants.NOTIFICATION_TYPES, True),
+        )
+    }
+
+    subscriptions = {key: [] for key in constants.NOTIFICATION_TYPES}
+    for level_node, subscription_key in levels:
+        document = documents.get(subscription_key)
+        if not document:
+            continue
+        reader_ids = utils.get_reader_ids(level_node)
+        level = {
+            notification_type: [
+                user_id for user_id in document.get(notification_type) or []
+                if user_id in reader_ids
+            ]
+            for notification_type in constants.NOTIFICATION_TYPES
+        }
+        subscribed = set(user_id for user_ids in level.values() for user_id in user_ids)
+        for notification_type in constants.NOTIFICATION_TYPES:
+            others = subscribed.difference(level[notification_type])
+            subscriptions[notification_type] = unique([
+                user_id for user_id in subscriptions[notification_type]
+                if user_id not in subscribed
+            ] + [
+                user_id for user_id in level[notification_type]
+                if user_id not in others
+            ])
+
+    reader_ids = utils.get_reader_ids(node)
+    return {
+        notification_type: [user_id for user_id in user_ids if user_id in reader_ids]
+        for notification_type, user_ids in subscriptions.iteritems()
+    }
 
 
 def check_node(node, event):
@@ -116,25 +199,39 @@ def check_node(node, event):
     node_subscriptions = {key: [] for key in constants.NOTIFICATION_TYPES}
     if node:
         subscription = NotificationSubscription.load(utils.to_subscription_key(node._id, event))
+        reader_ids = utils.get_reader_ids(node)
         for notification_type in node_subscriptions:
             users = getattr(subscription, notification_type, [])
             for user in users:
-                if node.has_permission(user, 'read'):
+                if user and user._id in reader_ids:
                     node_subscriptions[notification_type].append(user._id)
     return node_subscriptions
 
 
+def get_lineage(node):
+    """Return the nodes from the top most project down to node, cached for
+    the rest of the request or task.
+    """
+    cache = get_subscription_cache()
+    key = ('lineage', node._id)
+    if key not in cache:
+        lineage = [node]
+        while lineage[0].parent_id:
+            lineage.insert(0, website_models.Node.load(lineage[0].parent_id))
+        cache[key] = lineage
+    return cache[key]
+
+
 def get_node_lineage(node):
     """ Get a list of node ids in order from the node to top most project
         e.g. [parent._id, node._id]
     """
-    lineage = [node._id]
+    return [each._id for each in get_lineage(node)]
 
-    while node.parent_id:
-        node = website_models.Node.load(node.parent_id)
-        lineage = [node._id] + lineage
 
-    return lineage
+def unique(items):
+    seen = set()
+    return [item for item in items if not (item in seen or seen.add(item))]
 
 
 def get_settings_url(uid, user):
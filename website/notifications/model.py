@@ -1,12 +1,40 @@
+import weakref
+
+import pymongo
 from modularodm import fields
 
-from framework.mongo import StoredObject, ObjectId
+from framework.mongo import StoredObject, ObjectId, get_cache_key
 from modularodm.exceptions import ValidationValueError
 
+from website.project import signals as project_signals
 from website.project.model import Node
 from website.notifications.constants import NOTIFICATION_TYPES
 
 
+# Node fields that change resolved subscriptions or lineages
+SUBSCRIPTION_CACHE_FIELDS = {'permissions', 'inherited_admin_ids', 'nodes', 'is_deleted'}
+
+_subscription_caches = weakref.WeakKeyDictionary()
+
+
+def get_subscription_cache():
+    """Return the cache of resolved subscriptions and node lineages for the
+    current request or task. It is cleared whenever a subscription is saved
+    or a node changes permissions or structure.
+    """
+    return _subscription_caches.setdefault(get_cache_key(), {})
+
+
+def clear_subscription_cache():
+    _subscription_caches.pop(get_cache_key(), None)
+
+
+@project_signals.node_updated.connect
+def clear_subscription_cache_on_update(node, fields):
+    if SUBSCRIPTION_CACHE_FIELDS.intersection(fields):
+        clear_subscription_cache()
+
+
 def validate_subscription_type(value):
     if value not in NOTIFICATION_TYPES:
         raise ValidationValueError
@@ -41,6 +69,10 @@ class NotificationSubscription(StoredObject):
         if save:
             self.save()
 
+    def save(self, *args, **kwargs):
+        clear_subscription_cache()
+        return super(NotificationSubscription, self).save(*args, **kwargs)
+
     def remove_user_from_subscription(self, user, save=True):
         for notification_type in NOTIFICATION_TYPES:
             try:
@@ -60,6 +92,15 @@ class NotificationSubscription(StoredObject):
 
 
 class NotificationDigest(StoredObject):
+    __indices__ = [{
+        'unique': False,
+        'key_or_list': [
+            ('send_type', pymongo.ASCENDING),
+            ('user_id', pymongo.ASCENDING),
+            ('timestamp', pymongo.ASCENDING),
+        ]
+    }]
+
     _id = fields.StringField(primary=True, default=lambda: str(ObjectId()))
     user_id = fields.StringField(index=True)
     timestamp = fields.DateTimeField()
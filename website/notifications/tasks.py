@@ -1,7 +1,12 @@
 """
 Tasks for making even transactional emails consolidated.
 """
-from bson.code import Code
+import logging
+import operator
+import itertools
+
+import pymongo
+from celery import signals as celery_signals
 from modularodm import Q
 
 from framework.tasks import app as celery_app
@@ -13,43 +18,105 @@ from framework.transactions.context import TokuTransaction
 
 from website.notifications.utils import NotificationsDict
 from website.notifications.model import NotificationDigest
+from website.notifications.model import clear_subscription_cache
 from website import mails
 
+logger = logging.getLogger(__name__)
+
+# Number of users whose digests are deleted and checkpointed together
+DIGEST_BATCH_SIZE = 100
+
+
+@celery_signals.task_prerun.connect
+def clear_caches(*args, **kwargs):
+    """Resolved subscriptions are cached for the duration of a task."""
+    clear_subscription_cache()
+
 
 @celery_app.task(name='notify.send_users_email', max_retries=0)
 def send_users_email(send_type):
     """Find pending Emails and amalgamates them into a single Email.
 
+    Users are processed in batches in order of user id. After each batch
+    its digests are deleted and the last user id is recorded, so that a run
+    that fails part way resumes after the last user it mailed.
+
     :param send_type
     :return:
     """
-    grouped_emails = get_users_emails(send_type)
-    if not grouped_emails:
-        return
-    for group in grouped_emails:
-        user = User.load(group['user_id'])
-        if not user:
-            log_exception()
-            continue
-        info = group['info']
-        notification_ids = [message['_id'] for message in info]
-        sorted_messages = group_by_node(info)
-        if sorted_messages:
-            mails.send_mail(
-                to_addr=user.username,
-                mimetype='html',
-                mail=mails.DIGEST,
-                name=user.fullname,
-                message=sorted_messages,
-                callback=remove_notifications(email_notification_ids=notification_ids)
-            )
-
-
-def get_users_emails(send_type):
-    """Get all emails that need to be sent.
+    checkpoint = db['notificationdigestcheckpoint'].find_one({'_id': send_type})
+    after = checkpoint['user_id'] if checkpoint else None
+    if after:
+        logger.info('Resuming {0} digests after user {1}'.format(send_type, after))
+    batch = []
+    for group in get_users_emails(send_type, after=after):
+        batch.append(group)
+        if len(batch) >= DIGEST_BATCH_SIZE:
+            send_digest_batch(send_type, batch)
+            batch = []
+    if batch:
+        send_digest_batch(send_type, batch)
+    db['notificationdigestcheckpoint'].remove({'_id': send_type})
+
+
+def send_digest_batch(send_type, groups):
+    """Mail each user in ``groups`` their digest, then delete the sent
+    notifications and record progress. If sending fails part way, progress
+    up to the last user handled is still recorded, so that they are not
+    mailed again when the task is rerun.
+    """
+    User.load_many(group['user_id'] for group in groups)
+    notification_ids = []
+    last_user_id = None
+    try:
+        for group in groups:
+            user = User.load(group['user_id'])
+            if not user:
+                log_exception()
+                last_user_id = group['user_id']
+                continue
+            info = group['info']
+            sorted_messages = group_by_node(info)
+            if sorted_messages:
+                mails.send_mail(
+                    to_addr=user.username,
+                    mimetype='html',
+                    mail=mails.DIGEST,
+                    name=user.fullname,
+                    message=sorted_messages,
+                )
+            notification_ids.extend(message['_id'] for message in info)
+            last_user_id = group['user_id']
+    finally:
+        if last_user_id is not None:
+            with TokuTransaction():
+                remove_notifications(email_notification_ids=notification_ids)
+                db['notificationdigestcheckpoint'].update(
+                    {'_id': send_type},
+                    {'$set': {'user_id': last_user_id}},
+                    upsert=True,
+                )
+
+
+@celery_app.task(name='notify.store_digests', max_retries=0)
+def store_digests(recipient_ids, notification_type, event, user_id, node_id, timestamp, context):
+    """Create the digests of a notification queued by `emails.store_emails`."""
+    # Prevent circular import
+    from website.notifications import emails
+    from website.project.model import Node
+    with TokuTransaction():
+        user = User.load(user_id)
+        node = Node.load(node_id) if node_id else None
+        emails.create_digests(recipient_ids, notification_type, event, user, node, timestamp, **context)
+
+
+def get_users_emails(send_type, after=None):
+    """Get all emails that need to be sent, streamed one user at a time in
+    order of user id.
 
     :param send_type: from NOTIFICATION_TYPES
-    :return: [{
+    :param after: Only include users with a greater id
+    :return: Generator of {
                 'user_id': 'se8ea',
                 'info': [{
                     'message': {
@@ -60,31 +127,30 @@ def get_users_emails(send_type):
                     '_id': NotificationDigest._id
                 }, ...
                 }]
-              },
-              {
-                'user_id': ...
-              }]
+              }
     """
-    with TokuTransaction():
-        emails = db['notificationdigest'].group(
-            key={'user_id': 1},
-            condition={
-                'send_type': send_type
-            },
-            initial={'info': []},
-            reduce=Code(
-                """
-                function(curr, result) {
-                    result.info.push({
-                        'message': curr.message,
-                        'node_lineage': curr.node_lineage,
-                        '_id': curr._id
-                    });
-                };
-                """
-            )
-        )
-    return emails
+    query = {'send_type': send_type}
+    if after is not None:
+        query['user_id'] = {'$gt': after}
+    digests = db['notificationdigest'].find(
+        query,
+        {'user_id': True, 'message': True, 'node_lineage': True},
+    ).sort([
+        ('user_id', pymongo.ASCENDING),
+        ('timestamp', pymongo.ASCENDING),
+    ])
+    for user_id, user_digests in itertools.groupby(digests, key=operator.itemgetter('user_id')):
+        yield {
+            'user_id': user_id,
+            'info': [
+                {
+                    'message': digest['message'],
+                    'node_lineage': digest['node_lineage'],
+                    '_id': digest['_id'],
+                }
+                for digest in user_digests
+            ],
+        }
 
 
 def group_by_node(notifications):
@@ -105,5 +171,5 @@ def remove_notifications(email_notification_ids=None):
     :param email_notification_ids:
     :return:
     """
-    for email_id in email_notification_ids:
-        NotificationDigest.remove(Q('_id', 'eq', email_id))
+    if email_notification_ids:
+        NotificationDigest.remove(Q('_id', 'in', list(email_notification_ids)))
@@ -79,6 +79,18 @@ def remove_subscription(node):
         parent.save()
 
 
+def get_reader_ids(node):
+    """Return the ids of users with read permission on node, matching
+    `Node.has_permission(user, 'read')`.
+    """
+    reader_ids = set(
+        user_id for user_id, permissions in node.permissions.iteritems()
+        if 'read' in permissions
+    )
+    reader_ids.update(node.inherited_admin_ids or [])
+    return reader_ids
+
+
 def separate_users(node, user_ids):
     """Separates users into ones with permissions and ones without given a list.
 
@@ -86,14 +98,11 @@ def separate_users(node, user_ids):
     :param user_ids: List of ids, will also take and return User instances
     :return: list of subbed, list of removed user ids
     """
+    reader_ids = get_reader_ids(node)
     removed = []
     subbed = []
     for user_id in user_ids:
-        try:
-            user = User.load(user_id)
-        except TypeError:
-            user = user_id
-        if node.has_permission(user, 'read'):
+        if getattr(user_id, '_id', user_id) in reader_ids:
             subbed.append(user_id)
         else:
             removed.append(user_id)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Merged, reverse-chronological log feeds across several nodes, e.g. the
+logs of all projects a user watches.
+"""
+import heapq
+import itertools
+
+from modularodm import Q
+
+from website.project.model import NodeLog
+
+
+class _FeedEntry(object):
+    """Heap entry ordering logs most recent first, ties broken by id."""
+
+    __slots__ = ('key', 'log', 'stream')
+
+    def __init__(self, log, stream):
+        self.key = (log.date, log._id)
+        self.log = log
+        self.stream = stream
+
+    def __lt__(self, other):
+        return self.key > other.key
+
+
+def iter_logs(node_ids, since=None, cursor=None):
+    """Lazily yield the logs of ``node_ids``, most recent first. Each node's
+    logs are read through the `(node, date)` index and merged with a heap, so
+    only as many logs are loaded as are consumed. Logs shared by several nodes
+    (e.g. by a fork and its original) are yielded once.
+
+    :param node_ids: Primary keys of the nodes whose logs to merge
+    :param datetime since: Only include logs dated after this naive UTC datetime
+    :param str cursor: Only include logs following this cursor; see `NodeLog.to_cursor`
+    :raises: ValueError if ``cursor`` is malformed
+    """
+    heap = []
+    for node_id in set(node_ids):
+        stream = iter(NodeLog.find_for_node(node_id, since=since, cursor=cursor))
+        log = next(stream, None)
+        if log is not None:
+            heap.append(_FeedEntry(log, stream))
+    heapq.heapify(heap)
+    last_id = None
+    while heap:
+        entry = heap[0]
+        if entry.log._id != last_id:
+            last_id = entry.log._id
+            yield entry.log
+        log = next(entry.stream, None)
+        if log is None:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, _FeedEntry(log, entry.stream))
+
+
+def count_logs(node_ids, since=None):
+    """Return the number of distinct logs of ``node_ids`` with a single
+    indexed count query.
+    """
+    query = Q('__backrefs.logged.node.logs', 'in', list(set(node_ids)))
+    if since is not None:
+        query &= Q('date', 'gt', since)
+    return NodeLog.find(query).count()
+
+
+def get_logs_page(node_ids, size=10, since=None, cursor=None, offset=0):
+    """Return a page of the merged feed of ``node_ids``.
+
+    :param int size: Maximum number of logs to return
+    :param datetime since: Only include logs dated after this naive UTC datetime
+    :param str cursor: Cursor returned with the previous page, if any
+    :param int offset: Number of logs to skip; prefer ``cursor`` for deep pages
+    :return tuple: List of logs and the cursor for the next page, or ``None``
+        if this is the last page
+    :raises: ValueError if ``cursor`` is malformed
+    """
+    logs = list(itertools.islice(
+        iter_logs(node_ids, since=since, cursor=cursor),
+        offset, offset + size + 1,
+    ))
+    next_cursor = logs[size - 1].to_cursor() if len(logs) > size else None
+    return logs[:size], next_cursor
@@ -159,6 +159,16 @@ def validate_comment_reports(value, *args, **kwargs):
 
 class Comment(GuidStoredObject):
 
+    __indices__ = [{
+        # `find_unread`
+        'unique': False,
+        'key_or_list': [
+            ('node', pymongo.ASCENDING),
+            ('date_created', pymongo.ASCENDING),
+            ('date_modified', pymongo.ASCENDING),
+        ]
+    }]
+
     _id = fields.StringField(primary=True)
 
     user = fields.ForeignField('user', required=True, backref='commented')
@@ -320,6 +330,15 @@ class Comment(GuidStoredObject):
 @unique_on(['params.node', '_id'])
 class NodeLog(StoredObject):
 
+    __indices__ = [{
+        'unique': False,
+        'key_or_list': [
+            ('__backrefs.logged.node.logs', pymongo.ASCENDING),
+            ('date', pymongo.DESCENDING),
+            ('_id', pymongo.DESCENDING),
+        ]
+    }]
+
     _id = fields.StringField(primary=True, default=lambda: str(ObjectId()))
 
     date = fields.DateTimeField(default=datetime.datetime.utcnow, index=True)
@@ -408,10 +427,52 @@ class NodeLog(StoredObject):
     REGISTRATION_APPROVAL_INITIATED = 'registration_initiated'
     REGISTRATION_APPROVAL_APPROVED = 'registration_approved'
 
+    CURSOR_DATE_FORMAT = '%Y%m%d%H%M%S%f'
+
     def __repr__(self):
         return ('<NodeLog({self.action!r}, params={self.params!r}) '
                 'with id {self._id!r}>').format(self=self)
 
+    @classmethod
+    def find_for_node(cls, node_id, since=None, user=None, cursor=None):
+        """Return a queryset of the logs attached to a node, most recent first.
+        Served by the `(node, date, _id)` index.
+
+        :param str node_id: Primary key of the node
+        :param datetime since: Only include logs dated after this naive UTC datetime
+        :param User user: Only include logs created by this user
+        :param str cursor: Only include logs following this cursor; see `to_cursor`
+        :raises: ValueError if ``cursor`` is malformed
+        """
+        query = Q('__backrefs.logged.node.logs', 'eq', node_id)
+        if since is not None:
+            query &= Q('date', 'gt', since)
+        if user is not None:
+            query &= Q('user', 'eq', user._id)
+        if cursor:
+            query &= cls.parse_cursor(cursor)
+        return cls.find(query).sort('-date', '-_id')
+
+    def to_cursor(self):
+        """Return an opaque pagination cursor pointing just past this log."""
+        return '{0}:{1}'.format(self.date.strftime(self.CURSOR_DATE_FORMAT), self._id)
+
+    @classmethod
+    def parse_cursor(cls, cursor):
+        """Return a query matching the logs that follow ``cursor`` in
+        reverse chronological order.
+
+        :raises: ValueError if ``cursor`` is malformed
+        """
+        date_string, _, log_id = cursor.partition(':')
+        if not log_id:
+            raise ValueError('Invalid log cursor: {0!r}'.format(cursor))
+        date = datetime.datetime.strptime(date_string, cls.CURSOR_DATE_FORMAT)
+        return (
+            Q('date', 'lt', date) |
+            (Q('date', 'eq', date) & Q('_id', 'lt', log_id))
+        )
+
     @property
     def node(self):
         """Return the :class:`Node` associated with this log."""
@@ -610,6 +671,38 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             ('is_public', pymongo.ASCENDING),
             ('is_deleted', pymongo.ASCENDING),
         ]
+    }, {
+        # One for each branch of `api.base.utils.get_visibility_query`
+        'unique': False,
+        'key_or_list': [
+            ('is_public', pymongo.ASCENDING),
+            ('is_registration', pymongo.ASCENDING),
+            ('is_folder', pymongo.ASCENDING),
+            ('is_deleted', pymongo.ASCENDING),
+        ]
+    }, {
+        'unique': False,
+        'key_or_list': [
+            ('contributors', pymongo.ASCENDING),
+            ('is_registration', pymongo.ASCENDING),
+            ('is_folder', pymongo.ASCENDING),
+            ('is_deleted', pymongo.ASCENDING),
+        ]
+    }, {
+        'unique': False,
+        'key_or_list': [
+            ('inherited_admin_ids', pymongo.ASCENDING),
+            ('is_registration', pymongo.ASCENDING),
+            ('is_folder', pymongo.ASCENDING),
+            ('is_deleted', pymongo.ASCENDING),
+        ]
+    }, {
+        # Keyset pagination on date_created; see `api.base.pagination`
+        'unique': False,
+        'key_or_list': [
+            ('date_created', pymongo.ASCENDING),
+            ('_id', pymongo.ASCENDING),
+        ]
     }]
 
     # Node fields that trigger an update to Solr on save
@@ -630,6 +723,14 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         'node_license',
     }
 
+    # Fields that change which users inherit admin rights on child nodes
+    INHERITED_ADMIN_FIELDS = {
+        'permissions',
+        'inherited_admin_ids',
+        'nodes',
+        'is_deleted',
+    }
+
     # Maps category identifier => Human-readable representation for use in
     # titles, menus, etc.
     # Use an OrderedDict so that menu items show in the correct order
@@ -669,6 +770,9 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
     # User mappings
     permissions = fields.DictionaryField()
     visible_contributor_ids = fields.StringField(list=True)
+    # IDs of users who are admins on an ancestor of this node, and so can read
+    # it; maintained by `update_inherited_admin_ids`
+    inherited_admin_ids = fields.StringField(list=True, index=True)
 
     # Project Organization
     is_dashboard = fields.BooleanField(default=False, index=True)
@@ -730,6 +834,8 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
     users_watching_node = fields.ForeignField('user', list=True, backref='watched')
 
     logs = fields.ForeignField('nodelog', list=True, backref='logged')
+    # Number of entries in `logs`, so counting does not load the list
+    num_logs = fields.IntegerField(default=0)
     tags = fields.ForeignField('tag', list=True, backref='tagged')
 
     # Tags for internal use
@@ -951,9 +1057,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
     def is_admin_parent(self, user):
         if self.has_permission(user, 'admin', check_parent=False):
             return True
-        if self.parent_node:
-            return self.parent_node.is_admin_parent(user)
-        return False
+        return user is not None and user._id in self.inherited_admin_ids
 
     def can_view(self, auth):
         if not auth and not self.is_public:
@@ -962,8 +1066,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         return (
             self.is_public or
             (auth.user and self.has_permission(auth.user, 'read')) or
-            auth.private_key in self.private_link_keys_active or
-            self.is_admin_parent(auth.user)
+            (auth.private_key and auth.private_key in self.private_link_keys_active)
         )
 
     def is_expanded(self, user=None):
@@ -1075,7 +1178,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if permission in self.permissions.get(user._id, []):
             return True
         if permission == 'read' and check_parent:
-            return self.is_admin_parent(user)
+            return user._id in self.inherited_admin_ids
         return False
 
     def has_permission_on_children(self, user, permission):
@@ -1124,12 +1227,36 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             if key not in self.contributors:
                 self.permissions.pop(key)
 
+    def get_inherited_admin_ids(self):
+        """Compute `inherited_admin_ids` from the parent node, which is
+        assumed to be up to date.
+        """
+        parent = self.parent_node
+        if parent is None:
+            return []
+        admin_ids = set(parent.inherited_admin_ids)
+        admin_ids.update(
+            user_id for user_id, perms in parent.permissions.iteritems()
+            if 'admin' in perms
+        )
+        return sorted(admin_ids)
+
+    def update_inherited_admin_ids(self):
+        """Refresh `inherited_admin_ids` on the children of this node. Each
+        child whose value changes is saved, which in turn updates its own
+        children, so only the subtree below a change is visited.
+        """
+        for child in self.nodes:
+            if not child.primary:
+                continue
+            admin_ids = child.get_inherited_admin_ids()
+            if child.inherited_admin_ids != admin_ids:
+                child.inherited_admin_ids = admin_ids
+                child.save()
+
     @property
     def visible_contributors(self):
-        return [
-            User.load(_id)
-            for _id in self.visible_contributor_ids
-        ]
+        return User.load_many(self.visible_contributor_ids)
 
     @property
     def parents(self):
@@ -1140,14 +1267,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
     @property
     def admin_contributor_ids(self, contributors=None):
         contributor_ids = self.contributors._to_primary_keys()
-        admin_ids = set()
-        for parent in self.parents:
-            admins = [
-                user for user, perms in parent.permissions.iteritems()
-                if 'admin' in perms
-            ]
-            admin_ids.update(set(admins).difference(contributor_ids))
-        return admin_ids
+        return set(self.inherited_admin_ids).difference(contributor_ids)
 
     @property
     def admin_contributors(self):
@@ -1331,6 +1451,10 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
 
         first_save = not self._is_loaded
 
+        if first_save:
+            # Clear values copied from the original of a fork or registration
+            self.inherited_admin_ids = self.get_inherited_admin_ids()
+
         if first_save and self.is_dashboard:
             existing_dashboards = self.creator.node__contributed.find(
                 Q('is_dashboard', 'eq', True)
@@ -1385,6 +1509,9 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if need_update:
             self.update_search()
 
+        if self.INHERITED_ADMIN_FIELDS.intersection(saved_fields):
+            self.update_inherited_admin_ids()
+
         if 'node_license' in saved_fields:
             children = [c for c in self.get_descendants_recursive(
                 include=lambda n: n.node_license is None
@@ -1393,6 +1520,9 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             if children:
                 Node.bulk_update_search(children)
 
+        if saved_fields:
+            project_signals.node_updated.send(self, fields=saved_fields)
+
         # This method checks what has changed.
         if settings.PIWIK_HOST and update_piwik:
             piwik_tasks.update_node(self._id, saved_fields)
@@ -1757,13 +1887,35 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         # Return forked content
         return forked
 
+    def get_logs_queryset(self, since=None, user=None):
+        """Return a queryset of this node's logs, most recent first.
+
+        :param datetime since: Only include logs dated after this naive UTC datetime
+        :param User user: Only include logs created by this user
+        """
+        return NodeLog.find_for_node(self._id, since=since, user=user)
+
+    def get_logs_page(self, size=10, cursor=None):
+        """Return a page of this node's logs, most recent first, using keyset
+        pagination rather than skipping over earlier pages.
+
+        :param int size: Maximum number of logs to return
+        :param str cursor: Cursor returned with the previous page, if any
+        :return tuple: List of logs and the cursor for the next page, or
+            ``None`` if this is the last page
+        :raises: ValueError if ``cursor`` is malformed
+        """
+        logs = list(NodeLog.find_for_node(self._id, cursor=cursor).limit(size + 1))
+        next_cursor = logs[size - 1].to_cursor() if len(logs) > size else None
+        return logs[:size], next_cursor
+
     def get_recent_logs(self, n=10):
         """Return a list of the n most recent logs, in reverse chronological
         order.
 
         :param int n: Number of logs to retrieve
         """
-        return list(reversed(self.logs)[:n])
+        return list(self.get_logs_queryset().limit(n))
 
     @property
     def date_modified(self):
@@ -1771,7 +1923,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         the logs.
         '''
         try:
-            return self.logs[-1].date
+            return self.get_recent_logs(1)[0].date
         except IndexError:
             return self.date_created
 
@@ -1961,6 +2113,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         forked = original.clone()
 
         forked.logs = self.logs
+        forked.num_logs = self.num_logs
         forked.tags = self.tags
 
         # Recursively fork child nodes
@@ -2064,6 +2217,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         registered.forked_from = self.forked_from
         registered.creator = self.creator
         registered.logs = self.logs
+        registered.num_logs = self.num_logs
         registered.tags = self.tags
         registered.piwik_site_id = None
         registered.node_license = original.license.copy() if original.license else None
@@ -2151,6 +2305,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             log.date = log_date
         log.save()
         self.logs.append(log)
+        self.num_logs += 1
         if save:
             self.save()
         if user:
@@ -2230,8 +2385,9 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if doi:
             csl['DOI'] = doi
 
-        if self.logs:
-            csl['issued'] = datetime_to_csl(self.logs[-1].date)
+        recent_logs = self.get_recent_logs(1)
+        if recent_logs:
+            csl['issued'] = datetime_to_csl(recent_logs[0].date)
 
         return csl
 
@@ -11,3 +11,5 @@ after_create_registration = signals.signal('post-create-registration')
 archive_callback = signals.signal('archive-callback')
 
 privacy_set_public = signals.signal('privacy_set_public')
+
+node_updated = signals.signal('node-updated')
@@ -4,6 +4,7 @@ from __future__ import division
 
 import re
 import copy
+import collections
 import math
 import logging
 import unicodedata
@@ -196,6 +197,8 @@ def search(query, index=None, doc_type='_all'):
 
 def format_results(results):
     ret = []
+    # Warm the request cache so `load_parent` does not query once per result
+    Node.load_many(result.get('parent_id') for result in results)
     for result in results:
         if result.get('category') == 'user':
             result['url'] = '/profile/' + result['id']
@@ -274,79 +277,204 @@ def update_node_async(self, node_id, index=None, bulk=False):
     except Exception as exc:
         self.retry(exc=exc)
 
+def get_node_parent_id(node):
+    """Return the parent id of ``node`` for its search document.
+
+    :raises: IndexError if ``node`` is an orphaned component
+    """
+    if get_doctype_from_node(node) == 'project':
+        return None
+    return node.parent_id
+
+
+def is_node_searchable(node):
+    return not (node.is_deleted or not node.is_public or node.archiving)
+
+
+def serialize_node(node, category, parent_id=None):
+    """Return the search document for a public node."""
+    from website.addons.wiki.model import NodeWikiPage
+
+    elastic_document_id = node._id
+    try:
+        normalized_title = six.u(node.title)
+    except TypeError:
+        normalized_title = node.title
+    normalized_title = unicodedata.normalize('NFKD', normalized_title).encode('ascii', 'ignore')
+
+    elastic_document = {
+        'id': elastic_document_id,
+        'contributors': [
+            {
+                'fullname': x.fullname,
+                'url': x.profile_url if x.is_active else None
+            }
+            for x in node.visible_contributors
+            if x is not None
+        ],
+        'title': node.title,
+        'normalized_title': normalized_title,
+        'category': category,
+        'public': node.is_public,
+        'tags': [tag._id for tag in node.tags if tag],
+        'description': node.description,
+        'url': node.url,
+        'is_registration': node.is_registration,
+        'is_pending_registration': node.is_pending_registration,
+        'is_retracted': node.is_retracted,
+        'is_pending_retraction': node.is_pending_retraction,
+        'embargo_end_date': node.embargo_end_date.strftime("%A, %b. %d, %Y") if node.embargo_end_date else False,
+        'is_pending_embargo': node.is_pending_embargo,
+        'registered_date': node.registered_date,
+        'wikis': {},
+        'parent_id': parent_id,
+        'date_created': node.date_created,
+        'license': serialize_node_license_record(node.license),
+        'boost': int(not node.is_registration) + 1,  # This is for making registered projects less relevant
+    }
+    if not node.is_retracted:
+        for wiki in NodeWikiPage.load_many(node.wiki_pages_current.values()):
+            elastic_document['wikis'][wiki.page_name] = wiki.raw_text(node)
+    return elastic_document
+
+
+def iter_node_files(node):
+    from website.files.models.osfstorage import OsfStorageFile
+    return paginated(OsfStorageFile, Q('node', 'eq', node))
+
+
 @requires_search
 def update_node(node, index=None, bulk=False):
     index = index or INDEX
-    from website.addons.wiki.model import NodeWikiPage
 
     category = get_doctype_from_node(node)
 
-    if category == 'project':
-        elastic_document_id = node._id
-        parent_id = None
-    else:
-        try:
-            elastic_document_id = node._id
-            parent_id = node.parent_id
-        except IndexError:
-            # Skip orphaned components
-            return
+    try:
+        parent_id = get_node_parent_id(node)
+    except IndexError:
+        # Skip orphaned components
+        return
+    elastic_document_id = node._id
 
-    from website.files.models.osfstorage import OsfStorageFile
-    for file_ in paginated(OsfStorageFile, Q('node', 'eq', node)):
+    for file_ in iter_node_files(node):
         update_file(file_, index=index)
 
-    if node.is_deleted or not node.is_public or node.archiving:
+    if not is_node_searchable(node):
         delete_doc(elastic_document_id, node)
     else:
-        try:
-            normalized_title = six.u(node.title)
-        except TypeError:
-            normalized_title = node.title
-        normalized_title = unicodedata.normalize('NFKD', normalized_title).encode('ascii', 'ignore')
-
-        elastic_document = {
-            'id': elastic_document_id,
-            'contributors': [
-                {
-                    'fullname': x.fullname,
-                    'url': x.profile_url if x.is_active else None
-                }
-                for x in node.visible_contributors
-                if x is not None
-            ],
-            'title': node.title,
-            'normalized_title': normalized_title,
-            'category': category,
-            'public': node.is_public,
-            'tags': [tag._id for tag in node.tags if tag],
-            'description': node.description,
-            'url': node.url,
-            'is_registration': node.is_registration,
-            'is_pending_registration': node.is_pending_registration,
-            'is_retracted': node.is_retracted,
-            'is_pending_retraction': node.is_pending_retraction,
-            'embargo_end_date': node.embargo_end_date.strftime("%A, %b. %d, %Y") if node.embargo_end_date else False,
-            'is_pending_embargo': node.is_pending_embargo,
-            'registered_date': node.registered_date,
-            'wikis': {},
-            'parent_id': parent_id,
-            'date_created': node.date_created,
-            'license': serialize_node_license_record(node.license),
-            'boost': int(not node.is_registration) + 1,  # This is for making registered projects less relevant
-        }
-        if not node.is_retracted:
-            for wiki in [
-                NodeWikiPage.load(x)
-                for x in node.wiki_pages_current.values()
-            ]:
-                elastic_document['wikis'][wiki.page_name] = wiki.raw_text(node)
-
+        elastic_document = serialize_node(node, category, parent_id=parent_id)
         if bulk:
             return elastic_document
         else:
             es.index(index=index, doc_type=category, id=elastic_document_id, body=elastic_document, refresh=True)
 
+PROJECT_LIKE_TYPES = ('project', 'component', 'registration')
+
+
+def _bulk_action(op_type, index, doc_type, doc_id, source=None):
+    action = {
+        '_op_type': op_type,
+        '_index': index,
+        '_type': doc_type,
+        '_id': doc_id,
+    }
+    if source is not None:
+        action['_source'] = source
+    return action
+
+
+def get_node_bulk_actions(node, index=None):
+    """Return bulk actions bringing the documents of ``node`` and its
+    OsfStorage files up to date.
+    """
+    index = index or INDEX
+    actions = [get_file_bulk_action(file_, index=index) for file_ in iter_node_files(node)]
+    category = get_doctype_from_node(node)
+    try:
+        parent_id = get_node_parent_id(node)
+    except IndexError:
+        # Skip orphaned components
+        return actions
+    if is_node_searchable(node):
+        actions.append(_bulk_action(
+            'index', index, category, node._id,
+            serialize_node(node, category, parent_id=parent_id)
+        ))
+    else:
+        actions.append(_bulk_action('delete', index, category, node._id))
+    return actions
+
+
+def get_user_bulk_action(user, index=None):
+    index = index or INDEX
+    if not user.is_active:
+        return _bulk_action('delete', index, 'user', user._id)
+    return _bulk_action('index', index, 'user', user._id, serialize_user(user))
+
+
+def get_file_bulk_action(file_, index=None):
+    index = index or INDEX
+    if not is_file_searchable(file_):
+        return _bulk_action('delete', index, 'file', file_._id)
+    return _bulk_action('index', index, 'file', file_._id, serialize_file(file_))
+
+
+@requires_search
+def bulk_update_documents(keys, index=None):
+    """Bring the search documents identified by ``keys`` up to date with one
+    bulk request and without forcing a refresh.
+
+    :param keys: Iterable of ``(doc_type, id)`` pairs, where ``doc_type`` is
+        one of 'node', 'user' or 'file'
+    :return tuple: Number of successful actions and a list of
+        ``((doc_type, id), error)`` pairs for documents that failed to update
+    """
+    from website.files.models.base import StoredFileNode
+    from website.files.models.osfstorage import OsfStorageFile
+
+    index = index or INDEX
+    ids = collections.defaultdict(list)
+    for doc_type, doc_id in keys:
+        ids[doc_type].append(doc_id)
+
+    actions = []
+    nodes = Node.load_many(ids['node'])
+    for node in nodes:
+        actions.extend(get_node_bulk_actions(node, index=index))
+    # Records that no longer exist cannot be serialized; drop their documents
+    missing_node_ids = set(ids['node']) - set(node._id for node in nodes)
+    for node_id in missing_node_ids:
+        actions.extend(
+            _bulk_action('delete', index, doc_type, node_id)
+            for doc_type in PROJECT_LIKE_TYPES
+        )
+
+    users = User.load_many(ids['user'])
+    actions.extend(get_user_bulk_action(user, index=index) for user in users)
+
+    files = [
+        stored.wrapped()
+        for stored in StoredFileNode.load_many(ids['file'])
+    ]
+    files = [file_ for file_ in files if isinstance(file_, OsfStorageFile)]
+    actions.extend(get_file_bulk_action(file_, index=index) for file_ in files)
+    missing_file_ids = set(ids['file']) - set(file_._id for file_ in files)
+    actions.extend(_bulk_action('delete', index, 'file', file_id) for file_id in missing_file_ids)
+
+    if not actions:
+        return 0, []
+    success, errors = helpers.bulk(es, actions, raise_on_error=False)
+    failures = []
+    for error in errors:
+        op_type, item = error.items()[0]
+        if op_type == 'delete' and item.get('status') == 404:
+            # Deleting a document that was never indexed; expected
+            continue
+        doc_type = 'node' if item['_type'] in PROJECT_LIKE_TYPES else item['_type']
+        failures.append(((doc_type, item['_id']), error))
+    return success, failures
+
+
 def bulk_update_nodes(serialize, nodes, index=None):
     """Updates the list of input projects
 
@@ -397,6 +525,11 @@ def update_user(user, index=None):
             pass
         return
 
+    es.index(index=index, doc_type='user', body=serialize_user(user), id=user._id, refresh=True)
+
+
+def serialize_user(user):
+    """Return the search document for an active user."""
     names = dict(
         fullname=user.fullname,
         given_name=user.given_name,
@@ -414,7 +547,7 @@ def update_user(user, index=None):
                 pass  # This is fine, will only happen in 2.x if val is already unicode
             normalized_names[key] = unicodedata.normalize('NFKD', val).encode('ascii', 'ignore')
 
-    user_doc = {
+    return {
         'id': user._id,
         'user': user.fullname,
         'normalized_user': normalized_names['fullname'],
@@ -431,14 +564,12 @@ def update_user(user, index=None):
         'boost': 2,  # TODO(fabianvf): Probably should make this a constant or something
     }
 
-    es.index(index=index, doc_type='user', body=user_doc, id=user._id, refresh=True)
-
 @requires_search
 def update_file(file_, index=None, delete=False):
 
     index = index or INDEX
 
-    if not file_.node.is_public or delete or file_.node.is_deleted or file_.node.archiving:
+    if delete or not is_file_searchable(file_):
         es.delete(
             index=index,
             doc_type='file',
@@ -448,6 +579,22 @@ def update_file(file_, index=None, delete=False):
         )
         return
 
+    es.index(
+        index=index,
+        doc_type='file',
+        body=serialize_file(file_),
+        id=file_._id,
+        refresh=True
+    )
+
+
+def is_file_searchable(file_):
+    node = file_.node
+    return node.is_public and not node.is_deleted and not node.archiving
+
+
+def serialize_file(file_):
+    """Return the search document for a file on a public node."""
     # We build URLs manually here so that this function can be
     # run outside of a Flask request context (e.g. in a celery task)
     file_deep_url = '/{node_id}/files/{provider}{path}/'.format(
@@ -457,7 +604,7 @@ def update_file(file_, index=None, delete=False):
     )
     node_url = '/{node_id}/'.format(node_id=file_.node._id)
 
-    file_doc = {
+    return {
         'id': file_._id,
         'deep_url': file_deep_url,
         'tags': [tag._id for tag in file_.tags],
@@ -469,14 +616,6 @@ def update_file(file_, index=None, delete=False):
         'is_registration': file_.node.is_registration,
     }
 
-    es.index(
-        index=index,
-        doc_type='file',
-        body=file_doc,
-        id=file_._id,
-        refresh=True
-    )
-
 @requires_search
 def delete_all():
     delete_index(INDEX)
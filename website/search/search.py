@@ -4,6 +4,7 @@ from framework.tasks.handlers import enqueue_task
 
 from website import settings
 from website.search import share_search
+from website.search import update_queue
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +28,9 @@ def search(query, index=None, doc_type=None):
 
 @requires_search
 def update_node(node, index=None, bulk=False, async=True):
-    if async:
+    if async and _use_queue(index):
+        update_queue.enqueue('node', node._id)
+    elif async:
         node_id = node._id
         # We need the transaction to be committed before trying to run celery tasks.
         # For example, when updating a Node's privacy, is_public must be True in the
@@ -41,6 +44,17 @@ def update_node(node, index=None, bulk=False, async=True):
         index = index or settings.ELASTIC_INDEX
         return search_engine.update_node(node, index=index, bulk=bulk)
 
+def _use_queue(index):
+    """Whether an update to ``index`` should go through the coalescing queue.
+    Updates to an explicit index (e.g. during migrations) are applied directly.
+    """
+    return settings.SEARCH_QUEUE_ENABLED and index is None
+
+@requires_search
+def bulk_update_documents(keys, index=None):
+    index = index or settings.ELASTIC_INDEX
+    return search_engine.bulk_update_documents(keys, index=index)
+
 @requires_search
 def bulk_update_nodes(serialize, nodes, index=None):
     index = index or settings.ELASTIC_INDEX
@@ -48,6 +62,9 @@ def bulk_update_nodes(serialize, nodes, index=None):
 
 @requires_search
 def delete_node(node, index=None):
+    if _use_queue(index):
+        update_queue.enqueue('node', node._id)
+        return
     index = index or settings.ELASTIC_INDEX
     doc_type = node.project_or_component
     if node.is_registration:
@@ -60,11 +77,19 @@ def update_contributors(nodes):
 
 @requires_search
 def update_user(user, index=None):
+    if _use_queue(index):
+        update_queue.enqueue('user', user._id)
+        return
     index = index or settings.ELASTIC_INDEX
     search_engine.update_user(user, index=index)
 
 @requires_search
 def update_file(file_, index=None, delete=False):
+    if _use_queue(index):
+        # Deleted files are no longer OsfStorageFiles when flushed, so their
+        # documents are removed
+        update_queue.enqueue('file', file_._id)
+        return
     index = index or settings.ELASTIC_INDEX
     search_engine.update_file(file_, index=index, delete=delete)
 
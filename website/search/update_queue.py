@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Coalescing queue of pending search index updates.
+
+Saving a node, user or file records its ``(doc_type, id)`` key in a Mongo
+collection rather than re-serializing and indexing it immediately. Repeated
+updates to the same document only move its ``last_queued`` date forward. A
+periodic task flushes every key that has been quiet for
+``SEARCH_QUEUE_WINDOW`` seconds, or has waited longer than
+``SEARCH_QUEUE_MAX_LAG`` seconds, through a single bulk request.
+"""
+import logging
+import datetime
+
+from framework.mongo import database
+from framework.tasks import app as celery_app
+
+from website import settings
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = 'searchupdatequeue'
+DOC_TYPES = ('node', 'user', 'file')
+
+
+def _key(doc_type, doc_id):
+    return '{0}:{1}'.format(doc_type, doc_id)
+
+
+def enqueue(doc_type, doc_id):
+    """Queue an update of the search document for ``(doc_type, doc_id)``.
+
+    :param str doc_type: One of 'node', 'user' or 'file'
+    :param str doc_id: Primary key of the record to index
+    """
+    if doc_type not in DOC_TYPES:
+        raise ValueError('Invalid search document type: {0!r}'.format(doc_type))
+    now = datetime.datetime.utcnow()
+    database[COLLECTION].update(
+        {'_id': _key(doc_type, doc_id)},
+        {
+            '$set': {'doc_type': doc_type, 'doc_id': doc_id, 'last_queued': now},
+            '$setOnInsert': {'first_queued': now},
+        },
+        upsert=True,
+    )
+
+
+def get_due(now=None):
+    """Return queued entries that are due to be flushed."""
+    now = now or datetime.datetime.utcnow()
+    quiet_since = now - datetime.timedelta(seconds=settings.SEARCH_QUEUE_WINDOW)
+    waiting_since = now - datetime.timedelta(seconds=settings.SEARCH_QUEUE_MAX_LAG)
+    return list(database[COLLECTION].find({
+        '$or': [
+            {'last_queued': {'$lte': quiet_since}},
+            {'first_queued': {'$lte': waiting_since}},
+        ]
+    }))
+
+
+def flush(now=None):
+    """Index every due entry with one bulk request and remove it from the
+    queue. An entry re-queued while being flushed, or whose document failed
+    to update, is kept for the next run.
+
+    :return int: Number of entries flushed
+    """
+    from website.search import search
+
+    entries = get_due(now=now)
+    if not entries:
+        return 0
+    keys = [(entry['doc_type'], entry['doc_id']) for entry in entries]
+    _, failures = search.bulk_update_documents(keys)
+    failed = set()
+    for key, error in failures:
+        logger.error('Search queue flush error for {0}: {1}'.format(_key(*key), error))
+        failed.add(key)
+    # Documents updated on behalf of another entry, e.g. the files of a node
+    for key in failed.difference(keys):
+        enqueue(*key)
+    flushed = [
+        entry for entry in entries
+        if (entry['doc_type'], entry['doc_id']) not in failed
+    ]
+    for entry in flushed:
+        database[COLLECTION].remove({
+            '_id': entry['_id'],
+            'last_queued': entry['last_queued'],
+        })
+    logger.info('Flushed {0} search index updates'.format(len(flushed)))
+    return len(flushed)
+
+
+def get_stats(now=None):
+    """Return the queue depth and the lag, in seconds, of the oldest entry."""
+    now = now or datetime.datetime.utcnow()
+    collection = database[COLLECTION]
+    oldest = list(collection.find().sort('first_queued', 1).limit(1))
+    return {
+        'depth': collection.count(),
+        'lag': (now - oldest[0]['first_queued']).total_seconds() if oldest else 0.0,
+    }
+
+
+@celery_app.task(name='search.flush_queue')
+def flush_queue():
+    if not settings.SEARCH_QUEUE_ENABLED:
+        return
+    stats = get_stats()
+    logger.info('Search queue depth: {depth}, lag: {lag:.1f}s'.format(**stats))
+    flush()
@@ -3,48 +3,196 @@
 '''Migration script for Search-enabled Models.'''
 from __future__ import absolute_import
 
+import os
+import json
+import time
 import logging
+import functools
+from multiprocessing.dummy import Pool as ThreadPool
 
 from elasticsearch import helpers
 from modularodm.query.querydialect import DefaultQueryDialect as Q
 
 from website import settings
 from framework.auth import User
+from framework.mongo import StoredObject
 from website.models import Node
 from website.app import init_app
 import website.search.search as search
 from scripts import utils as script_utils
+from website.search import elastic_search
 from website.search.elastic_search import es
 
 
 logger = logging.getLogger(__name__)
 
-def migrate_nodes(index):
+# Number of nodes or users serialized between bulk requests and checkpoints
+CHUNK_SIZE = 500
+# Number of threads serializing nodes
+WORKERS = 4
+CHECKPOINT_PATH = os.path.join(settings.LOG_PATH, 'search_migration_checkpoint.json')
+
+
+class ThroughputMeter(object):
+    """Track documents indexed per second over a migration."""
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.start = time.time()
+
+    def add(self, count):
+        self.count += count
+        logger.info('{0}: {1} docs indexed ({2:.1f} docs/sec)'.format(
+            self.name, self.count, self.rate))
+
+    @property
+    def rate(self):
+        elapsed = time.time() - self.start
+        return self.count / elapsed if elapsed else 0.0
+
+
+def load_checkpoint():
+    try:
+        with open(CHECKPOINT_PATH) as fp:
+            return json.load(fp)
+    except (IOError, ValueError):
+        return None
+
+
+def save_checkpoint(checkpoint):
+    with open(CHECKPOINT_PATH, 'w') as fp:
+        json.dump(checkpoint, fp)
+
+
+def clear_checkpoint():
+    try:
+        os.remove(CHECKPOINT_PATH)
+    except OSError:
+        pass
+
+
+def iter_chunks(model, query=None, last_id=None, chunk_size=CHUNK_SIZE):
+    """Yield lists of records matching ``query`` in primary key order, starting
+    after ``last_id``. Caches are cleared between chunks to bound memory use.
+    """
+    while True:
+        chunk_query = query
+        if last_id:
+            after = Q('_id', 'gt', last_id)
+            chunk_query = after if query is None else query & after
+        keys = model.find(chunk_query).sort('_id').limit(chunk_size).get_keys()
+        if not keys:
+            return
+        StoredObject._clear_caches()
+        yield model.load_many(keys)
+        last_id = keys[-1]
+
+
+def _action(index, doc_type, doc_id, source):
+    return {
+        '_op_type': 'index',
+        '_index': index,
+        '_type': doc_type,
+        '_id': doc_id,
+        '_source': source,
+    }
+
+
+def serialize_node_actions(node, index):
+    """Return bulk actions indexing ``node`` and its files."""
+    try:
+        parent_id = elastic_search.get_node_parent_id(node)
+    except IndexError:
+        # Skip orphaned components
+        return []
+    if not elastic_search.is_node_searchable(node):
+        return []
+    actions = [
+        _action(index, 'file', file_._id, elastic_search.serialize_file(file_))
+        for file_ in elastic_search.iter_node_files(node)
+    ]
+    category = elastic_search.get_doctype_from_node(node)
+    actions.append(_action(
+        index, category, node._id,
+        elastic_search.serialize_node(node, category, parent_id=parent_id)
+    ))
+    return actions
+
+
+def _init_worker(app):
+    # Rendering wikis may build URLs, which requires a request context. The
+    # context is never popped so that teardown handlers do not run; it also
+    # gives each worker its own object cache.
+    app.test_request_context().push()
+
+
+def _serialize_in_worker(node, index):
+    StoredObject._clear_caches()
+    return serialize_node_actions(node, index)
+
+
+def bulk_index(actions):
+    """Send ``actions`` through the bulk API without forcing a refresh.
+
+    :return int: Number of documents indexed
+    """
+    return sum(1 for _ in helpers.streaming_bulk(es, actions, chunk_size=CHUNK_SIZE))
+
+
+def migrate_nodes(index, app, checkpoint=None, workers=WORKERS, chunk_size=CHUNK_SIZE):
     logger.info("Migrating nodes to index: {}".format(index))
-    n_iter = 0
-    nodes = Node.find(Q('is_public', 'eq', True) & Q('is_deleted', 'eq', False))
-    for node in nodes:
-        logger.info('Updating node {}'.format(node._id))
-        search.update_node(node, index=index, async=False)
-        n_iter += 1
+    checkpoint = checkpoint or {}
+    meter = ThroughputMeter('Nodes')
+    pool = ThreadPool(workers, initializer=_init_worker, initargs=(app, ))
+    serialize = functools.partial(_serialize_in_worker, index=index)
+    query = Q('is_public', 'eq', True) & Q('is_deleted', 'eq', False)
+    try:
+        for nodes in iter_chunks(Node, query, checkpoint.get('node'), chunk_size):
+            actions = [
+                action
+                for node_actions in pool.map(serialize, nodes)
+                for action in node_actions
+            ]
+            meter.add(bulk_index(actions))
+            checkpoint['node'] = nodes[-1]._id
+            save_checkpoint(checkpoint)
+    finally:
+        pool.close()
+        pool.join()
 
-    logger.info('Nodes migrated: {}'.format(n_iter))
+    logger.info('Nodes migrated: {0} docs at {1:.1f} docs/sec'.format(meter.count, meter.rate))
 
 
-def migrate_users(index):
+def migrate_users(index, checkpoint=None, chunk_size=CHUNK_SIZE):
     logger.info("Migrating users to index: {}".format(index))
-    n_migr = 0
-    n_iter = 0
-    for user in User.find():
-        if user.is_active:
-            search.update_user(user, index=index)
-            n_migr += 1
-        n_iter += 1
+    checkpoint = checkpoint or {}
+    meter = ThroughputMeter('Users')
+    for users in iter_chunks(User, None, checkpoint.get('user'), chunk_size):
+        actions = [
+            _action(index, 'user', user._id, elastic_search.serialize_user(user))
+            for user in users
+            if user.is_active
+        ]
+        meter.add(bulk_index(actions))
+        checkpoint['user'] = users[-1]._id
+        save_checkpoint(checkpoint)
+
+    logger.info('Users migrated: {0} docs at {1:.1f} docs/sec'.format(meter.count, meter.rate))
+
 
-    logger.info('Users iterated: {0}\nUsers migrated: {1}'.format(n_iter, n_migr))
+def set_refresh_interval(index, interval):
+    es.indices.put_settings(index=index, body={'index': {'refresh_interval': interval}})
 
 
-def migrate(delete, index=None, app=None):
+def migrate(delete, index=None, app=None, resume=False, workers=WORKERS, chunk_size=CHUNK_SIZE):
+    """Build a new version of ``index`` from the database and point the alias
+    at it.
+
+    :param bool delete: Delete the previous version of the index
+    :param bool resume: Continue an interrupted migration from its checkpoint
+    :param int workers: Number of threads serializing nodes
+    :param int chunk_size: Number of records per bulk request and checkpoint
+    """
     index = index or settings.ELASTIC_INDEX
     app = app or init_app("website.settings", set_backends=True, routes=True)
 
@@ -55,12 +203,25 @@ def migrate(delete, index=None, app=None):
     ctx = app.test_request_context()
     ctx.push()
 
-    new_index = set_up_index(index)
+    checkpoint = load_checkpoint() if resume else None
+    if checkpoint and checkpoint.get('alias') == index:
+        new_index = checkpoint['index']
+        logger.info('Resuming migration to {0} from {1}'.format(new_index, checkpoint))
+    else:
+        new_index = set_up_index(index)
+        checkpoint = {'alias': index, 'index': new_index}
+        save_checkpoint(checkpoint)
+
+    # Refreshing is pointless until the index is swapped in
+    set_refresh_interval(new_index, '-1')
 
-    migrate_nodes(new_index)
-    migrate_users(new_index)
+    migrate_nodes(new_index, app, checkpoint=checkpoint, workers=workers, chunk_size=chunk_size)
+    migrate_users(new_index, checkpoint=checkpoint, chunk_size=chunk_size)
 
+    set_refresh_interval(new_index, '1s')
+    es.indices.refresh(index=new_index)
     set_up_alias(index, new_index)
+    clear_checkpoint()
 
     if delete:
         delete_old(new_index)
@@ -14,6 +14,14 @@ except ImportError as error:
     raise ImportError("No local.py settings file found. Did you remember to "
                         "copy local-dist.py to local.py?")
 
+# Schedule flushes of the search update queue only if local.py enables it
+if SEARCH_QUEUE_ENABLED and 'CELERYBEAT_SCHEDULE' in globals():
+    from datetime import timedelta
+    CELERYBEAT_SCHEDULE['search-queue-flush'] = {
+        'task': 'search.flush_queue',
+        'schedule': timedelta(seconds=SEARCH_QUEUE_WINDOW),
+    }
+
 if not DEV_MODE:
     from . import local
     from . import defaults
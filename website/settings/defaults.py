@@ -71,6 +71,13 @@ SHARE_ELASTIC_URI = ELASTIC_URI
 SHARE_ELASTIC_INDEX = 'share'
 # For old indices
 SHARE_ELASTIC_INDEX_TEMPLATE = 'share_v{}'
+# Coalesce search index updates in website.search.update_queue rather than
+# indexing (and refreshing) on every save
+SEARCH_QUEUE_ENABLED = False
+# Seconds a queued document must go without further updates before it is indexed
+SEARCH_QUEUE_WINDOW = 5
+# Maximum seconds a queued document waits while updates keep arriving
+SEARCH_QUEUE_MAX_LAG = 60
 
 # Sessions
 # TODO: Override OSF_COOKIE_DOMAIN in local.py in production
@@ -136,6 +143,11 @@ DB_PORT = os_env.get('OSF_DB_PORT', 27017)
 DB_NAME = 'osf20130903'
 DB_USER = None
 DB_PASS = None
+# Size of the process-wide MongoDB connection pool; see framework.mongo.handlers
+DB_MAX_POOL_SIZE = 100
+# Milliseconds to wait for a free pooled socket before raising; None waits forever.
+# Requires pymongo>=2.6
+DB_WAIT_QUEUE_TIMEOUT_MS = None
 
 # Cache settings
 SESSION_HISTORY_LENGTH = 5
@@ -160,6 +172,9 @@ PROFILE_IMAGE_SMALL = 20
 
 # Conference options
 CONFERENCE_MIN_COUNT = 5
+# Seconds and number of conferences for which rendered submissions are cached
+CONFERENCE_SUBMISSIONS_CACHE_TTL = 300
+CONFERENCE_SUBMISSIONS_CACHE_SIZE = 500
 
 WIKI_WHITELIST = {
     'tags': [
@@ -262,6 +277,30 @@ SHARE_REGISTRATION_URL = ''
 SHARE_API_DOCS_URL = ''
 
 CAS_SERVER_URL = 'http://localhost:8080'
+# Seconds to reuse the CAS profile of a bearer token; 0 disables caching.
+# Tokens revoked outside of the OSF remain usable for up to this long.
+CAS_PROFILE_CACHE_TTL = 60
+CAS_PROFILE_CACHE_SIZE = 10000
+
+# Seconds to skip re-checking a verified email and password (HTTP Basic auth);
+# entries are ignored once the user's password or emails change
+CREDENTIAL_CACHE_TTL = 60
+CREDENTIAL_CACHE_SIZE = 1000
+# Minimum interval between writes of User.date_last_login for repeated requests
+DATE_LAST_LOGIN_THROTTLE = timedelta(minutes=5)
+
+# Minimum interval between writes of Session.date_modified for sessions whose
+# data is unchanged; must be well below the age at which sessions are cleared
+SESSION_TOUCH_INTERVAL = timedelta(hours=1)
+
+# Maximum number of pages remembered per session for unique page view counts
+SESSION_MAX_VISITED_PAGES = 500
+
+# Sum page and user activity counter increments in memory and write them
+# every ANALYTICS_FLUSH_INTERVAL seconds; see framework.analytics.buffer
+ANALYTICS_BUFFER_ENABLED = False
+ANALYTICS_FLUSH_INTERVAL = 10
+ANALYTICS_BUFFER_MAX_KEYS = 10000
 MFR_SERVER_URL = 'http://localhost:7778'
 
 ###### ARCHIVER ###########
@@ -274,9 +313,21 @@ ARCHIVE_TIMEOUT_TIMEDELTA = timedelta(1)  # 24 hours
 
 ENABLE_ARCHIVER = True
 
+# Concurrent WaterButler metadata requests made while sizing an addon's file tree
+ARCHIVER_CRAWL_WORKERS = 8
+# Metadata requests per second, per provider; see ARCHIVER_CRAWL_RATE_LIMITS
+ARCHIVER_CRAWL_DEFAULT_RATE = 10
+ARCHIVER_CRAWL_RATE_LIMITS = {}
+# Retries of failed or throttled (429, 5xx) metadata requests
+ARCHIVER_CRAWL_RETRIES = 3
+ARCHIVER_CRAWL_BACKOFF = 0.5
+
 JWT_SECRET = 'changeme'
 JWT_ALGORITHM = 'HS256'
 
+# Create notification digests in a celery task instead of during the request
+NOTIFICATIONS_DEFER_DIGESTS = False
+
 ##### CELERY #####
 
 # Default RabbitMQ broker
@@ -295,6 +346,7 @@ CELERY_IMPORTS = (
     'website.notifications.tasks',
     'website.archiver.tasks',
     'website.search.search',
+    'website.search.update_queue',
 )
 
 # celery.schedule will not be installed when running invoke requirements the first time.
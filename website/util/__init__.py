@@ -158,7 +158,9 @@ def waterbutler_url_for(route, provider, path, node, user=None, **kwargs):
         'provider': provider,
     })
 
-    if user:
+    if 'cookie' in kwargs:
+        url.args['cookie'] = kwargs.pop('cookie')
+    elif user:
         url.args['cookie'] = user.get_or_create_cookie()
     elif website_settings.COOKIE_NAME in request.cookies:
         url.args['cookie'] = request.cookies[website_settings.COOKIE_NAME]
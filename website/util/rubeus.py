@@ -291,7 +291,7 @@ class NodeProjectCollector(object):
                     'url': contributor.url,
                 })
         try:
-            user = node.logs[-1].user
+            user = node.get_recent_logs(1)[0].user
             modified_by = user.family_name or user.given_name
         except (AttributeError, IndexError):
             modified_by = ''
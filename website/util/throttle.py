@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Thread-safe rate limiting for outgoing requests."""
+import threading
+import time
+
+
+class TokenBucket(object):
+    """Allow bursts of up to ``capacity`` calls, refilled at ``rate`` tokens
+    per second.
+
+    :param float rate: Tokens added per second
+    :param float capacity: Maximum number of stored tokens; defaults to ``rate``
+    """
+    def __init__(self, rate, capacity=None, clock=time.time, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Take a token, blocking until one is available.
+
+        :return float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(name, rate):
+    """Return the process-wide bucket for ``name``, creating it at ``rate``
+    tokens per second if needed.
+    """
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None or bucket.rate != rate:
+            bucket = _buckets[name] = TokenBucket(rate)
+        return bucket
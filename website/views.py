@@ -13,6 +13,7 @@ from framework import sentry
 from framework.auth.core import User
 from framework.flask import redirect  # VOL-aware redirect
 from framework.routing import proxy_url
+from framework.mongo.batch import BatchLoader
 from framework.exceptions import HTTPError
 from framework.auth.forms import SignInForm
 from framework.forms import utils as form_utils
@@ -26,7 +27,7 @@ from website.models import Guid
 from website.models import Node
 from website.util import rubeus
 from website.util import sanitize
-from website.project import model
+from website.project import feeds
 from website.util import web_url_for
 from website.util import permissions
 from website.project import new_dashboard
@@ -46,7 +47,7 @@ def _rescale_ratio(auth, nodes):
     if not nodes:
         return 0
     counts = [
-        len(node.logs)
+        node.num_logs
         for node in nodes
         if node.can_view(auth)
     ]
@@ -268,18 +269,56 @@ def watched_logs_get(**kwargs):
             message_long='Invalid value for "size".'
         ))
 
-    total = sum(1 for x in user.get_recent_log_ids())
-    paginated_logs, pages = paginate(user.get_recent_log_ids(), total, page, size)
-    logs = (model.NodeLog.load(id) for id in paginated_logs)
+    if size < 1:
+        raise HTTPError(http.BAD_REQUEST, data=dict(
+            message_long='Invalid value for "size".'
+        ))
+    cursor = request.args.get('cursor')
+
+    node_ids = user.get_watched_node_ids()
+    since = user.get_feed_since()
+    total = feeds.count_logs(node_ids, since=since)
+    pages = math.ceil(total / float(size))
+    if not cursor:
+        validate_page_num(page, pages)
+    try:
+        logs, next_cursor = feeds.get_logs_page(
+            node_ids,
+            size=size,
+            since=since,
+            cursor=cursor,
+            offset=0 if cursor else page * size,
+        )
+    except ValueError:
+        raise HTTPError(http.BAD_REQUEST, data=dict(
+            message_long='Invalid value for "cursor".'
+        ))
+    prefetch_log_references(logs)
 
     return {
         "logs": [serialize_log(log) for log in logs],
         "total": total,
         "pages": pages,
-        "page": page
+        "page": page,
+        "next_cursor": next_cursor,
     }
 
 
+def prefetch_log_references(logs):
+    """Load the users and nodes referenced by ``logs`` with one query per
+    collection, so that `serialize_log` is served from the request cache.
+    """
+    loader = BatchLoader()
+    for log in logs:
+        loader.add(User, log.to_storage().get('user'))
+        loader.add_many(User, [
+            each for each in log.params.get('contributors', [])
+            if not isinstance(each, dict)
+        ])
+        loader.add(Node, log.params.get('node') or log.params.get('project'))
+    loader.flush()
+
+
 def serialize_log(node_log, auth=None, anonymous=False):
     '''Return a dictionary representation of the log.'''
     return {